@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark result files written by run.py.
+
+Example:
+    python benchmarks/compare.py benchmarks/results/before.json benchmarks/results/after.json
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_medians(filename):
+    """Return the report of a results file and its medians by ``(scale, case)``."""
+    with open(filename, encoding='utf-8') as results:
+        report = json.load(results)
+    return report, {(result['scale'], result['case']): result['median'] for result in report['results']}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Confronta due risultati dei benchmark")
+    parser.add_argument('base', help="risultati di riferimento")
+    parser.add_argument('new', help="risultati da confrontare")
+    parser.add_argument('--threshold', type=float, default=1.10,
+                        help="rapporto oltre il quale segnalare una regressione (default: 1.10)")
+    args = parser.parse_args(argv)
+
+    base_report, base = load_medians(args.base)
+    new_report, new = load_medians(args.new)
+    print(f"{base_report.get('commit')} -> {new_report.get('commit')}")
+    print(f"{'scala':>5} {'caso':<22} {'prima (ms)':>12} {'dopo (ms)':>12} {'rapporto':>9}")
+
+    regressions = 0
+    for key in sorted(base.keys() & new.keys()):
+        ratio = new[key] / base[key] if base[key] else float('inf')
+        flag = ""
+        if ratio > args.threshold:
+            flag = "  ⚠️ più lento"
+            regressions += 1
+        elif ratio < 1 / args.threshold:
+            flag = "  ✓ più veloce"
+        scale, case = key
+        print(f"{scale:>5} {case:<22} {base[key] * 1000:12.1f} {new[key] * 1000:12.1f} {ratio:8.2f}x{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
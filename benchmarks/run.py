@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Mycket benchmark suite.
+
+Times the hot paths of the application on seeded synthetic databases and
+saves the results as JSON, to compare them across commits with compare.py.
+
+Examples:
+    python benchmarks/run.py                       # 10k and 100k entries
+    python benchmarks/run.py --scale 1m --repeat 3
+    python benchmarks/run.py --case report --case csv_export -o before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+SRC_DIR = BENCH_DIR.parent / 'src'
+DATA_DIR = BENCH_DIR / '.data'        # Generated databases, reused between runs
+RESULTS_DIR = BENCH_DIR / 'results'
+
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(SRC_DIR))
+
+import sqlalchemy
+from sqlalchemy import func, select
+
+from synthetic import SCALES, generate_database
+from database import DatabaseManager
+from database.entries import entry_key, fetch_entries_page
+from database.export import export_invoice_csv, write_report_csv
+from database.grouping import fetch_grouped_totals, pivot
+from database.importer import import_records
+from database.invoicing import create_invoice
+from database.models import TimeEntry
+from database.overlaps import find_overlaps
+from database.reporting import fetch_report_totals, iter_report_rows
+from database.rollup import fetch_daily_totals
+from database.search import search_entries
+
+
+# Records inserted by one run of the bulk_insert case
+BULK_INSERT_SIZE = 10_000
+
+# Started in a fresh interpreter by the app_startup case: the window as
+# main.py builds it, up to the first page of the history in the tracker tab
+APP_STARTUP_SCRIPT = """
+import sys
+from PyQt6.QtWidgets import QApplication
+from database import DatabaseManager
+from ui import MainWindow
+app = QApplication(sys.argv[:1])
+window = MainWindow(DatabaseManager(sys.argv[1]))
+window.show()
+app.processEvents()
+if window.time_tracker.entries_model.rowCount() == 0:
+    sys.exit("cronologia vuota")
+"""
+
+# A case needing fresh state for every run returns a PreparedRun: ``setup``
+# runs untimed before each run, and what it returns is passed to ``run``
+PreparedRun = namedtuple('PreparedRun', ['setup', 'run'])
+
+
+class Context:
+    """Database and period shared by the cases of one scale."""
+
+    def __init__(self, db_path, workdir):
+        self.db_path = db_path
+        self.workdir = Path(workdir)
+        self.db = DatabaseManager(db_path)
+        self.session = self.db.get_session()
+        first, last = self.session.execute(
+            select(func.min(TimeEntry.start_time), func.max(TimeEntry.start_time))
+        ).one()
+        self.first_day = first.date()
+        self.last_day = last.date()
+        # Reports cover the last year of data, invoices its last month
+        self.year_start = self.last_day - timedelta(days=365)
+        self.month_start = self.last_day.replace(day=1)
+
+    def writable_copy(self):
+        """Return a ``DatabaseManager`` on a fresh copy, for cases that write."""
+        copy = self.workdir / f'copy-{time.monotonic_ns()}.db'
+        shutil.copy(self.db_path, copy)
+        return DatabaseManager(copy)
+
+    @staticmethod
+    def discard_copy(db):
+        """Close a ``writable_copy`` and delete its files."""
+        db.close()
+        for suffix in ('', '-wal', '-shm'):
+            Path(f'{db.db_path}{suffix}').unlink(missing_ok=True)
+
+    def close(self):
+        self.db.close()
+
+
+# Each case takes a Context and returns the function to time
+
+def case_report(ctx):
+    """Report tab: rows, rollup totals and overlaps of a year."""
+    def run():
+        rows = list(iter_report_rows(ctx.session, ctx.year_start, ctx.last_day))
+        fetch_daily_totals(ctx.session, ctx.year_start, ctx.last_day)
+        find_overlaps(ctx.session, ctx.year_start, ctx.last_day)
+        return rows
+    return run
+
+
+def case_report_totals_raw(ctx):
+    """Totals of the whole database computed from time_entries."""
+    return lambda: fetch_report_totals(ctx.session, ctx.first_day, ctx.last_day)
+
+
+def case_report_totals_rollup(ctx):
+    """Totals of the whole database computed from daily_service_totals."""
+    return lambda: fetch_daily_totals(ctx.session, ctx.first_day, ctx.last_day)
+
+
+def case_pivot(ctx):
+    """Pivot tab: hours and amounts of a year per service and week."""
+    return lambda: pivot(fetch_grouped_totals(ctx.session, ctx.year_start, ctx.last_day, ['service', 'week']))
+
+
+def case_recent_entries(ctx):
+    """Tracker tab: the first page of the history, loaded by _load_time_entries."""
+    return lambda: fetch_entries_page(ctx.session)
+
+
+def case_history_scroll(ctx):
+    """Tracker tab: scrolling through ten pages of the history."""
+    def run():
+        after = None
+        for _ in range(10):
+            page = fetch_entries_page(ctx.session, after=after)
+            after = entry_key(page[-1])
+    return run
+
+
+def case_search(ctx):
+    """Search dialog: ranked note search over the whole database."""
+    return lambda: search_entries(ctx.session, "attivita 12")
+
+
+def case_csv_export(ctx):
+    """CSV export of a year."""
+    def run():
+        with open(ctx.workdir / 'report.csv', 'w', newline='', encoding='utf-8') as output:
+            write_report_csv(ctx.session, output, ctx.year_start, ctx.last_day)
+    return run
+
+
+def case_invoice(ctx):
+    """Invoice of the last month: creation and CSV export."""
+    db = ctx.writable_copy()
+    session = db.get_session()
+
+    def run():
+        invoice = create_invoice(session, ctx.month_start, ctx.last_day)
+        session.commit()
+        export_invoice_csv(session, ctx.workdir / 'invoice.csv', invoice.invoice_number)
+    return run
+
+
+def case_invoice_export(ctx):
+    """CSV export of an invoice already created, from its stored lines."""
+    db = ctx.writable_copy()
+    session = db.get_session()
+    invoice = create_invoice(session, ctx.year_start, ctx.last_day)
+    session.commit()
+    return lambda: export_invoice_csv(session, ctx.workdir / 'invoice_again.csv', invoice.invoice_number)
+
+
+def case_bulk_insert(ctx):
+    """Import of BULK_INSERT_SIZE entries in one transaction, each run into a fresh copy."""
+    start = datetime.combine(ctx.last_day, datetime.min.time()) + timedelta(days=1)
+    records = [
+        {
+            'service': "Consulenza Software",
+            'start': str(start + timedelta(minutes=30 * number)),
+            'end': str(start + timedelta(minutes=30 * number + 25)),
+            'notes': f"import {number}",
+        }
+        for number in range(BULK_INSERT_SIZE)
+    ]
+    copies = []
+
+    def setup():
+        while copies:
+            ctx.discard_copy(copies.pop())
+        copies.append(ctx.writable_copy())
+        return copies[-1].get_session()
+    return PreparedRun(setup, lambda session: import_records(session, records))
+
+
+def case_overlap_scan(ctx):
+    """Overlap sweep over the whole database."""
+    return lambda: find_overlaps(ctx.session)
+
+
+def case_cli_startup(ctx):
+    """Cold start of the command line: imports, schema check and one query."""
+    command = [sys.executable, 'cli.py', '--db', str(ctx.db_path), 'stats']
+    return lambda: subprocess.run(command, cwd=SRC_DIR, check=True, capture_output=True)
+
+
+def case_app_startup(ctx):
+    """Cold start of the application, offscreen: PyQt and window imports up to the first history page."""
+    # On a copy: startup may write (a crashed timer is closed, a running one beats)
+    db = ctx.writable_copy()
+    db.close()
+    command = [sys.executable, '-c', APP_STARTUP_SCRIPT, str(db.db_path)]
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    return lambda: subprocess.run(command, cwd=SRC_DIR, env=env, check=True, capture_output=True)
+
+
+CASES = {
+    name[len('case_'):]: function
+    for name, function in globals().items() if name.startswith('case_')
+}
+
+
+def dataset_path(scale, seed):
+    """Return the cached database of a scale, generating it the first time."""
+    path = DATA_DIR / f'mycket-{scale}-seed{seed}.db'
+    if not path.exists():
+        DATA_DIR.mkdir(exist_ok=True)
+        partial = path.with_suffix('.partial')
+        print(f"Generazione dataset {scale} ({SCALES[scale]} voci)...", file=sys.stderr)
+        generate_database(partial, SCALES[scale], seed).close()
+        os.replace(partial, path)
+    return path
+
+
+def time_case(run, repeat, warmup=1):
+    """Return the timings in seconds of ``repeat`` runs after ``warmup`` runs."""
+    if not isinstance(run, PreparedRun):
+        run = PreparedRun(lambda: None, lambda _, run=run: run())
+    for _ in range(warmup):
+        run.run(run.setup())
+    timings = []
+    for _ in range(repeat):
+        prepared = run.setup()
+        start = time.perf_counter()
+        run.run(prepared)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR, check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(scales, cases, repeat, seed):
+    """Run ``cases`` on every scale; return the list of result dicts."""
+    results = []
+    for scale in scales:
+        db_path = dataset_path(scale, seed)
+        with tempfile.TemporaryDirectory() as workdir:
+            ctx = Context(db_path, workdir)
+            try:
+                for name in cases:
+                    timings = time_case(CASES[name](ctx), repeat)
+                    result = {
+                        'case': name,
+                        'scale': scale,
+                        'entries': SCALES[scale],
+                        'repeat': repeat,
+                        'min': min(timings),
+                        'median': statistics.median(timings),
+                        'mean': statistics.mean(timings),
+                        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+                    }
+                    results.append(result)
+                    print(f"{scale:>5} {name:<22} {result['median'] * 1000:10.1f} ms "
+                          f"(min {result['min'] * 1000:.1f})", file=sys.stderr)
+            finally:
+                ctx.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Mycket su dati sintetici")
+    parser.add_argument('--scale', action='append', choices=sorted(SCALES),
+                        help="dimensione del dataset (ripetibile, default: 10k e 100k)")
+    parser.add_argument('--case', action='append', choices=sorted(CASES),
+                        help="caso da misurare (ripetibile, default: tutti)")
+    parser.add_argument('--repeat', type=int, default=5, help="misure per caso (default: 5)")
+    parser.add_argument('--seed', type=int, default=0, help="seme del generatore (default: 0)")
+    parser.add_argument('-o', '--output', help="file JSON dei risultati (default: benchmarks/results/...)")
+    args = parser.parse_args(argv)
+
+    scales = args.scale or ['10k', '100k']
+    cases = args.case or list(CASES)
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'seed': args.seed,
+        'python': platform.python_version(),
+        'sqlalchemy': sqlalchemy.__version__,
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'results': run_benchmarks(scales, cases, args.repeat, args.seed),
+    }
+
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{commit or 'nocommit'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+    print(f"✓ Risultati salvati in {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Seeded synthetic data for Mycket benchmarks.
+
+The same ``(entries, seed)`` always yields the same database, so timings
+taken at different commits measure the code, not the data.
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from database import DatabaseManager
+from database.importer import INSERT_ENTRY_SQL, entry_timestamp, sqlite_timestamp
+from database.invoicing import next_invoice_number
+from database.models import Invoice, Service
+from database.rollup import rebuild_daily_totals
+
+
+# Dataset sizes by name, in time entries
+SCALES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+SERVICE_COUNT = 12
+FIRST_DAY = datetime(2015, 1, 1)
+
+# Entries written per executemany() call
+BATCH_SIZE = 10_000
+
+
+def generate_services(session, rng):
+    """Add ``SERVICE_COUNT`` services on top of the default ones; return all ids."""
+    for number in range(SERVICE_COUNT):
+        session.add(Service(
+            name=f"Servizio Sintetico {number:02d}",
+            hourly_rate_cents=rng.randrange(2000, 12000, 50),
+            description="Generato per i benchmark",
+        ))
+    session.commit()
+    return [service_id for (service_id,) in session.query(Service.id).order_by(Service.id)]
+
+
+def iter_entries(count, service_ids, rng):
+    """
+    Yield ``count`` entry rows in ``INSERT_ENTRY_SQL`` order.
+
+    Entries follow a working-day pattern: a few sessions per day, between
+    15 minutes and 4 hours each, without overlaps.
+    """
+    now = sqlite_timestamp(FIRST_DAY)
+    cursor = FIRST_DAY + timedelta(hours=8)
+    for number in range(count):
+        start = cursor + timedelta(minutes=rng.randrange(0, 60))
+        end = start + timedelta(minutes=rng.randrange(15, 240))
+        notes = f"Attività {number}" if rng.random() < 0.3 else None
+        yield (rng.choice(service_ids), entry_timestamp(start), entry_timestamp(end),
+               int((end - start).total_seconds()), notes, now, now)
+        cursor = end
+        if cursor.hour >= 19:
+            cursor = datetime.combine(cursor.date() + timedelta(days=1), datetime.min.time()) + timedelta(hours=8)
+
+
+def generate_invoices(session, last_day):
+    """Add one invoice per month from ``FIRST_DAY`` to ``last_day``."""
+    month = FIRST_DAY
+    while month <= last_day:
+        next_month = (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+        session.add(Invoice(
+            invoice_number=next_invoice_number(session, month.year),
+            period_start=month,
+            period_end=next_month - timedelta(microseconds=1),
+            total_cents=0,
+        ))
+        month = next_month
+    session.commit()
+
+
+def generate_database(db_path, entries, seed=0):
+    """
+    Create a database at ``db_path`` holding ``entries`` synthetic time entries.
+
+    Returns:
+        The open ``DatabaseManager``; close it when done.
+    """
+    rng = random.Random(seed)
+    db = DatabaseManager(db_path)
+    session = db.get_session()
+    service_ids = generate_services(session, rng)
+
+    connection = session.connection()
+    batch = []
+    last_start = FIRST_DAY
+    for row in iter_entries(entries, service_ids, rng):
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            connection.exec_driver_sql(INSERT_ENTRY_SQL, batch)
+            last_start = datetime.fromisoformat(batch[-1][1])
+            batch = []
+    if batch:
+        connection.exec_driver_sql(INSERT_ENTRY_SQL, batch)
+        last_start = datetime.fromisoformat(batch[-1][1])
+    session.commit()
+
+    rebuild_daily_totals(session)
+    session.commit()
+    generate_invoices(session, last_start)
+    session.close()
+    return db
@@ -37,6 +37,7 @@ pyinstaller --noconfirm \
     $ICON_PARAM \
     --hidden-import "database" \
     --hidden-import "database.models" \
+    --hidden-import "database.migrations" \
     --hidden-import "ui" \
     --hidden-import "ui.main_window" \
     --hidden-import "ui.time_tracker" \
@@ -47,6 +48,8 @@ pyinstaller --noconfirm \
     --hidden-import "PyQt6.QtWidgets" \
     --hidden-import "PyQt6.QtGui" \
     --hidden-import "sqlalchemy.ext.declarative" \
+    --hidden-import "alembic" \
+    --add-data "src/database/migrations:database/migrations" \
     src/main.py
 
 echo "✅ Build complete! Application is in dist/Mycket"
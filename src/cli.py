@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Mycket - Command line interface
+Headless entry point for batch reports, exports and invoices (no PyQt6).
+
+Examples:
+    python cli.py report --month previous
+    python cli.py export --from 2024-01-01 --to 2024-12-31 -o report_2024.csv
+    python cli.py invoice --month 2024-03 --service "Consulenza AI"
+    python cli.py invoice-export INV-2024-0003 -o fattura.csv
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, select
+
+from database import DatabaseManager, ENGINE_PROFILES, DEFAULT_PROFILE
+from database.models import Service, TimeEntry, Invoice, DailyServiceTotal
+from database.money import format_cents
+from database.rollup import fetch_daily_totals, rebuild_daily_totals
+from database.backup import (
+    KEEP_BACKUPS, BackupError, backup_database, create_backup, default_backup_dir, dump_jsonl, restore_database
+)
+from database.export import export_invoice_csv, stream_report_rows, write_report_csv
+from database.importer import EntryValidationError, import_file
+from database.invoicing import InvoiceNotFoundError, create_invoice, get_invoice
+from database.overlaps import find_overlaps
+from database.profiling import QueryProfiler
+
+
+class CommandError(Exception):
+    """Error reported to the user with a non-zero exit status."""
+
+
+def parse_date(value):
+    """Parse a ``YYYY-MM-DD`` date argument."""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data non valida (atteso AAAA-MM-GG): {value}")
+
+
+def month_period(value, today=None):
+    """
+    Return the first and last day of a month.
+
+    Args:
+        value: ``YYYY-MM``, ``current`` or ``previous``.
+        today: Reference date for ``current``/``previous``. If None, today.
+    """
+    today = today or date.today()
+    if value == 'current':
+        first = today.replace(day=1)
+    elif value == 'previous':
+        first = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+    else:
+        try:
+            first = datetime.strptime(value, '%Y-%m').date()
+        except ValueError:
+            raise CommandError(f"mese non valido (atteso AAAA-MM, current o previous): {value}")
+    next_month = (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return first, next_month - timedelta(days=1)
+
+
+def resolve_period(args):
+    """Return ``(start, end)`` from ``--month`` or ``--from``/``--to``."""
+    if args.month:
+        if args.start or args.end:
+            raise CommandError("usa --month oppure --from/--to, non entrambi")
+        return month_period(args.month)
+    if not (args.start and args.end):
+        raise CommandError("specifica il periodo con --month oppure --from e --to")
+    if args.end < args.start:
+        raise CommandError("la data finale precede quella iniziale")
+    return args.start, args.end
+
+
+def resolve_service(session, name):
+    """Return the id of the service called ``name``, or None for all services."""
+    if name is None:
+        return None
+    service_id = session.execute(select(Service.id).where(Service.name == name)).scalar()
+    if service_id is None:
+        raise CommandError(f"servizio sconosciuto: {name}")
+    return service_id
+
+
+@contextlib.contextmanager
+def open_output(filename):
+    """Open ``filename`` for CSV writing; ``-`` means standard output."""
+    if filename == '-':
+        yield sys.stdout
+    else:
+        with open(filename, 'w', newline='', encoding='utf-8') as output:
+            yield output
+
+
+def cmd_report(db, args):
+    """Print a report for a period."""
+    session = db.get_session()
+    start, end = resolve_period(args)
+    service_id = resolve_service(session, args.service)
+
+    if not args.totals_only:
+        for row in stream_report_rows(session, start, end, service_id):
+            print(f"{row.start_time:%d/%m/%Y} {row.start_time:%H:%M}-{row.end_time:%H:%M}  "
+                  f"{row.service_name:<30.30} {row.hours:8.2f} h {format_cents(row.amount_cents):>10} €")
+    totals = fetch_daily_totals(session, start, end, service_id)
+    print(f"Periodo: {start:%d/%m/%Y} - {end:%d/%m/%Y}")
+    print(f"Ore Totali: {totals.hours:.2f}")
+    print(f"Importo Totale: {format_cents(totals.amount_cents)}€")
+
+
+def cmd_export(db, args):
+    """Export a report for a period as CSV."""
+    session = db.get_session()
+    start, end = resolve_period(args)
+    service_id = resolve_service(session, args.service)
+
+    with open_output(args.output) as output:
+        result = write_report_csv(session, output, start, end, service_id)
+    print(f"✓ Esportate {result.row_count} voci in {args.output}", file=sys.stderr)
+
+
+def cmd_invoice(db, args):
+    """Create an invoice for a period and write it as CSV."""
+    session = db.get_session()
+    start, end = resolve_period(args)
+    service_id = resolve_service(session, args.service)
+
+    if fetch_daily_totals(session, start, end, service_id).seconds == 0:
+        raise CommandError("nessuna voce da fatturare nel periodo")
+
+    invoice = db.write(create_invoice, start, end, service_id)
+    filename = args.output or f"fattura_{invoice.invoice_number}.csv"
+    export_invoice_csv(session, filename, invoice.invoice_number)
+    print(f"✓ Fattura {invoice.invoice_number} ({format_cents(invoice.total_cents)}€) salvata in {filename}")
+
+
+def cmd_invoice_export(db, args):
+    """Write an existing invoice as CSV again, from its stored lines."""
+    session = db.get_session()
+    try:
+        invoice = get_invoice(session, args.number)
+    except InvoiceNotFoundError as e:
+        raise CommandError(str(e))
+    filename = args.output or f"fattura_{invoice.invoice_number}.csv"
+    result = export_invoice_csv(session, filename, invoice.invoice_number)
+    print(f"✓ Fattura {invoice.invoice_number} ({result.row_count} righe) salvata in {filename}")
+
+
+def cmd_import(db, args):
+    """Import time entries from a CSV, JSON or JSON Lines file."""
+    session = db.get_session()
+    progress = None
+    if not args.quiet:
+        progress = lambda count: print(f"  {count} record letti...", file=sys.stderr)
+    try:
+        result = import_file(session, args.file, dry_run=args.dry_run, progress=progress)
+    except (EntryValidationError, OSError) as e:
+        raise CommandError(str(e))
+    for number, message in result.errors:
+        print(f"  record {number}: {message}", file=sys.stderr)
+    if args.dry_run:
+        print(f"✓ Verifica completata: {result.imported} voci importabili, {len(result.errors)} non valide")
+    else:
+        print(f"✓ Importate {result.imported} voci, {len(result.errors)} scartate")
+    if result.errors:
+        raise CommandError(f"{len(result.errors)} record non validi")
+
+
+def cmd_stats(db, args):
+    """Print database statistics."""
+    session = db.get_session()
+    service_count = session.execute(select(func.count(Service.id))).scalar()
+    invoice_count = session.execute(select(func.count(Invoice.id))).scalar()
+    entry_count, running_count, first_start, last_start = session.execute(
+        select(
+            func.count(TimeEntry.id),
+            func.count(TimeEntry.id).filter(TimeEntry.end_time.is_(None)),
+            func.min(TimeEntry.start_time),
+            func.max(TimeEntry.start_time),
+        )
+    ).one()
+    total_seconds, total_cents = session.execute(
+        select(
+            func.coalesce(func.sum(DailyServiceTotal.seconds), 0),
+            func.coalesce(func.sum(DailyServiceTotal.amount_cents), 0),
+        )
+    ).one()
+
+    print(f"Database: {db.db_path} ({os.path.getsize(db.db_path) / 1024:.0f} KB, profilo {db.profile})")
+    print(f"Servizi: {service_count}")
+    print(f"Voci: {entry_count} ({running_count} in corso)")
+    if first_start is not None:
+        print(f"Periodo: {first_start:%d/%m/%Y} - {last_start:%d/%m/%Y}")
+    print(f"Ore Totali: {total_seconds / 3600:.2f}")
+    print(f"Importo Totale: {format_cents(total_cents)}€")
+    print(f"Fatture: {invoice_count}")
+
+
+def cmd_overlaps(db, args):
+    """List overlapping time entries, of a period or of the whole database."""
+    session = db.get_session()
+    start = end = None
+    if args.month or args.start or args.end:
+        start, end = resolve_period(args)
+    names = dict(session.execute(select(Service.id, Service.name)).all())
+
+    def describe(interval):
+        end_time = f"{interval.end_time:%H:%M}" if interval.end_time else "in corso"
+        return f"#{interval.entry_id} {names.get(interval.service_id, '-')} {interval.start_time:%H:%M}-{end_time}"
+
+    overlaps = find_overlaps(session, start, end)
+    for overlap in overlaps:
+        minutes = (overlap.end_time - overlap.start_time).total_seconds() / 60
+        print(f"{overlap.start_time:%d/%m/%Y}  {describe(overlap.first)}  ↔  {describe(overlap.second)}  ({minutes:.0f} min)")
+    print(f"{len(overlaps)} sovrapposizioni")
+    if overlaps:
+        raise CommandError("voci sovrapposte")
+
+
+def cmd_rebuild_totals(db, args):
+    """Recompute the daily totals from the time entries."""
+    count = db.write(rebuild_daily_totals)
+    print(f"✓ Totali giornalieri ricalcolati ({count} righe)")
+
+
+def cmd_backup(db, args):
+    """Back up the database, to a file or into the automatic backup directory."""
+    if args.output:
+        backup_database(db.engine, args.output)
+        path = args.output
+    else:
+        path = create_backup(db.engine, default_backup_dir(db.db_path), keep=args.keep)
+    print(f"✓ Backup salvato in {path}")
+
+
+def cmd_dump(db, args):
+    """Write every table to a compressed JSON Lines file."""
+    count = dump_jsonl(db.get_session(), args.output)
+    print(f"✓ Esportate {count} righe in {args.output}")
+
+
+def cmd_restore(db, args):
+    """Replace the database with a backup, keeping a copy of the current data."""
+    db.Session.remove()
+    try:
+        saved = create_backup(db.engine, default_backup_dir(db.db_path), label='pre-restore')
+        restore_database(db.engine, args.file)
+    except BackupError as e:
+        raise CommandError(str(e))
+    print(f"✓ Backup {args.file} ripristinato (dati precedenti salvati in {saved})")
+
+
+def _add_period_arguments(parser):
+    parser.add_argument('--from', dest='start', type=parse_date, help="primo giorno (AAAA-MM-GG)")
+    parser.add_argument('--to', dest='end', type=parse_date, help="ultimo giorno incluso (AAAA-MM-GG)")
+    parser.add_argument('--month', help="mese intero: AAAA-MM, current o previous")
+    parser.add_argument('--service', help="limita a un servizio (nome)")
+
+
+def build_parser():
+    """Build the argument parser."""
+    parser = argparse.ArgumentParser(prog='mycket', description="Mycket - report e fatture da riga di comando")
+    parser.add_argument('--db', help="percorso del database (default: ~/.mycket/mycket.db)")
+    parser.add_argument('--profile', choices=sorted(ENGINE_PROFILES), default=DEFAULT_PROFILE,
+                        help="profilo SQLite")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="registra le query e salva un trace JSON (chrome://tracing, Perfetto)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    report = subparsers.add_parser('report', help="stampa il report di un periodo")
+    _add_period_arguments(report)
+    report.add_argument('--totals-only', action='store_true', help="stampa solo i totali")
+    report.set_defaults(handler=cmd_report)
+
+    export = subparsers.add_parser('export', help="esporta il report di un periodo in CSV")
+    _add_period_arguments(export)
+    export.add_argument('-o', '--output', default='-', help="file CSV (default: standard output)")
+    export.set_defaults(handler=cmd_export)
+
+    invoice = subparsers.add_parser('invoice', help="crea la fattura di un periodo")
+    _add_period_arguments(invoice)
+    invoice.add_argument('-o', '--output', help="file CSV (default: fattura_<numero>.csv)")
+    invoice.set_defaults(handler=cmd_invoice)
+
+    invoice_export = subparsers.add_parser('invoice-export', help="riesporta in CSV una fattura già emessa")
+    invoice_export.add_argument('number', help="numero della fattura (es. INV-2024-0001)")
+    invoice_export.add_argument('-o', '--output', help="file CSV (default: fattura_<numero>.csv)")
+    invoice_export.set_defaults(handler=cmd_invoice_export)
+
+    import_ = subparsers.add_parser('import', help="importa voci da un file CSV o JSON")
+    import_.add_argument('file', help=".csv, .json o .jsonl con campi service, start, end, notes")
+    import_.add_argument('--dry-run', action='store_true', help="verifica il file senza importare nulla")
+    import_.add_argument('-q', '--quiet', action='store_true', help="non mostrare l'avanzamento")
+    import_.set_defaults(handler=cmd_import)
+
+    stats = subparsers.add_parser('stats', help="statistiche del database")
+    stats.set_defaults(handler=cmd_stats)
+
+    backup = subparsers.add_parser('backup', help="backup del database")
+    backup.add_argument('-o', '--output', help="file di destinazione (default: backup automatici con rotazione)")
+    backup.add_argument('--keep', type=int, default=KEEP_BACKUPS,
+                        help=f"backup automatici da conservare (default: {KEEP_BACKUPS})")
+    backup.set_defaults(handler=cmd_backup)
+
+    dump = subparsers.add_parser('dump', help="esporta tutti i dati in JSON Lines compresso")
+    dump.add_argument('-o', '--output', required=True, help="file .jsonl.gz")
+    dump.set_defaults(handler=cmd_dump)
+
+    restore = subparsers.add_parser('restore', help="ripristina il database da un backup")
+    restore.add_argument('file', help="file .db creato da backup")
+    restore.set_defaults(handler=cmd_restore)
+
+    overlaps = subparsers.add_parser('overlaps', help="elenca le voci sovrapposte")
+    overlaps.add_argument('--from', dest='start', type=parse_date, help="primo giorno (AAAA-MM-GG)")
+    overlaps.add_argument('--to', dest='end', type=parse_date, help="ultimo giorno incluso (AAAA-MM-GG)")
+    overlaps.add_argument('--month', help="mese intero: AAAA-MM, current o previous")
+    overlaps.set_defaults(handler=cmd_overlaps)
+
+    rebuild = subparsers.add_parser('rebuild-totals', help="ricalcola i totali giornalieri dalle voci")
+    rebuild.set_defaults(handler=cmd_rebuild_totals)
+
+    return parser
+
+
+def main(argv=None):
+    """Command line entry point."""
+    args = build_parser().parse_args(argv)
+
+    # Keep standard output clean for CSV: startup messages go to stderr
+    profiler = QueryProfiler() if args.trace else None
+    with contextlib.redirect_stdout(sys.stderr):
+        db = DatabaseManager(args.db, profile=args.profile, profiler=profiler)
+    try:
+        with db.span(f'command:{args.command}'):
+            args.handler(db, args)
+    except CommandError as e:
+        print(f"Errore: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+        if profiler is not None:
+            profiler.write_trace(args.trace)
+            print(f"✓ Trace salvato in {args.trace} ({profiler.summary()})", file=sys.stderr)
+            for span, statement, run in profiler.n_plus_one():
+                print(f"  ⚠️ {run} query uguali di seguito in {span}: {' '.join(statement.split())[:100]}",
+                      file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,30 @@
 """Database manager for Mycket application."""
 
 import os
+from contextlib import nullcontext
 from pathlib import Path
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
-from .models import Base, seed_default_services
+from .engine import DEFAULT_PROFILE, ENGINE_PROFILES, create_sqlite_engine, read_pragmas, resolve_pragmas
+from .models import seed_default_services
+from .migrations import upgrade_schema
+from .changes import FEED_KEY, ChangeFeed
+from .profiling import ProfilingConnection
+from .sessions import ReadOnlySessionError, create_session_factories, run_write, session_scope
+from . import rollup  # Registers the listener keeping daily_service_totals up to date
 
 
 class DatabaseManager:
     """Manages database connection and session lifecycle."""
     
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, profile=DEFAULT_PROFILE, pragmas=None, profiler=None):
         """
         Initialize database manager.
         
         Args:
             db_path: Path to SQLite database file. If None, uses default location.
+            profile: Engine profile name, 'fast' or 'durable' (see ENGINE_PROFILES).
+            pragmas: Optional dict of pragmas overriding the profile's values.
+            profiler: Optional ``QueryProfiler`` recording every statement.
         """
         if db_path is None:
             # Store database in user's home directory
@@ -24,16 +33,28 @@ class DatabaseManager:
             db_path = app_dir / 'mycket.db'
         
         self.db_path = str(db_path)
-        self.engine = create_engine(f'sqlite:///{self.db_path}', echo=False)
-        self.session_factory = sessionmaker(bind=self.engine)
+        self.profile = profile
+        self.pragmas = resolve_pragmas(profile, pragmas)
+        self.profiler = profiler
+        self.engine = create_sqlite_engine(
+            self.db_path, self.pragmas,
+            connection_factory=ProfilingConnection if profiler is not None else None
+        )
+        if profiler is not None:
+            profiler.attach(self.engine)
+        # Committed writes of entries and services are published here
+        self.changes = ChangeFeed()
+        info = {FEED_KEY: self.changes}
+        self.session_factory = sessionmaker(bind=self.engine, info=info)
         self.Session = scoped_session(self.session_factory)
+        self._unit_of_work_factory, self._read_only_factory = create_session_factories(self.engine, info)
         
         # Initialize database
         self._init_db()
     
     def _init_db(self):
-        """Initialize database schema."""
-        Base.metadata.create_all(self.engine)
+        """Initialize database schema, migrating existing files in place."""
+        upgrade_schema(self.engine)
         
         # Seed default services if database is new
         session = self.Session()
@@ -43,9 +64,43 @@ class DatabaseManager:
             session.close()
     
     def get_session(self):
-        """Get a new database session."""
+        """
+        Get the thread's long-lived database session.
+        
+        For scripts and tests; the application uses ``session_scope``.
+        """
         return self.Session()
     
+    def session_scope(self, read_only=False, immediate=False):
+        """
+        Context manager running one unit of work in a new session.
+        
+        The session commits when the block ends (read-only sessions are just
+        closed), rolls back if it raises, and is always closed. ``immediate``
+        takes the write lock first.
+        """
+        factory = self._read_only_factory if read_only else self._unit_of_work_factory
+        return session_scope(factory, read_only, immediate)
+    
+    def write(self, fn, *args, **kwargs):
+        """
+        Run ``fn(session, *args, **kwargs)`` as one short write transaction.
+        
+        Retried with backoff while another process holds the database, see
+        ``sessions.run_write``. Returns what ``fn`` returns.
+        """
+        return run_write(self._unit_of_work_factory, fn, *args, **kwargs)
+    
+    def span(self, name):
+        """Context manager timing a block for the profiler, if any."""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.span(name)
+    
+    def active_pragmas(self):
+        """Return the pragma values SQLite reports for this database."""
+        return read_pragmas(self.engine, self.pragmas)
+    
     def close(self):
         """Close database connection."""
         self.Session.remove()
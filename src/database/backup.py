@@ -0,0 +1,220 @@
+"""Backup, restore and full-data export for Mycket application.
+
+Backups are consistent snapshots of the whole database taken with SQLite's
+online backup API. Pages are copied in small steps, so the application keeps
+reading and writing while a backup runs. Dumps are gzip-compressed JSON Lines
+files, streamed table by table for use outside the application.
+"""
+
+import gzip
+import json
+import os
+import re
+import sqlite3
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import select
+
+from .migrations import upgrade_schema
+from .models import Invoice, InvoiceLine, Service, TimeEntry
+
+
+# Pages copied per backup step; the database is only locked during a step
+BACKUP_PAGES = 256
+
+# Automatic backups kept by rotation
+KEEP_BACKUPS = 7
+
+# Minimum time between two automatic backups
+BACKUP_INTERVAL = timedelta(days=1)
+
+BACKUP_PATTERN = re.compile(r'^mycket-\d{8}-\d{6}(-[\w-]+)?\.db$')
+
+# Tables written by dump_jsonl, in dependency order
+DUMP_TABLES = [Service.__table__, TimeEntry.__table__, Invoice.__table__, InvoiceLine.__table__]
+
+
+class BackupError(Exception):
+    """Raised for a backup file that cannot be created or restored."""
+
+
+def _copy(source, target, progress=None):
+    """Copy ``source`` into ``target`` (DB-API connections) in steps of ``BACKUP_PAGES``."""
+    callback = None
+    if progress is not None:
+        callback = lambda status, remaining, total: progress(total - remaining, total)
+    source.backup(target, pages=BACKUP_PAGES, progress=callback)
+
+
+def backup_database(engine, filename, progress=None):
+    """
+    Write a consistent snapshot of the database to ``filename``.
+
+    The copy is written next to the target and renamed once complete, so an
+    interrupted backup never leaves a truncated file behind.
+
+    Args:
+        engine: Engine of the database to back up.
+        filename: Destination file, overwritten if it exists.
+        progress: Optional callback receiving ``(pages_done, pages_total)``;
+            an exception raised by it aborts the backup.
+    """
+    filename = Path(filename)
+    partial = filename.with_name(filename.name + '.partial')
+    partial.unlink(missing_ok=True)
+    source = engine.raw_connection()
+    try:
+        target = sqlite3.connect(partial)
+        try:
+            _copy(source.driver_connection, target, progress)
+            # A single self-contained file, with no -wal companion
+            target.execute('PRAGMA journal_mode=DELETE')
+        finally:
+            target.close()
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    finally:
+        source.close()
+    os.replace(partial, filename)
+
+
+def verify_backup(filename):
+    """
+    Check that ``filename`` is an intact Mycket database.
+
+    Raises:
+        BackupError: If the file is missing, damaged or not a Mycket database.
+    """
+    if not Path(filename).is_file():
+        raise BackupError(f"file non trovato: {filename}")
+    try:
+        connection = sqlite3.connect(f'{Path(filename).resolve().as_uri()}?mode=ro', uri=True)
+        try:
+            check = connection.execute('PRAGMA quick_check').fetchone()[0]
+            tables = {name for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        finally:
+            connection.close()
+    except sqlite3.DatabaseError as e:
+        raise BackupError(f"{filename} non è un database valido: {e}")
+    if check != 'ok':
+        raise BackupError(f"{filename} è danneggiato: {check}")
+    if not {'services', 'time_entries', 'invoices'} <= tables:
+        raise BackupError(f"{filename} non è un database Mycket")
+
+
+def restore_database(engine, filename, progress=None):
+    """
+    Replace the contents of the database with a backup.
+
+    The backup is checked first, copied over the live database with the
+    backup API and then migrated to the current schema. Sessions must be
+    closed beforehand: every pooled connection is discarded.
+
+    Raises:
+        BackupError: If the backup is not a valid Mycket database.
+    """
+    verify_backup(filename)
+    engine.dispose()
+    target = engine.raw_connection()
+    try:
+        source = sqlite3.connect(f'{Path(filename).resolve().as_uri()}?mode=ro', uri=True)
+        try:
+            _copy(source, target.driver_connection, progress)
+        finally:
+            source.close()
+    finally:
+        target.close()
+    engine.dispose()
+    upgrade_schema(engine)
+
+
+def default_backup_dir(db_path):
+    """Return the automatic backup directory of a database file."""
+    return Path(db_path).parent / 'backups'
+
+
+def list_backups(backup_dir):
+    """Return the backups in ``backup_dir``, oldest first."""
+    backup_dir = Path(backup_dir)
+    if not backup_dir.is_dir():
+        return []
+    return sorted(path for path in backup_dir.iterdir() if BACKUP_PATTERN.match(path.name))
+
+
+def rotate_backups(backup_dir, keep=KEEP_BACKUPS):
+    """Delete the oldest backups, keeping the latest ``keep``; return the deleted paths."""
+    backups = list_backups(backup_dir)
+    expired = backups[:max(len(backups) - keep, 0)]
+    for path in expired:
+        path.unlink()
+    return expired
+
+
+def create_backup(engine, backup_dir, keep=KEEP_BACKUPS, label=None, progress=None):
+    """
+    Back up the database into ``backup_dir`` with a timestamped name and rotate.
+
+    Args:
+        engine: Engine of the database to back up.
+        backup_dir: Directory of the backups, created if needed.
+        keep: Number of backups kept by rotation.
+        label: Optional suffix of the file name, e.g. ``pre-restore``.
+        progress: See ``backup_database``.
+
+    Returns:
+        Path of the new backup.
+    """
+    backup_dir = Path(backup_dir)
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    name = f"mycket-{datetime.now():%Y%m%d-%H%M%S}{f'-{label}' if label else ''}.db"
+    path = backup_dir / name
+    backup_database(engine, path, progress)
+    rotate_backups(backup_dir, keep)
+    return path
+
+
+def backup_due(backup_dir, interval=BACKUP_INTERVAL, now=None):
+    """Return True if the latest backup in ``backup_dir`` is older than ``interval``."""
+    backups = list_backups(backup_dir)
+    if not backups:
+        return True
+    latest = datetime.fromtimestamp(backups[-1].stat().st_mtime)
+    return (now or datetime.now()) - latest >= interval
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def dump_jsonl(session, filename, progress=None, batch_size=1000):
+    """
+    Write services, time entries and invoices (with their lines) to a gzip-compressed JSON Lines file.
+
+    Each line is ``{"table": name, "row": {column: value}}``; rows are
+    streamed, so memory use does not grow with the database.
+
+    Args:
+        session: Database session.
+        filename: Destination ``.jsonl.gz`` file.
+        progress: Optional callback receiving the number of rows written so far.
+        batch_size: Rows fetched per round trip.
+
+    Returns:
+        Number of rows written.
+    """
+    count = 0
+    with gzip.open(filename, 'wt', encoding='utf-8') as dump:
+        for table in DUMP_TABLES:
+            query = select(table).order_by(*table.primary_key.columns).execution_options(yield_per=batch_size)
+            for row in session.execute(query).mappings():
+                record = {name: _json_value(value) for name, value in row.items()}
+                dump.write(json.dumps({'table': table.name, 'row': record}, ensure_ascii=False))
+                dump.write('\n')
+                count += 1
+                if progress is not None and count % batch_size == 0:
+                    progress(count)
+    return count
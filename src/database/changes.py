@@ -0,0 +1,134 @@
+"""In-process change feed for Mycket application.
+
+ORM writes of time entries and services are recorded by mapper events
+(``after_insert``, ``after_update``, ``after_delete``) as ``Change`` records
+holding a snapshot of the row before and after, and published to the
+subscribers of the session's ``ChangeFeed`` once the transaction commits.
+Subscribers (the open panels) apply them as row-level deltas instead of
+querying again:
+
+    db_manager.changes.subscribe(callback)   # callback(list of Change)
+
+Changes are only recorded for sessions made by a ``DatabaseManager``; a
+rollback discards them. Bulk writes that bypass the ORM (imports) publish a
+reset instead, see ``ChangeFeed.publish_reset``.
+
+Callbacks run in the thread that committed, which may be a worker's.
+"""
+
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from .clock import to_local
+from .models import Service, TimeEntry
+
+
+EntrySnapshot = namedtuple(
+    'EntrySnapshot', ['id', 'service_id', 'start_time', 'end_time', 'duration_seconds', 'notes']
+)
+ServiceSnapshot = namedtuple('ServiceSnapshot', ['id', 'name', 'hourly_rate_cents', 'description'])
+
+# A row of ``table`` as it was (None if inserted) and as it is (None if
+# deleted); both None when the whole table changed in bulk
+Change = namedtuple('Change', ['table', 'old', 'new'])
+
+# Session.info keys
+FEED_KEY = 'change_feed'
+_PENDING_KEY = 'pending_changes'
+
+_SNAPSHOTS = {
+    TimeEntry: EntrySnapshot,
+    Service: ServiceSnapshot,
+}
+
+
+class ChangeFeed:
+    """Subscribers to the committed changes of one database."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        """Call ``callback(changes)`` with the list of ``Change`` of every commit."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Stop calling ``callback``."""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def publish(self, changes):
+        """Deliver ``changes`` to every subscriber."""
+        if not changes:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(changes)
+
+    def publish_reset(self, table):
+        """Tell the subscribers that ``table`` changed in bulk and must be reloaded."""
+        self.publish([Change(table, None, None)])
+
+
+def _snapshot(target, old=False):
+    """Snapshot of ``target``'s row, as loaded (``old``) or as just flushed."""
+    snapshot = _SNAPSHOTS[type(target)]
+    state = inspect(target)
+    values = []
+    for name in snapshot._fields:
+        value = state.dict.get(name)
+        if old:
+            history = state.attrs[name].history
+            if history.deleted:
+                value = history.deleted[0]
+        if isinstance(value, datetime):
+            value = to_local(value)  # As loaded, even if an aware value was assigned
+        values.append(value)
+    return snapshot(*values)
+
+
+def _record(target, old, new):
+    session = object_session(target)
+    if session is None or FEED_KEY not in session.info:
+        return
+    if old != new:
+        session.info.setdefault(_PENDING_KEY, []).append(Change(type(target).__tablename__, old, new))
+
+
+def _after_insert(mapper, connection, target):
+    _record(target, None, _snapshot(target))
+
+
+def _after_update(mapper, connection, target):
+    # Updates touching none of the snapshot's columns (heartbeats) are skipped
+    _record(target, _snapshot(target, old=True), _snapshot(target))
+
+
+def _after_delete(mapper, connection, target):
+    _record(target, _snapshot(target, old=True), None)
+
+
+for _model in _SNAPSHOTS:
+    event.listen(_model, 'after_insert', _after_insert)
+    event.listen(_model, 'after_update', _after_update)
+    event.listen(_model, 'after_delete', _after_delete)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_after_commit(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        session.info[FEED_KEY].publish(changes)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
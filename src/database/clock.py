@@ -0,0 +1,105 @@
+"""Time zone handling for Mycket application.
+
+Entry times are stored in UTC, so they stay ordered and their differences
+stay exact across DST changes. The rest of the application keeps working
+with naive local datetimes (what the user reads, and the days reports and
+invoices are made of): ``UTCDateTime`` converts at the database boundary.
+
+    entry.start_time = datetime.now()   # Local, stored as UTC
+    entry.start_time = utc_now()        # Aware values work too
+    entry.start_time                    # Naive local when loaded
+"""
+
+import time as _time
+from datetime import datetime, time, timedelta, timezone
+from functools import lru_cache
+
+from sqlalchemy import DateTime
+from sqlalchemy.types import TypeDecorator
+
+
+_DAY = timedelta(days=1) - timedelta(microseconds=1)
+
+
+# Converting through the C library costs microseconds per value, too much
+# for every row of a report: the offset is looked up once per day instead,
+# and only the days of a DST change take the slow path. Days are keyed by
+# ordinal (cheaper than truncating the datetime) and by the time zone,
+# which tests (and ``time.tzset``) may change.
+
+@lru_cache(maxsize=16384)
+def _offset_of_utc_day(day, tzname, timezone_):
+    start = datetime.fromordinal(day).replace(tzinfo=timezone.utc)
+    offsets = {instant.astimezone().utcoffset() for instant in (start, start + _DAY)}
+    return offsets.pop() if len(offsets) == 1 else None
+
+
+@lru_cache(maxsize=16384)
+def _offset_of_local_day(day, tzname, timezone_):
+    start = datetime.fromordinal(day)
+    # Its neighbours too: local times skipped by a DST change are not resolved consistently
+    instants = (start - _DAY, start, start + _DAY, start + 2 * _DAY)
+    offsets = {instant.astimezone().utcoffset() for instant in instants}
+    return offsets.pop() if len(offsets) == 1 else None
+
+
+def utc_now():
+    """Return the current time as an aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
+
+def to_utc_naive(value):
+    """Return ``value`` as the naive UTC datetime stored in the database; naive values are local time."""
+    try:
+        if value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        offset = _offset_of_local_day(value.toordinal(), _time.tzname, _time.timezone)
+        if offset is None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value - offset
+    except (OverflowError, ValueError):
+        return value  # datetime.min / datetime.max, used as open bounds
+
+
+def to_utc(value):
+    """Return ``value`` as an aware UTC datetime; naive values are local time."""
+    return to_utc_naive(value).replace(tzinfo=timezone.utc)
+
+
+def utc_naive_to_local(value):
+    """Return the naive local datetime of a naive UTC one."""
+    offset = _offset_of_utc_day(value.toordinal(), _time.tzname, _time.timezone)
+    if offset is None:
+        return value.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    return value + offset
+
+
+def to_local(value):
+    """Return ``value`` as a naive local datetime; naive values are already local."""
+    if value.tzinfo is None:
+        return value
+    return utc_naive_to_local(value.astimezone(timezone.utc).replace(tzinfo=None))
+
+
+class UTCDateTime(TypeDecorator):
+    """
+    DATETIME column stored in UTC.
+
+    Binds naive local or aware datetimes (and dates, as local midnight);
+    loads naive local datetimes.
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, datetime):
+            value = datetime.combine(value, time.min)
+        return to_utc_naive(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return utc_naive_to_local(value)
@@ -0,0 +1,111 @@
+"""Time entry queries for Mycket application.
+
+The entry history is read in pages, newest first, with keyset pagination on
+``(start_time, id)``: each page continues after the last row of the previous
+one, so a page costs the same index range scan however far back it is,
+where an OFFSET would scan and drop every row before it.
+"""
+
+from collections import namedtuple
+
+from sqlalchemy import select, tuple_
+
+from .models import TimeEntry
+from .reporting import as_datetime, duration_hours_expr, entry_key_values
+from .search import match_expression, matching_entry_ids
+
+
+EntryRow = namedtuple('EntryRow', ['service_id', 'start_time', 'end_time', 'hours', 'notes', 'entry_id'])
+
+# Filters of the entry history; None means no filter
+EntryFilters = namedtuple('EntryFilters', ['service_id', 'start', 'end', 'text'], defaults=(None, None, None, None))
+
+# Entries per page of the history
+PAGE_SIZE = 200
+
+
+def entry_key(row):
+    """Sort key of an ``EntryRow``: pages continue after the key of their last row."""
+    return (row.start_time, row.entry_id)
+
+
+def entry_conditions(filters):
+    """Return the WHERE clauses of ``EntryFilters``."""
+    if filters is None:
+        return []
+    conditions = []
+    if filters.service_id is not None:
+        conditions.append(TimeEntry.service_id == filters.service_id)
+    if filters.start is not None:
+        conditions.append(TimeEntry.start_time >= as_datetime(filters.start))
+    if filters.end is not None:
+        conditions.append(TimeEntry.start_time <= as_datetime(filters.end, end_of_day=True))
+    expression = match_expression(filters.text)
+    if expression is not None:
+        # Full-text index lookup instead of scanning every note
+        conditions.append(TimeEntry.id.in_(matching_entry_ids(expression)))
+    return conditions
+
+
+def entry_matches(entry, filters):
+    """
+    Tell whether an entry passes ``EntryFilters`` in Python, like ``entry_conditions``.
+
+    ``entry`` is anything with the columns of ``TimeEntry``, e.g. a snapshot
+    of the change feed. The text filter needs the full-text index: it is not
+    checked here.
+    """
+    if filters is None:
+        return True
+    if filters.service_id is not None and entry.service_id != filters.service_id:
+        return False
+    if filters.start is not None and entry.start_time < as_datetime(filters.start):
+        return False
+    if filters.end is not None and entry.start_time > as_datetime(filters.end, end_of_day=True):
+        return False
+    return True
+
+
+def entry_row(entry):
+    """Return the ``EntryRow`` of an entry (anything with the columns of ``TimeEntry``)."""
+    hours = entry.duration_seconds / 3600.0 if entry.duration_seconds is not None else None
+    return EntryRow(entry.service_id, entry.start_time, entry.end_time, hours, entry.notes, entry.id)
+
+
+def entries_query(filters=None, after=None, limit=PAGE_SIZE):
+    """
+    Return the SELECT producing a page of ``EntryRow``, newest first.
+
+    Args:
+        filters: Optional ``EntryFilters``.
+        after: ``entry_key`` of the last row already shown, or None for the first page.
+        limit: Rows per page.
+    """
+    query = (
+        select(
+            TimeEntry.service_id,  # Names are resolved by the caller's service catalog
+            TimeEntry.start_time,
+            TimeEntry.end_time,
+            duration_hours_expr(),  # NULL while the timer is running
+            TimeEntry.notes,
+            TimeEntry.id,
+        )
+        .where(*entry_conditions(filters))
+        .order_by(TimeEntry.start_time.desc(), TimeEntry.id.desc())
+        .limit(limit)
+    )
+    if after is not None:
+        query = query.where(tuple_(TimeEntry.start_time, TimeEntry.id) < entry_key_values(*after))
+    return query
+
+
+def fetch_entries_page(session, filters=None, after=None, limit=PAGE_SIZE):
+    """Return a page of time entries as ``EntryRow``, newest first (see ``entries_query``)."""
+    return [EntryRow(*row) for row in session.execute(entries_query(filters, after, limit))]
+
+
+def fetch_entry(session, entry_id, filters=None):
+    """Return one entry as ``EntryRow``, or None if missing or not matching ``filters``."""
+    query = entries_query(filters, limit=1).where(TimeEntry.id == entry_id)
+    row = session.execute(query).first()
+    return EntryRow(*row) if row is not None else None
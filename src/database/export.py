@@ -0,0 +1,141 @@
+"""CSV export of reports and invoices for Mycket application.
+
+Rows are streamed from the database straight into ``csv.writer``, so exports
+run in constant memory whatever the size of the period.
+"""
+
+import csv
+from collections import namedtuple
+from .clock import utc_naive_to_local
+from .invoicing import get_invoice, invoice_rows_query
+from .money import format_cents
+from .reporting import ReportRow, ReportTotals, report_rows_query
+
+
+REPORT_HEADERS = ["Data", "Servizio", "Inizio", "Fine", "Ore", "Importo (€)"]
+
+ExportResult = namedtuple('ExportResult', ['row_count', 'totals'])
+
+# Rows written between two progress callbacks
+PROGRESS_INTERVAL = 1000
+
+
+def format_report_row(row):
+    """Format a ``ReportRow`` as the CSV cells of a report line."""
+    return [
+        row.start_time.strftime("%d/%m/%Y"),
+        row.service_name,
+        row.start_time.strftime("%H:%M"),
+        row.end_time.strftime("%H:%M"),
+        f"{row.hours:.2f}",
+        format_cents(row.amount_cents),
+    ]
+
+
+def stream_report_rows(session, start, end, service_id=None, batch_size=1000):
+    """Yield the ``ReportRow`` of a period from a streaming cursor."""
+    query = report_rows_query(start, end, service_id).execution_options(yield_per=batch_size)
+    for row in session.execute(query):
+        yield ReportRow(*row)
+
+
+def stream_invoice_rows(session, invoice_id, batch_size=1000):
+    """Yield the lines of an invoice as ``ReportRow``, from ``invoice_lines`` only."""
+    query = invoice_rows_query(invoice_id).execution_options(yield_per=batch_size)
+    for row in session.execute(query):
+        yield ReportRow(*row)
+
+
+def _write_rows(writer, rows, progress=None):
+    """Write report lines, returning their count and exact totals."""
+    row_count = 0
+    total_seconds = 0
+    total_cents = 0
+    for row in rows:
+        writer.writerow(format_report_row(row))
+        row_count += 1
+        total_seconds += row.seconds
+        total_cents += row.amount_cents
+        if progress is not None and row_count % PROGRESS_INTERVAL == 0:
+            progress(row_count)
+    return ExportResult(row_count, ReportTotals(total_seconds, total_cents))
+
+
+def write_report_csv(session, csvfile, start, end, service_id=None, progress=None):
+    """
+    Write a report as CSV.
+
+    Args:
+        session: Database session.
+        csvfile: Text file opened with ``newline=''``.
+        start: First day of the period.
+        end: Last day of the period, inclusive.
+        service_id: Restrict to a single service. If None, all services.
+        progress: Optional callback receiving the number of lines written so far.
+
+    Returns:
+        ``ExportResult`` with the number of lines and their ``ReportTotals``.
+    """
+    writer = csv.writer(csvfile)
+    writer.writerow(REPORT_HEADERS)
+    result = _write_rows(writer, stream_report_rows(session, start, end, service_id), progress)
+
+    # Write summary
+    writer.writerow([])
+    writer.writerow(["Totale Ore", f"{result.totals.hours:.2f}"])
+    writer.writerow(["Importo Totale", f"{format_cents(result.totals.amount_cents)}€"])
+    return result
+
+
+def write_invoice_csv(session, csvfile, invoice_number, issued_on=None, progress=None):
+    """
+    Write an invoice as CSV: header, one line per entry and totals.
+
+    The lines are the ones stored when the invoice was created: writing it
+    again gives the same file, whatever changed in the entries since.
+
+    Args:
+        session: Database session.
+        csvfile: Text file opened with ``newline=''``.
+        invoice_number: Number of the invoice.
+        issued_on: Issue date. If None, the day the invoice was created.
+        progress: Optional callback receiving the number of lines written so far.
+
+    Returns:
+        ``ExportResult`` with the number of lines and their ``ReportTotals``.
+
+    Raises:
+        InvoiceNotFoundError: No invoice has that number.
+    """
+    invoice = get_invoice(session, invoice_number)
+    start, end = invoice.period_start, invoice.period_end
+    issued_on = issued_on or utc_naive_to_local(invoice.created_at)
+    writer = csv.writer(csvfile)
+
+    # Invoice header
+    writer.writerow(["FATTURA"])
+    writer.writerow(["Numero Fattura", invoice_number])
+    writer.writerow(["Data", issued_on.strftime("%d/%m/%Y")])
+    writer.writerow(["Periodo", f"{start.strftime('%d/%m/%Y')} - {end.strftime('%d/%m/%Y')}"])
+    writer.writerow([])
+
+    writer.writerow(REPORT_HEADERS)
+    result = _write_rows(writer, stream_invoice_rows(session, invoice.id), progress)
+
+    # Totals
+    writer.writerow([])
+    writer.writerow(["", "", "", "", "TOTALE ORE:", f"{result.totals.hours:.2f}"])
+    writer.writerow(["", "", "", "", "TOTALE €:", format_cents(result.totals.amount_cents)])
+    return result
+
+
+def export_report_csv(session, filename, start, end, service_id=None, progress=None):
+    """Write a report to ``filename``, see ``write_report_csv``."""
+    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+        return write_report_csv(session, csvfile, start, end, service_id, progress)
+
+
+def export_invoice_csv(session, filename, invoice_number, issued_on=None, progress=None):
+    """Write an invoice to ``filename``, see ``write_invoice_csv``."""
+    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+        return write_invoice_csv(session, csvfile, invoice_number, issued_on, progress)
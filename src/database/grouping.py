@@ -0,0 +1,210 @@
+"""Grouped totals and pivots for Mycket application.
+
+Summaries such as hours per service per week or revenue per month are
+grouped by SQLite from the daily rollup (``daily_service_totals``): a
+query reads at most one row per day and service of the period, however
+many entries it has. Results come back column by column in typed arrays,
+and ``pivot`` lays two groupings out as a crosstab with subtotals:
+
+    grouped = fetch_grouped_totals(session, start, end, ['service', 'week'])
+    crosstab = pivot(grouped)
+    crosstab.value('seconds', row, column), crosstab.row_total('seconds', row)
+"""
+
+from array import array
+from datetime import date
+
+from sqlalchemy import func, literal_column, select
+
+from .models import DailyServiceTotal
+from .reporting import ReportTotals
+
+
+# date() modifiers turning a day into the first day of its bucket. Rollup
+# days are already local days, so no 'localtime' here; weeks start on Monday.
+TIME_BUCKETS = {
+    'day': (),
+    'week': ('weekday 0', '-6 days'),
+    'month': ('start of month',),
+    'year': ('start of year',),
+}
+
+GROUPINGS = (*TIME_BUCKETS, 'service')
+
+# Summed columns of a group, integer seconds and cents
+MEASURES = ('seconds', 'amount_cents')
+
+
+def bucket_expr(grouping):
+    """
+    SQL expression for the group of a rollup row: the service id, or the first day of its bucket.
+
+    Raises:
+        ValueError: If the grouping is unknown.
+    """
+    if grouping == 'service':
+        return DailyServiceTotal.service_id
+    if grouping not in TIME_BUCKETS:
+        raise ValueError(
+            f"Unknown grouping '{grouping}' (expected one of: {', '.join(GROUPINGS)})"
+        )
+    modifiers = [literal_column(f"'{modifier}'") for modifier in TIME_BUCKETS[grouping]]
+    return func.date(DailyServiceTotal.day, *modifiers)
+
+
+class GroupedTotals:
+    """
+    Totals per group, stored column by column.
+
+    ``keys[i]`` holds the group values of ``groupings[i]``: service ids in
+    an ``array('q')``, or the first days of time buckets as ``date``.
+    The summed measures are ``array('q')`` columns of the same length.
+    """
+
+    def __init__(self, groupings):
+        self.groupings = tuple(groupings)
+        self.keys = [array('q') if grouping == 'service' else [] for grouping in self.groupings]
+        self.seconds = array('q')
+        self.amount_cents = array('q')
+        self.entry_count = array('q')
+
+    def append(self, keys, seconds, amount_cents, entry_count):
+        """Append one group."""
+        for column, key in zip(self.keys, keys):
+            column.append(key)
+        self.seconds.append(seconds)
+        self.amount_cents.append(amount_cents)
+        self.entry_count.append(entry_count)
+
+    def rows(self):
+        """Iterate over the groups as ``(*keys, seconds, amount_cents, entry_count)`` tuples."""
+        return zip(*self.keys, self.seconds, self.amount_cents, self.entry_count)
+
+    @property
+    def totals(self):
+        """``ReportTotals`` of all the groups."""
+        return ReportTotals(sum(self.seconds), sum(self.amount_cents))
+
+    def __len__(self):
+        return len(self.seconds)
+
+
+def grouped_totals_query(start, end, groupings, service_id=None):
+    """Return the SELECT summing the rollup of a period per group, ordered by group."""
+    buckets = [bucket_expr(grouping).label(f'group_{index}') for index, grouping in enumerate(groupings)]
+    query = (
+        select(
+            *buckets,
+            func.sum(DailyServiceTotal.seconds),
+            func.sum(DailyServiceTotal.amount_cents),
+            func.sum(DailyServiceTotal.entry_count),
+        )
+        .where(DailyServiceTotal.day >= start, DailyServiceTotal.day <= end)
+        .group_by(*buckets)
+        .order_by(*buckets)
+    )
+    if service_id is not None:
+        query = query.where(DailyServiceTotal.service_id == service_id)
+    return query
+
+
+def fetch_grouped_totals(session, start, end, groupings, service_id=None):
+    """
+    Sum the completed entries of a period per group.
+
+    Args:
+        session: Database session.
+        start: First day of the period.
+        end: Last day of the period, inclusive.
+        groupings: Names from ``GROUPINGS``, e.g. ``['service', 'month']``.
+        service_id: Restrict to a single service. If None, all services.
+
+    Returns:
+        ``GroupedTotals`` ordered by group.
+
+    Raises:
+        ValueError: If a grouping is unknown or repeated.
+    """
+    if len(set(groupings)) != len(groupings):
+        raise ValueError(f"Repeated grouping in {list(groupings)}")
+    grouped = GroupedTotals(groupings)
+    count = len(grouped.groupings)
+    for row in session.execute(grouped_totals_query(start, end, grouped.groupings, service_id)):
+        keys = [
+            key if grouping == 'service' else date.fromisoformat(key)
+            for grouping, key in zip(grouped.groupings, row[:count])
+        ]
+        grouped.append(keys, *row[count:])
+    return grouped
+
+
+class Crosstab:
+    """
+    Two groupings laid out as a grid: one row per key of the first, one column per key of the second.
+
+    Each measure is a row-major ``array('q')`` of ``len(row_keys) * len(column_keys)``
+    cells, zero where a pair has no entries; ``to_numpy`` views it as a
+    matrix without copying.
+    """
+
+    def __init__(self, row_keys, column_keys):
+        self.row_keys = list(row_keys)
+        self.column_keys = list(column_keys)
+        size = len(self.row_keys) * len(self.column_keys)
+        self.seconds = array('q', bytes(size * 8))
+        self.amount_cents = array('q', bytes(size * 8))
+
+    def _cells(self, measure):
+        if measure not in MEASURES:
+            raise ValueError(f"Unknown measure '{measure}' (expected one of: {', '.join(MEASURES)})")
+        return getattr(self, measure)
+
+    def value(self, measure, row, column):
+        """Return a cell of ``measure``."""
+        return self._cells(measure)[row * len(self.column_keys) + column]
+
+    def row_total(self, measure, row):
+        """Return the subtotal of a row."""
+        width = len(self.column_keys)
+        return sum(self._cells(measure)[row * width:(row + 1) * width])
+
+    def column_total(self, measure, column):
+        """Return the subtotal of a column."""
+        return sum(self._cells(measure)[column::len(self.column_keys)])
+
+    def total(self, measure):
+        """Return the grand total of ``measure``."""
+        return sum(self._cells(measure))
+
+    def to_numpy(self, measure):
+        """
+        Return ``measure`` as an int64 NumPy matrix sharing the cells' memory.
+
+        Raises:
+            ImportError: If NumPy is not installed (it is optional).
+        """
+        import numpy
+
+        matrix = numpy.frombuffer(self._cells(measure), dtype=numpy.int64)
+        return matrix.reshape(len(self.row_keys), len(self.column_keys))
+
+
+def pivot(grouped):
+    """
+    Lay out ``GroupedTotals`` of two groupings as a ``Crosstab``.
+
+    Raises:
+        ValueError: If ``grouped`` does not have exactly two groupings.
+    """
+    if len(grouped.groupings) != 2:
+        raise ValueError(f"A pivot needs two groupings, not {list(grouped.groupings)}")
+    row_keys, column_keys = (sorted(set(keys)) for keys in grouped.keys)
+    crosstab = Crosstab(row_keys, column_keys)
+    rows = {key: index for index, key in enumerate(row_keys)}
+    columns = {key: index for index, key in enumerate(column_keys)}
+    width = len(column_keys)
+    for row_key, column_key, seconds, amount_cents, _ in grouped.rows():
+        cell = rows[row_key] * width + columns[column_key]
+        crosstab.seconds[cell] = seconds
+        crosstab.amount_cents[cell] = amount_cents
+    return crosstab
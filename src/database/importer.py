@@ -0,0 +1,257 @@
+"""Bulk import of time entries from CSV and JSON files for Mycket application.
+
+Input files are streamed and validated record by record; the valid entries
+are written with one driver-level ``executemany`` per batch, each batch in
+its own short transaction together with its days of the rollup, so memory
+use stays constant and the write lock is held only while a batch is
+written. The lock is taken for each batch, waiting (and retrying) while
+another writer such as the GUI's timer holds it. An import that fails or is
+cancelled midway keeps the batches it already committed.
+"""
+
+import csv
+import json
+from collections import namedtuple
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from pathlib import Path
+
+from sqlalchemy import select
+
+from .clock import to_local, to_utc_naive
+from .models import Service
+from .rollup import refresh_daily_totals
+from .sessions import begin_immediate, retry_on_busy
+
+
+# Entries inserted per executemany() call
+BATCH_SIZE = 5000
+
+# Records read between two progress callbacks
+PROGRESS_INTERVAL = 5000
+
+# Values from entry_values() are bound in this order
+ENTRY_COLUMNS = (
+    'service_id', 'start_time', 'end_time', 'duration_seconds', 'notes', 'created_at', 'updated_at'
+)
+INSERT_ENTRY_SQL = (
+    f"INSERT INTO time_entries ({', '.join(ENTRY_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(ENTRY_COLUMNS))})"
+)
+
+ImportResult = namedtuple('ImportResult', ['imported', 'errors'])
+
+
+class EntryValidationError(ValueError):
+    """Raised for an input record that cannot become a time entry."""
+
+
+def load_service_ids(session):
+    """Return a dict mapping service names to their ids."""
+    return dict(session.execute(select(Service.name, Service.id)).all())
+
+
+def parse_timestamp(value):
+    """
+    Parse an ISO timestamp (``YYYY-MM-DD HH:MM[:SS]``).
+
+    Timestamps with a UTC offset are converted to local time, like every
+    entry time the application works with.
+    """
+    try:
+        value = datetime.fromisoformat(value.strip())
+    except (AttributeError, ValueError):
+        raise EntryValidationError(f"data/ora non valida: {value!r}")
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def sqlite_timestamp(value):
+    """Format a datetime the way SQLAlchemy stores it in SQLite."""
+    return value.isoformat(' ', 'microseconds')
+
+
+def entry_timestamp(value):
+    """Format a local entry time the way ``UTCDateTime`` stores it, in UTC."""
+    return sqlite_timestamp(to_utc_naive(value))
+
+
+def entry_values(record, service_ids, now):
+    """
+    Validate an input record and turn it into ``time_entries`` column values.
+
+    Args:
+        record: Mapping with ``service``, ``start``, ``end`` and optional ``notes``.
+        service_ids: Dict from ``load_service_ids``.
+        now: Creation/update time, already formatted by ``sqlite_timestamp``.
+
+    Returns:
+        Tuple of values in ``ENTRY_COLUMNS`` order, ready for the driver:
+        timestamps are bound as text, skipping SQLAlchemy's per-value
+        conversion, the slowest step of a bulk insert.
+
+    Raises:
+        EntryValidationError: If the record is invalid.
+    """
+    if not isinstance(record, Mapping):
+        raise EntryValidationError("record non valido")
+    service_name = str(record.get('service') or '').strip()
+    if service_name not in service_ids:
+        raise EntryValidationError(f"servizio sconosciuto: {service_name!r}")
+    start = parse_timestamp(record.get('start'))
+    end = parse_timestamp(record.get('end'))
+    if end <= start:
+        raise EntryValidationError("l'orario di fine deve essere successivo all'inizio")
+    notes = record.get('notes')
+    start, end = to_utc_naive(start), to_utc_naive(end)
+    return (
+        service_ids[service_name],
+        sqlite_timestamp(start),
+        sqlite_timestamp(end),
+        round((end - start).total_seconds()),  # money.duration_seconds: bulk inserts skip ORM events
+        (str(notes).strip() or None) if notes is not None else None,
+        now,
+        now,
+    )
+
+
+def _rollup_keys(days):
+    """Return the ``(local day, service_id)`` rollup keys of imported UTC days."""
+    keys = set()
+    for day, service_id in days:
+        start = datetime.fromisoformat(day).replace(tzinfo=timezone.utc)
+        # A UTC day spans at most two local days
+        for instant in (start, start + timedelta(days=1) - timedelta(microseconds=1)):
+            keys.add((to_local(instant).date(), service_id))
+    return keys
+
+
+def import_records(session, records, dry_run=False, progress=None):
+    """
+    Insert time entries from an iterable of records.
+
+    Records are streamed: invalid ones are skipped and reported, valid ones
+    are inserted and committed in batches of ``BATCH_SIZE`` rows as they are
+    read (see ``write_entries``), so memory use does not grow with the input.
+
+    Args:
+        session: Database session.
+        records: Iterable of mappings, see ``entry_values``.
+        dry_run: Only validate: nothing is written.
+        progress: Optional callback receiving the number of records read so
+            far; an exception raised by it stops the import, keeping the
+            batches already committed.
+
+    Returns:
+        ``ImportResult`` with the number of imported (or, in a dry run,
+        importable) entries and a list of ``(record_number, message)`` for
+        the rejected ones.
+    """
+    service_ids = load_service_ids(session)
+    now = sqlite_timestamp(datetime.utcnow())
+    imported = 0
+    errors = []
+
+    def valid_rows():
+        nonlocal imported
+        for number, record in enumerate(records, start=1):
+            if progress is not None and number % PROGRESS_INTERVAL == 0:
+                progress(number)
+            try:
+                values = entry_values(record, service_ids, now)
+            except EntryValidationError as e:
+                errors.append((number, str(e)))
+                continue
+            imported += 1
+            yield values
+
+    if dry_run:
+        for _ in valid_rows():
+            pass
+        session.rollback()
+    else:
+        write_entries(session, valid_rows())
+    return ImportResult(imported, errors)
+
+
+def write_entries(session, rows):
+    """
+    Insert rows from ``entry_values``, committing them one batch at a time.
+
+    ``rows`` may be a generator: it is read one batch of ``BATCH_SIZE`` rows
+    at a time, outside any transaction. Each batch then takes the write
+    lock (``BEGIN IMMEDIATE``, retried while another writer holds it), is
+    inserted with one ``executemany``, refreshes the daily rollup of its
+    days (bulk inserts bypass the ORM flush) and commits. If anything
+    fails, the current batch is rolled back; the previous ones stay.
+    """
+    rows = iter(rows)
+    try:
+        while batch := list(islice(rows, BATCH_SIZE)):
+            # Only the lock can be busy: once held, WAL lets the inserts and the commit through
+            retry_on_busy(lambda: begin_immediate(session))
+            session.connection().exec_driver_sql(INSERT_ENTRY_SQL, batch)
+            days = {(values[1][:10], values[0]) for values in batch}  # (UTC day, service_id)
+            refresh_daily_totals(session.connection(), _rollup_keys(days))
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+
+def read_csv_records(filename):
+    """Yield the rows of a CSV file with a header row as dicts."""
+    with open(filename, newline='', encoding='utf-8') as csvfile:
+        yield from csv.DictReader(csvfile)
+
+
+def read_json_records(filename):
+    """Yield the objects of a JSON file holding a list of entries."""
+    with open(filename, encoding='utf-8') as jsonfile:
+        data = json.load(jsonfile)
+    if not isinstance(data, list):
+        raise EntryValidationError("il file JSON deve contenere una lista di voci")
+    yield from data
+
+
+def read_jsonl_records(filename):
+    """Yield the objects of a JSON Lines file, one entry per line."""
+    with open(filename, encoding='utf-8') as jsonfile:
+        for line in jsonfile:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None  # Reported as an invalid record
+
+
+# File extension -> record reader
+RECORD_READERS = {
+    '.csv': read_csv_records,
+    '.json': read_json_records,
+    '.jsonl': read_jsonl_records,
+    '.ndjson': read_jsonl_records,
+}
+
+
+def import_file(session, filename, dry_run=False, progress=None):
+    """
+    Import time entries from a CSV, JSON or JSON Lines file.
+
+    Every format carries the fields ``service`` (name), ``start``, ``end``
+    (ISO timestamps) and optionally ``notes``; the format is chosen from the
+    file extension. CSV and JSON Lines are streamed, a JSON list is loaded
+    at once. See ``import_records`` for the other arguments.
+
+    Raises:
+        EntryValidationError: If the file format is not supported.
+    """
+    reader = RECORD_READERS.get(Path(filename).suffix.lower())
+    if reader is None:
+        raise EntryValidationError(
+            f"formato non supportato: {filename} (usa {', '.join(sorted(RECORD_READERS))})"
+        )
+    return import_records(session, reader(filename), dry_run=dry_run, progress=progress)
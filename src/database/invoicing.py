@@ -0,0 +1,135 @@
+"""Invoice creation for Mycket application.
+
+An invoice copies the entries it bills into ``invoice_lines`` when it is
+created, with one ``INSERT ... SELECT``: the lines never leave the
+database, so a period of tens of thousands of entries is billed in a single
+short transaction. The invoice is then rendered (and rendered again, the
+same) from its lines alone, whatever happens later to the entries, their
+services or their rates.
+
+Numbers run per year (``INV-2024-0001``, ``INV-2024-0002``, ...) from a
+counter in ``invoice_sequences``, incremented in the transaction that
+creates the invoice: a rollback gives the number back, and concurrent
+writers (the GUI and a batch job) wait for each other instead of taking
+the same number.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .models import Invoice, InvoiceLine, InvoiceSequence, Service, TimeEntry
+from .reporting import amount_cents_expr, report_filters
+from .sessions import begin_immediate
+
+
+# Columns of invoice_lines filled by create_invoice, in the order of invoice_lines_select
+LINE_COLUMNS = [
+    'invoice_id', 'time_entry_id', 'service_id', 'service_name', 'hourly_rate_cents',
+    'start_time', 'end_time', 'seconds', 'amount_cents',
+]
+
+
+class InvoiceNotFoundError(LookupError):
+    """No invoice has the number asked for."""
+
+
+def next_invoice_number(session, year):
+    """
+    Take the number of the next invoice issued in ``year``.
+
+    One upsert of the year's counter, in the caller's write transaction
+    (see ``begin_immediate``): the number is only used up if it commits.
+    """
+    statement = sqlite_insert(InvoiceSequence).values(year=year, last_number=1)
+    statement = statement.on_conflict_do_update(
+        index_elements=[InvoiceSequence.year],
+        set_={'last_number': InvoiceSequence.last_number + 1},
+    ).returning(InvoiceSequence.last_number)
+    number = session.execute(statement).scalar()
+    return f"INV-{year}-{number:04d}"
+
+
+def invoice_lines_select(invoice_id, start, end, service_id=None):
+    """Return the SELECT producing the ``invoice_lines`` rows of a period, in ``LINE_COLUMNS`` order."""
+    return (
+        select(
+            literal(invoice_id),
+            TimeEntry.id,
+            TimeEntry.service_id,
+            Service.name,
+            Service.hourly_rate_cents,
+            TimeEntry.start_time,
+            TimeEntry.end_time,
+            TimeEntry.duration_seconds,
+            amount_cents_expr(),  # Rounded entry by entry, like the reports
+        )
+        .join(Service, TimeEntry.service_id == Service.id)
+        .where(*report_filters(start, end, service_id))
+        .order_by(TimeEntry.start_time, TimeEntry.id)
+    )
+
+
+def create_invoice(session, start, end, service_id=None, issued_on=None):
+    """
+    Create the invoice for a billing period, with its lines.
+
+    Args:
+        session: Read-write session; the caller commits.
+        start: First day of the period.
+        end: Last day of the period, inclusive.
+        service_id: Bill a single service. If None, all services.
+        issued_on: Issue date. If None, now.
+
+    Returns:
+        The new ``Invoice``.
+    """
+    issued_on = issued_on or datetime.now()
+    begin_immediate(session)  # Number, header and lines in one write transaction
+
+    invoice = Invoice(
+        invoice_number=next_invoice_number(session, issued_on.year),
+        period_start=datetime.combine(start, datetime.min.time()),
+        period_end=datetime.combine(end, datetime.max.time()),
+        total_cents=0
+    )
+    session.add(invoice)
+    session.flush()
+    session.execute(
+        insert(InvoiceLine.__table__).from_select(LINE_COLUMNS, invoice_lines_select(invoice.id, start, end, service_id))
+    )
+    # The total is the sum of the lines, exactly
+    invoice.total_cents = session.execute(
+        select(func.coalesce(func.sum(InvoiceLine.amount_cents), 0)).where(InvoiceLine.invoice_id == invoice.id)
+    ).scalar()
+    return invoice
+
+
+def get_invoice(session, invoice_number):
+    """Return the ``Invoice`` numbered ``invoice_number``; raise ``InvoiceNotFoundError`` if none."""
+    invoice = session.execute(select(Invoice).where(Invoice.invoice_number == invoice_number)).scalar()
+    if invoice is None:
+        raise InvoiceNotFoundError(f"fattura {invoice_number} non trovata")
+    return invoice
+
+
+def invoice_rows_query(invoice_id):
+    """
+    Return the SELECT producing the lines of an invoice in ``ReportRow`` order.
+
+    Reads ``invoice_lines`` only, through its ``(invoice_id, start_time)`` index.
+    """
+    return (
+        select(
+            InvoiceLine.time_entry_id,
+            InvoiceLine.start_time,
+            InvoiceLine.end_time,
+            InvoiceLine.service_id,
+            InvoiceLine.service_name,
+            InvoiceLine.seconds,
+            InvoiceLine.amount_cents,
+        )
+        .where(InvoiceLine.invoice_id == invoice_id)
+        .order_by(InvoiceLine.start_time, InvoiceLine.id)
+    )
@@ -0,0 +1,89 @@
+"""Schema migrations for Mycket database (Alembic)."""
+
+from pathlib import Path
+
+from sqlalchemy import inspect
+from sqlalchemy.exc import OperationalError
+
+
+MIGRATIONS_DIR = Path(__file__).parent
+
+# Schema shipped with 0.1.0, before migrations existed
+BASELINE_REVISION = '0001'
+
+# Latest revision in versions/: bump it with every new migration
+# (tests/test_migrations.py checks it against Alembic's head)
+HEAD_REVISION = '0009'
+
+
+# Tables created by raw SQL in migrations, not declared in the models:
+# FTS5 indexes and their shadow tables (time_entry_fts_data, ...)
+UNMANAGED_TABLE_PREFIXES = ('time_entry_fts', 'service_fts')
+
+
+def include_name(name, type_, parent_names):
+    """Alembic filter leaving the unmanaged tables out of schema comparisons."""
+    if type_ == 'table':
+        return not name.startswith(UNMANAGED_TABLE_PREFIXES)
+    return True
+
+
+def get_config(connection=None):
+    """
+    Build an Alembic configuration for the bundled migrations.
+
+    Args:
+        connection: Open connection to migrate. If None, env.py connects on its own.
+    """
+    from alembic.config import Config
+    
+    config = Config()
+    config.set_main_option('script_location', str(MIGRATIONS_DIR))
+    if connection is not None:
+        config.attributes['connection'] = connection
+    return config
+
+
+def current_revision(engine):
+    """Return the schema revision recorded in the database, or None."""
+    with engine.connect() as connection:
+        try:
+            return connection.exec_driver_sql('SELECT version_num FROM alembic_version').scalar()
+        except OperationalError:
+            return None  # No alembic_version table
+
+
+def upgrade_schema(engine):
+    """
+    Bring a database up to the latest schema revision.
+
+    Databases created by 0.1.0 already hold the baseline tables but no
+    ``alembic_version``: they are stamped at the baseline first, so only the
+    later revisions run against them.
+    
+    Alembic is only imported when the database is not already at
+    ``HEAD_REVISION``, which keeps it out of the usual startup path.
+    
+    Args:
+        engine: Engine bound to the database to upgrade.
+    """
+    if current_revision(engine) == HEAD_REVISION:
+        return
+    
+    from alembic import command
+    
+    with engine.connect() as connection:
+        # Batch migrations recreate tables, which SQLite refuses to do for
+        # referenced tables while foreign keys are enforced
+        connection.exec_driver_sql('PRAGMA foreign_keys=OFF')
+        connection.commit()
+        try:
+            with connection.begin():
+                config = get_config(connection)
+                tables = set(inspect(connection).get_table_names())
+                if 'alembic_version' not in tables and 'time_entries' in tables:
+                    command.stamp(config, BASELINE_REVISION)
+                command.upgrade(config, 'head')
+        finally:
+            # Drop this connection so the pool reconnects with the profile's pragmas
+            connection.invalidate()
@@ -0,0 +1,41 @@
+"""Alembic environment for Mycket database migrations."""
+
+from pathlib import Path
+
+from alembic import context
+from sqlalchemy import create_engine
+
+from database.migrations import include_name
+from database.models import Base
+
+
+config = context.config
+
+
+def _default_url():
+    """URL of the user's database, used when running the alembic CLI."""
+    return f"sqlite:///{Path.home() / '.mycket' / 'mycket.db'}"
+
+
+def run_migrations(connection):
+    """Run migrations on an open connection."""
+    context.configure(
+        connection=connection,
+        target_metadata=Base.metadata,
+        include_name=include_name,
+        render_as_batch=True,  # SQLite cannot ALTER most constraints in place
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+# DatabaseManager hands over its own connection; the alembic CLI does not
+connection = config.attributes.get('connection')
+if connection is not None:
+    run_migrations(connection)
+else:
+    engine = create_engine(config.get_main_option('sqlalchemy.url') or _default_url())
+    with engine.connect() as connection:
+        run_migrations(connection)
+        connection.commit()
+    engine.dispose()
@@ -0,0 +1,55 @@
+"""Baseline schema: services, time_entries, invoices
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-10-02 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'services',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(200), nullable=False, unique=True),
+        sa.Column('hourly_rate', sa.Float(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        'time_entries',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('service_id', sa.Integer(), sa.ForeignKey('services.id'), nullable=False),
+        sa.Column('start_time', sa.DateTime(), nullable=False),
+        sa.Column('end_time', sa.DateTime(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        'invoices',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('invoice_number', sa.String(50), nullable=False, unique=True),
+        sa.Column('client_name', sa.String(200), nullable=True),
+        sa.Column('period_start', sa.DateTime(), nullable=False),
+        sa.Column('period_end', sa.DateTime(), nullable=False),
+        sa.Column('total_amount', sa.Float(), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table('invoices')
+    op.drop_table('time_entries')
+    op.drop_table('services')
@@ -0,0 +1,34 @@
+"""Indexes for time_entries hot queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Report range filter, optionally narrowed by service; history ORDER BY start_time DESC
+    op.create_index('ix_time_entries_start_time_service_id', 'time_entries', ['start_time', 'service_id'])
+    # Per-service reports and cascade deletes from services
+    op.create_index('ix_time_entries_service_id_start_time', 'time_entries', ['service_id', 'start_time'])
+    # Running timer lookup: only open entries are indexed
+    op.create_index(
+        'ix_time_entries_running', 'time_entries', ['start_time'],
+        sqlite_where=sa.text('end_time IS NULL'),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_time_entries_running', table_name='time_entries')
+    op.drop_index('ix_time_entries_service_id_start_time', table_name='time_entries')
+    op.drop_index('ix_time_entries_start_time_service_id', table_name='time_entries')
@@ -0,0 +1,59 @@
+"""Exact money: integer cents and integer durations
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('services') as batch_op:
+        batch_op.add_column(sa.Column('hourly_rate_cents', sa.Integer(), nullable=True))
+    op.execute("UPDATE services SET hourly_rate_cents = CAST(ROUND(hourly_rate * 100) AS INTEGER)")
+    with op.batch_alter_table('services') as batch_op:
+        batch_op.alter_column('hourly_rate_cents', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_column('hourly_rate')
+
+    # Plain ADD COLUMN: no table rebuild for the largest table
+    op.add_column('time_entries', sa.Column('duration_seconds', sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE time_entries "
+        "SET duration_seconds = CAST(ROUND((julianday(end_time) - julianday(start_time)) * 86400) AS INTEGER) "
+        "WHERE end_time IS NOT NULL"
+    )
+
+    with op.batch_alter_table('invoices') as batch_op:
+        batch_op.add_column(sa.Column('total_cents', sa.Integer(), nullable=True))
+    op.execute("UPDATE invoices SET total_cents = CAST(ROUND(total_amount * 100) AS INTEGER)")
+    with op.batch_alter_table('invoices') as batch_op:
+        batch_op.alter_column('total_cents', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_column('total_amount')
+
+
+def downgrade():
+    with op.batch_alter_table('invoices') as batch_op:
+        batch_op.add_column(sa.Column('total_amount', sa.Float(), nullable=True))
+    op.execute("UPDATE invoices SET total_amount = total_cents / 100.0")
+    with op.batch_alter_table('invoices') as batch_op:
+        batch_op.alter_column('total_amount', existing_type=sa.Float(), nullable=False)
+        batch_op.drop_column('total_cents')
+
+    with op.batch_alter_table('time_entries') as batch_op:
+        batch_op.drop_column('duration_seconds')
+
+    with op.batch_alter_table('services') as batch_op:
+        batch_op.add_column(sa.Column('hourly_rate', sa.Float(), nullable=True))
+    op.execute("UPDATE services SET hourly_rate = hourly_rate_cents / 100.0")
+    with op.batch_alter_table('services') as batch_op:
+        batch_op.alter_column('hourly_rate', existing_type=sa.Float(), nullable=False)
+        batch_op.drop_column('hourly_rate_cents')
@@ -0,0 +1,42 @@
+"""Daily rollup of completed time per service
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'daily_service_totals',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('service_id', sa.Integer(), nullable=False),
+        sa.Column('seconds', sa.Integer(), nullable=False),
+        sa.Column('amount_cents', sa.Integer(), nullable=False),
+        sa.Column('entry_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['service_id'], ['services.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('day', 'service_id'),
+    )
+    # Same rounding as database.money.amount_cents: per entry, half up
+    op.execute(
+        "INSERT INTO daily_service_totals (day, service_id, seconds, amount_cents, entry_count) "
+        "SELECT date(t.start_time), t.service_id, SUM(t.duration_seconds), "
+        "SUM((t.duration_seconds * s.hourly_rate_cents + 1800) / 3600), COUNT(*) "
+        "FROM time_entries t JOIN services s ON s.id = t.service_id "
+        "WHERE t.end_time IS NOT NULL "
+        "GROUP BY date(t.start_time), t.service_id"
+    )
+
+
+def downgrade():
+    op.drop_table('daily_service_totals')
@@ -0,0 +1,65 @@
+"""Full-text search over entry notes and services (FTS5)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+
+
+# Revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+# External-content indexes: the text stays in time_entries and services,
+# the FTS tables only hold the index. remove_diacritics lets "attivita"
+# find "attività".
+STATEMENTS = [
+    "CREATE VIRTUAL TABLE time_entry_fts USING fts5("
+    "notes, content='time_entries', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE VIRTUAL TABLE service_fts USING fts5("
+    "name, description, content='services', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+
+    # Every row is indexed, NULL notes included: an external-content index
+    # must mirror its content table row for row
+    "CREATE TRIGGER time_entry_fts_insert AFTER INSERT ON time_entries BEGIN "
+    "INSERT INTO time_entry_fts (rowid, notes) VALUES (new.id, new.notes); END",
+    "CREATE TRIGGER time_entry_fts_delete AFTER DELETE ON time_entries BEGIN "
+    "INSERT INTO time_entry_fts (time_entry_fts, rowid, notes) VALUES ('delete', old.id, old.notes); END",
+    # One trigger, so the old text is always removed before the new one is added
+    "CREATE TRIGGER time_entry_fts_update AFTER UPDATE OF notes ON time_entries BEGIN "
+    "INSERT INTO time_entry_fts (time_entry_fts, rowid, notes) VALUES ('delete', old.id, old.notes); "
+    "INSERT INTO time_entry_fts (rowid, notes) VALUES (new.id, new.notes); END",
+
+    "CREATE TRIGGER service_fts_insert AFTER INSERT ON services BEGIN "
+    "INSERT INTO service_fts (rowid, name, description) VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER service_fts_delete AFTER DELETE ON services BEGIN "
+    "INSERT INTO service_fts (service_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER service_fts_update AFTER UPDATE OF name, description ON services BEGIN "
+    "INSERT INTO service_fts (service_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO service_fts (rowid, name, description) VALUES (new.id, new.name, new.description); END",
+
+    "INSERT INTO time_entry_fts (time_entry_fts) VALUES ('rebuild')",
+    "INSERT INTO service_fts (service_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade():
+    for statement in STATEMENTS:
+        op.execute(statement)
+
+
+def downgrade():
+    for trigger in (
+        'time_entry_fts_insert', 'time_entry_fts_delete', 'time_entry_fts_update',
+        'service_fts_insert', 'service_fts_delete', 'service_fts_update',
+    ):
+        op.execute(f"DROP TRIGGER {trigger}")
+    op.execute("DROP TABLE time_entry_fts")
+    op.execute("DROP TABLE service_fts")
@@ -0,0 +1,40 @@
+"""Entry times in UTC and running timer heartbeat
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+# Stored as 'YYYY-MM-DD HH:MM:SS.ffffff': datetime() drops the fraction,
+# so it is carried over from the original value
+CONVERT = (
+    "UPDATE time_entries SET {column} = datetime({column}, '{modifier}') || substr({column}, 20) "
+    "WHERE {column} IS NOT NULL"
+)
+
+
+def upgrade():
+    # ADD COLUMN does not recreate the table: the full-text triggers stay
+    op.add_column('time_entries', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+    # Local times (in the time zone of the machine running the upgrade) to UTC;
+    # durations are kept as they were billed
+    for column in ('start_time', 'end_time'):
+        op.execute(CONVERT.format(column=column, modifier='utc'))
+
+
+def downgrade():
+    for column in ('start_time', 'end_time'):
+        op.execute(CONVERT.format(column=column, modifier='localtime'))
+    # Native DROP COLUMN (SQLite 3.35+): a batch recreation would drop the full-text triggers
+    op.execute("ALTER TABLE time_entries DROP COLUMN heartbeat_at")
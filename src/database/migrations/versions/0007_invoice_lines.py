@@ -0,0 +1,45 @@
+"""Invoice line items
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Invoices issued before have no lines: which service they billed was not recorded
+    op.create_table(
+        'invoice_lines',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('invoice_id', sa.Integer(), nullable=False),
+        sa.Column('time_entry_id', sa.Integer(), nullable=True),
+        sa.Column('service_id', sa.Integer(), nullable=True),
+        sa.Column('service_name', sa.String(length=200), nullable=False),
+        sa.Column('hourly_rate_cents', sa.Integer(), nullable=False),
+        sa.Column('start_time', sa.DateTime(), nullable=False),
+        sa.Column('end_time', sa.DateTime(), nullable=False),
+        sa.Column('seconds', sa.Integer(), nullable=False),
+        sa.Column('amount_cents', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['invoice_id'], ['invoices.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['time_entry_id'], ['time_entries.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['service_id'], ['services.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_invoice_lines_invoice_id_start_time', 'invoice_lines', ['invoice_id', 'start_time'])
+    op.create_index('ix_invoice_lines_time_entry_id', 'invoice_lines', ['time_entry_id'])
+
+
+def downgrade():
+    op.drop_index('ix_invoice_lines_time_entry_id', table_name='invoice_lines')
+    op.drop_index('ix_invoice_lines_invoice_id_start_time', table_name='invoice_lines')
+    op.drop_table('invoice_lines')
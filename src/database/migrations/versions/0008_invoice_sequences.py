@@ -0,0 +1,36 @@
+"""Per-year invoice number sequences
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'invoice_sequences',
+        sa.Column('year', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('last_number', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('year'),
+    )
+    # Numbers were counted across all years: each year continues after its highest
+    op.execute(
+        "INSERT INTO invoice_sequences (year, last_number) "
+        "SELECT CAST(substr(invoice_number, 5, 4) AS INTEGER), MAX(CAST(substr(invoice_number, 10) AS INTEGER)) "
+        "FROM invoices WHERE invoice_number GLOB 'INV-[0-9][0-9][0-9][0-9]-[0-9]*' "
+        "GROUP BY substr(invoice_number, 5, 4)"
+    )
+
+
+def downgrade():
+    op.drop_table('invoice_sequences')
@@ -0,0 +1,24 @@
+"""Index on the duration of time entries
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+
+
+# Revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # MAX(duration_seconds) in one seek: bounds how far back a conflict check looks
+    op.create_index('ix_time_entries_duration_seconds', 'time_entries', ['duration_seconds'])
+
+
+def downgrade():
+    op.drop_index('ix_time_entries_duration_seconds', table_name='time_entries')
@@ -1,10 +1,13 @@
 """Database models for Mycket application."""
 
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import create_engine, event, Column, Integer, String, Date, DateTime, ForeignKey, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 
+from .clock import UTCDateTime
+from .money import duration_seconds, from_cents, to_cents
+
 Base = declarative_base()
 
 
@@ -15,7 +18,7 @@ class Service(Base):
     
     id = Column(Integer, primary_key=True)
     name = Column(String(200), nullable=False, unique=True)
-    hourly_rate = Column(Float, nullable=False)
+    hourly_rate_cents = Column(Integer, nullable=False)
     description = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -23,6 +26,15 @@ class Service(Base):
     # Relationship
     time_entries = relationship("TimeEntry", back_populates="service", cascade="all, delete-orphan")
     
+    @property
+    def hourly_rate(self):
+        """Hourly rate in euros, for display and input widgets."""
+        return float(from_cents(self.hourly_rate_cents))
+    
+    @hourly_rate.setter
+    def hourly_rate(self, value):
+        self.hourly_rate_cents = to_cents(value)
+    
     def __repr__(self):
         return f"<Service(name='{self.name}', rate={self.hourly_rate}€/h)>"
 
@@ -34,8 +46,10 @@ class TimeEntry(Base):
     
     id = Column(Integer, primary_key=True)
     service_id = Column(Integer, ForeignKey('services.id'), nullable=False)
-    start_time = Column(DateTime, nullable=False)
-    end_time = Column(DateTime, nullable=True)  # Null if timer is running
+    start_time = Column(UTCDateTime, nullable=False)
+    end_time = Column(UTCDateTime, nullable=True)  # Null if timer is running
+    duration_seconds = Column(Integer, nullable=True)  # Set from start/end on flush
+    heartbeat_at = Column(UTCDateTime, nullable=True)  # Last sign of life of a running timer
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -43,13 +57,19 @@ class TimeEntry(Base):
     # Relationship
     service = relationship("Service", back_populates="time_entries")
     
+    __table_args__ = (
+        Index('ix_time_entries_start_time_service_id', 'start_time', 'service_id'),
+        Index('ix_time_entries_service_id_start_time', 'service_id', 'start_time'),
+        Index('ix_time_entries_running', 'start_time', sqlite_where=end_time.is_(None)),
+        Index('ix_time_entries_duration_seconds', 'duration_seconds'),
+    )
+    
     @property
     def duration_hours(self):
         """Calculate duration in hours."""
         if self.end_time is None:
             return None
-        delta = self.end_time - self.start_time
-        return delta.total_seconds() / 3600
+        return duration_seconds(self.start_time, self.end_time) / 3600
     
     @property
     def is_running(self):
@@ -61,6 +81,21 @@ class TimeEntry(Base):
         return f"<TimeEntry(service='{self.service.name if self.service else 'N/A'}', {status})>"
 
 
+class DailyServiceTotal(Base):
+    """Completed time of one service on one day, kept in step with time_entries."""
+    
+    __tablename__ = 'daily_service_totals'
+    
+    day = Column(Date, primary_key=True)  # Day of the entries' start time
+    service_id = Column(Integer, ForeignKey('services.id', ondelete='CASCADE'), primary_key=True)
+    seconds = Column(Integer, nullable=False)
+    amount_cents = Column(Integer, nullable=False)
+    entry_count = Column(Integer, nullable=False)
+    
+    def __repr__(self):
+        return f"<DailyServiceTotal(day={self.day}, service_id={self.service_id}, seconds={self.seconds})>"
+
+
 class Invoice(Base):
     """Invoice for a billing period."""
     
@@ -71,14 +106,75 @@ class Invoice(Base):
     client_name = Column(String(200), nullable=True)
     period_start = Column(DateTime, nullable=False)
     period_end = Column(DateTime, nullable=False)
-    total_amount = Column(Float, nullable=False)
+    total_cents = Column(Integer, nullable=False)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # Deleted with the invoice by the database, however many they are
+    lines = relationship("InvoiceLine", back_populates="invoice", cascade="all, delete-orphan",
+                         passive_deletes=True, order_by="[InvoiceLine.start_time, InvoiceLine.id]")
+    
+    @property
+    def total_amount(self):
+        """Invoice total in euros, for display."""
+        return float(from_cents(self.total_cents))
+    
     def __repr__(self):
         return f"<Invoice(number='{self.invoice_number}', amount={self.total_amount}€)>"
 
 
+class InvoiceSequence(Base):
+    """Last invoice number issued in a year."""
+    
+    __tablename__ = 'invoice_sequences'
+    
+    year = Column(Integer, primary_key=True, autoincrement=False)
+    last_number = Column(Integer, nullable=False)
+    
+    def __repr__(self):
+        return f"<InvoiceSequence(year={self.year}, last_number={self.last_number})>"
+
+
+class InvoiceLine(Base):
+    """
+    One entry billed by an invoice, as it was billed.
+
+    Service, rate, duration and amount are copied when the invoice is
+    created: later edits of the entry or the service do not change it, and
+    deleting them only unlinks the line.
+    """
+    
+    __tablename__ = 'invoice_lines'
+    
+    id = Column(Integer, primary_key=True)
+    invoice_id = Column(Integer, ForeignKey('invoices.id', ondelete='CASCADE'), nullable=False)
+    time_entry_id = Column(Integer, ForeignKey('time_entries.id', ondelete='SET NULL'), nullable=True)
+    service_id = Column(Integer, ForeignKey('services.id', ondelete='SET NULL'), nullable=True)
+    service_name = Column(String(200), nullable=False)
+    hourly_rate_cents = Column(Integer, nullable=False)
+    start_time = Column(UTCDateTime, nullable=False)
+    end_time = Column(UTCDateTime, nullable=False)
+    seconds = Column(Integer, nullable=False)
+    amount_cents = Column(Integer, nullable=False)
+    
+    invoice = relationship("Invoice", back_populates="lines")
+    
+    __table_args__ = (
+        Index('ix_invoice_lines_invoice_id_start_time', 'invoice_id', 'start_time'),
+        Index('ix_invoice_lines_time_entry_id', 'time_entry_id'),
+    )
+    
+    def __repr__(self):
+        return f"<InvoiceLine(invoice_id={self.invoice_id}, service='{self.service_name}', seconds={self.seconds})>"
+
+
+@event.listens_for(TimeEntry, 'before_insert')
+@event.listens_for(TimeEntry, 'before_update')
+def _store_duration(mapper, connection, target):
+    """Keep ``duration_seconds`` in step with start and end times."""
+    target.duration_seconds = duration_seconds(target.start_time, target.end_time)
+
+
 # Database initialization
 def init_db(db_path='mycket.db'):
     """Initialize database and return session."""
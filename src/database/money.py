@@ -0,0 +1,45 @@
+"""Exact money arithmetic for Mycket application.
+
+Amounts are stored as integer euro cents and durations as integer seconds.
+An entry's amount is rounded to the cent once, and totals are exact sums of
+those amounts, so an invoice always equals the sum of its lines.
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from .clock import to_utc
+
+
+def to_cents(value):
+    """Convert an amount in euros (float, str or Decimal) to integer cents."""
+    return int((Decimal(str(value)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    """Convert integer cents to an exact ``Decimal`` amount in euros."""
+    return Decimal(cents) / 100
+
+
+def format_cents(cents):
+    """Format integer cents as ``'1234.56'``."""
+    return f"{from_cents(cents):.2f}"
+
+
+def duration_seconds(start, end):
+    """
+    Return the whole seconds between two datetimes, or None if ``end`` is None.
+
+    Measured in UTC, so an entry across a DST change lasts what it really lasted.
+    """
+    if end is None:
+        return None
+    return round((to_utc(end) - to_utc(start)).total_seconds())
+
+
+def amount_cents(seconds, hourly_rate_cents):
+    """
+    Amount billed for ``seconds`` of work, rounded half up to the cent.
+
+    Matches ``reporting.amount_cents_expr`` exactly.
+    """
+    return (seconds * hourly_rate_cents + 1800) // 3600
@@ -0,0 +1,135 @@
+"""Overlap detection for time entries in Mycket application.
+
+Both checks rely on entries sorted by start time, which the
+``start_time`` indexes of ``time_entries`` provide:
+
+- ``find_conflicts`` checks one new interval with a few bounded index scans;
+- ``find_overlaps`` sweeps all entries of a period once, in start order,
+  keeping the entries still open in start order and in a heap keyed by
+  end time.
+
+Running entries (no end time yet) are treated as lasting until ``now`` by
+the sweep, and as open-ended when checking a new interval.
+"""
+
+import heapq
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from .clock import to_utc
+from .models import TimeEntry
+from .reporting import as_datetime
+
+
+# A time entry seen as an interval
+Interval = namedtuple('Interval', ['entry_id', 'service_id', 'start_time', 'end_time'])
+
+# Two entries sharing the time from ``start_time`` to ``end_time``
+Overlap = namedtuple('Overlap', ['first', 'second', 'start_time', 'end_time'])
+
+
+def _interval_columns():
+    return (TimeEntry.id, TimeEntry.service_id, TimeEntry.start_time, TimeEntry.end_time)
+
+
+def find_conflicts(session, start, end=None, exclude_id=None):
+    """
+    Return the entries overlapping the interval ``[start, end)``.
+
+    Bounded index scans, whatever the size of the history: the entries
+    starting inside the interval; the completed ones starting earlier, no
+    further back than the longest entry lasts (``MAX(duration_seconds)``,
+    one seek of its index), so even a long entry hidden behind shorter
+    ones is found; and the running ones, from their partial index.
+    Running entries are open-ended: a new interval conflicts with the
+    timer if it ends after the timer started, even in the future.
+
+    Args:
+        session: Database session.
+        start: Start of the new entry.
+        end: End of the new entry. If None, a timer starting at ``start``.
+        exclude_id: Entry to ignore, e.g. the one being edited.
+
+    Returns:
+        List of ``Interval``, by start time.
+    """
+    end = end or datetime.max
+    exclude = [TimeEntry.id != exclude_id] if exclude_id is not None else []
+    longest = session.execute(select(func.max(TimeEntry.duration_seconds))).scalar() or 0
+
+    within = select(*_interval_columns()).where(
+        TimeEntry.start_time >= start, TimeEntry.start_time < end, *exclude
+    )
+    earlier = select(*_interval_columns()).where(
+        # In UTC: a local time minus a duration may fall across a DST change
+        TimeEntry.start_time >= to_utc(start) - timedelta(seconds=longest),
+        TimeEntry.start_time < start,
+        TimeEntry.end_time > start,
+        *exclude
+    )
+    running = select(*_interval_columns()).where(
+        TimeEntry.end_time.is_(None), TimeEntry.start_time < start, *exclude
+    )
+    candidates = {
+        row.id: Interval(*row)
+        for query in (within, earlier, running) for row in session.execute(query)
+    }
+    return sorted(candidates.values(), key=lambda interval: (interval.start_time, interval.entry_id))
+
+
+def iter_intervals(session, start=None, end=None, batch_size=1000):
+    """Yield the entries of a period as ``Interval``, sorted by start time."""
+    query = select(*_interval_columns()).order_by(TimeEntry.start_time, TimeEntry.id)
+    if start is not None:
+        query = query.where(TimeEntry.start_time >= as_datetime(start))
+    if end is not None:
+        query = query.where(TimeEntry.start_time <= as_datetime(end, end_of_day=True))
+    for row in session.execute(query.execution_options(yield_per=batch_size)):
+        yield Interval(*row)
+
+
+def sweep_overlaps(intervals, now=None):
+    """
+    Yield every overlapping pair of ``intervals``, sorted by start time.
+
+    A single sweep in O(n log n + k) for n intervals and k overlaps. The
+    intervals still open are kept twice: in a heap by end time, to find
+    the ones that closed, and in a list in start order, which each new
+    interval walks to pair up with all of them. Closed intervals are only
+    marked in the list, and dropped once they are half of it, so a walk
+    costs at most twice the overlaps it yields.
+    """
+    now = now or datetime.now()
+    ends = []  # Heap of (end, entry_id) of the open intervals
+    open_intervals = []  # In start order, with closed ones until compacted
+    closed = set()
+    for interval in intervals:
+        while ends and ends[0][0] <= interval.start_time:
+            closed.add(heapq.heappop(ends)[1])
+        if len(closed) * 2 > len(open_intervals):
+            open_intervals = [other for other in open_intervals if other.entry_id not in closed]
+            closed.clear()
+        end = interval.end_time or now
+        for other in open_intervals:
+            if other.entry_id not in closed:
+                yield Overlap(other, interval, interval.start_time, min(end, other.end_time or now))
+        heapq.heappush(ends, (end, interval.entry_id))
+        open_intervals.append(interval)
+
+
+def find_overlaps(session, start=None, end=None, now=None):
+    """
+    List the overlapping entries of a period (or of the whole database).
+
+    Args:
+        session: Database session.
+        start: First day (or instant) of the period. If None, no lower bound.
+        end: Last day (or instant), inclusive. If None, no upper bound.
+        now: End assumed for running entries. If None, now.
+
+    Returns:
+        List of ``Overlap``, each pair once.
+    """
+    return list(sweep_overlaps(iter_intervals(session, start, end), now))
@@ -0,0 +1,298 @@
+"""Opt-in query profiling for Mycket application.
+
+A ``QueryProfiler`` attached to an engine records, for every statement:
+
+- how many times it ran, its total and worst time, and the rows it returned
+  or changed;
+- runs of the same SELECT executed over and over in a row, the usual sign of
+  an N+1 access pattern (one query per row of a previous query);
+- a trace event, so a session can be opened in a profiler viewer
+  (chrome://tracing, Perfetto or speedscope).
+
+Named spans (``QueryProfiler.span``) time the code around the queries, such
+as UI handlers and background tasks; queries record the span they ran in.
+
+Profiling costs a few microseconds per statement and per fetch, so it is
+off unless ``DatabaseManager`` is given a profiler.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+# Consecutive executions of the same SELECT reported as a possible N+1
+N_PLUS_ONE_THRESHOLD = 10
+
+# Trace events kept in memory; the oldest are dropped first
+MAX_TRACE_EVENTS = 100_000
+
+
+class StatementStats:
+    """Aggregated timings of one SQL statement."""
+
+    __slots__ = ('statement', 'count', 'total', 'max', 'rows')
+
+    def __init__(self, statement):
+        self.statement = statement
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class SpanStats:
+    """Aggregated timings of one named span."""
+
+    __slots__ = ('name', 'count', 'total', 'max')
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class _Execution:
+    """Where the rows fetched by one execution are counted."""
+
+    __slots__ = ('stats', 'args', 'lock')
+
+    def __init__(self, stats, args, lock):
+        self.stats = stats
+        self.args = args
+        self.lock = lock
+
+    def add_rows(self, count):
+        with self.lock:
+            self.stats.rows += count
+            self.args['rows'] += count
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """Cursor counting the rows fetched for the profiler."""
+
+    execution = None
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None and self.execution is not None:
+            self.execution.add_rows(1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = super().fetchmany(*args, **kwargs)
+        if rows and self.execution is not None:
+            self.execution.add_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        if rows and self.execution is not None:
+            self.execution.add_rows(len(rows))
+        return rows
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """Connection handing out ``ProfilingCursor`` (``sqlite3.connect(factory=...)``)."""
+
+    def cursor(self, factory=ProfilingCursor):
+        return super().cursor(factory)
+
+
+def _trace_name(statement):
+    """Short label of a statement for trace viewers, e.g. ``SELECT time_entries``."""
+    words = statement.split()
+    if not words:
+        return 'SQL'
+    verb = words[0].upper()
+    keyword = {'SELECT': 'FROM', 'DELETE': 'FROM', 'INSERT': 'INTO', 'UPDATE': None}.get(verb)
+    upper = [word.upper() for word in words]
+    if keyword in upper and upper.index(keyword) + 1 < len(words):
+        return f"{verb} {words[upper.index(keyword) + 1]}"
+    if verb == 'UPDATE' and len(words) > 1:
+        return f"{verb} {words[1]}"
+    return verb
+
+
+class QueryProfiler:
+    """
+    Collects statement timings, N+1 suspects, spans and trace events.
+
+    Safe to share between the GUI thread and background workers.
+    """
+
+    def __init__(self, n_plus_one_threshold=N_PLUS_ONE_THRESHOLD, max_events=MAX_TRACE_EVENTS):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._statements = {}
+            self._spans = {}
+            self._n_plus_one = {}   # (span, statement) -> longest run
+            self._events = deque(maxlen=self.max_events)
+            self._threads = {}      # Thread id -> name, for the trace
+            self.query_count = 0
+            self.query_time = 0.0
+
+    def attach(self, engine):
+        """Start recording the statements run by ``engine``."""
+        from sqlalchemy import event
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def detach(self, engine):
+        """Stop recording the statements run by ``engine``."""
+        from sqlalchemy import event
+        event.remove(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.remove(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _timestamp(self, instant):
+        """Microseconds since the profiler was created, as trace viewers expect."""
+        return round((instant - self._origin) * 1_000_000, 1)
+
+    def _current_span(self):
+        spans = getattr(self._local, 'spans', None)
+        return spans[-1] if spans else None
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self._local.query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        end = time.perf_counter()
+        start = getattr(self._local, 'query_start', end)
+        duration = end - start
+        span = self._current_span()
+        thread = threading.current_thread()
+        # SQLite knows the rows of INSERT/UPDATE/DELETE now, those of a SELECT
+        # only as they are fetched (see ProfilingCursor)
+        rows = max(cursor.rowcount, 0)
+        args = {'sql': statement, 'rows': rows}
+        if span is not None:
+            args['span'] = span
+
+        with self._lock:
+            stats = self._statements.get(statement)
+            if stats is None:
+                stats = self._statements[statement] = StatementStats(statement)
+            stats.count += 1
+            stats.total += duration
+            stats.max = max(stats.max, duration)
+            stats.rows += rows
+            self.query_count += 1
+            self.query_time += duration
+            self._threads.setdefault(thread.ident, thread.name)
+            self._events.append({
+                'name': _trace_name(statement), 'cat': 'sql', 'ph': 'X',
+                'ts': self._timestamp(start), 'dur': self._timestamp(end) - self._timestamp(start),
+                'pid': self._pid, 'tid': thread.ident, 'args': args,
+            })
+            self._track_repetition(statement, span, executemany)
+
+        if isinstance(cursor, ProfilingCursor):
+            cursor.execution = _Execution(stats, args, self._lock)
+
+    def _track_repetition(self, statement, span, executemany):
+        """Count runs of the same SELECT on this thread (lock held)."""
+        last = getattr(self._local, 'last', None)
+        if executemany or not statement.lstrip().upper().startswith('SELECT'):
+            self._local.last = None
+            return
+        if last is not None and last[0] == statement and last[1] == span:
+            run = last[2] + 1
+        else:
+            run = 1
+        self._local.last = (statement, span, run)
+        if run >= self.n_plus_one_threshold:
+            key = (span, statement)
+            self._n_plus_one[key] = max(self._n_plus_one.get(key, 0), run)
+
+    @contextmanager
+    def span(self, name):
+        """Time the enclosed block as ``name``, also in the trace."""
+        spans = self._local.__dict__.setdefault('spans', [])
+        spans.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            spans.pop()
+            thread = threading.current_thread()
+            with self._lock:
+                stats = self._spans.get(name)
+                if stats is None:
+                    stats = self._spans[name] = SpanStats(name)
+                stats.count += 1
+                stats.total += end - start
+                stats.max = max(stats.max, end - start)
+                self._threads.setdefault(thread.ident, thread.name)
+                self._events.append({
+                    'name': name, 'cat': 'span', 'ph': 'X',
+                    'ts': self._timestamp(start), 'dur': self._timestamp(end) - self._timestamp(start),
+                    'pid': self._pid, 'tid': thread.ident,
+                })
+
+    def statements(self):
+        """Return a snapshot of ``StatementStats``, slowest in total first."""
+        with self._lock:
+            stats = [self._copy(item, StatementStats(item.statement)) for item in self._statements.values()]
+        return sorted(stats, key=lambda item: item.total, reverse=True)
+
+    def spans(self):
+        """Return a snapshot of ``SpanStats``, slowest in total first."""
+        with self._lock:
+            stats = [self._copy(item, SpanStats(item.name)) for item in self._spans.values()]
+        return sorted(stats, key=lambda item: item.total, reverse=True)
+
+    def n_plus_one(self):
+        """Return ``(span, statement, run)`` for every suspected N+1, longest run first."""
+        with self._lock:
+            suspects = [(span, statement, run) for (span, statement), run in self._n_plus_one.items()]
+        return sorted(suspects, key=lambda suspect: suspect[2], reverse=True)
+
+    @staticmethod
+    def _copy(source, target):
+        for name in source.__slots__:
+            setattr(target, name, getattr(source, name))
+        return target
+
+    def summary(self):
+        """One line for status bars and logs."""
+        with self._lock:
+            count, elapsed, suspects = self.query_count, self.query_time, len(self._n_plus_one)
+        text = f"{count} query, {elapsed * 1000:.0f} ms"
+        if suspects:
+            text += f", {suspects} possibili N+1"
+        return text
+
+    def trace(self):
+        """Return the recorded events in Trace Event Format."""
+        with self._lock:
+            events = [dict(item, args=dict(item['args'])) if 'args' in item else dict(item) for item in self._events]
+            threads = dict(self._threads)
+        metadata = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': ident, 'args': {'name': name}}
+            for ident, name in threads.items()
+        ]
+        return {'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}
+
+    def write_trace(self, filename):
+        """Write the trace as JSON, for chrome://tracing, Perfetto or speedscope."""
+        with open(filename, 'w', encoding='utf-8') as output:
+            json.dump(self.trace(), output)
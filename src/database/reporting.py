@@ -0,0 +1,191 @@
+"""Reporting queries for Mycket application.
+
+Reports are computed in SQL and returned as flat rows, so the UI never has to
+hydrate ``TimeEntry`` objects or lazy-load their services one by one.
+Durations are integer seconds and amounts integer cents, so totals are
+exact sums (see ``database.money``).
+"""
+
+from collections import namedtuple
+from datetime import date, datetime
+
+from sqlalchemy import func, select, tuple_
+
+from .models import Service, TimeEntry
+from .money import from_cents
+
+
+class ReportRow(namedtuple(
+    'ReportRow',
+    ['entry_id', 'start_time', 'end_time', 'service_id', 'service_name', 'seconds', 'amount_cents']
+)):
+    """One completed time entry of a report."""
+    
+    __slots__ = ()
+    
+    @property
+    def hours(self):
+        return self.seconds / 3600
+    
+    @property
+    def amount(self):
+        return from_cents(self.amount_cents)
+
+
+class ReportTotals(namedtuple('ReportTotals', ['seconds', 'amount_cents'])):
+    """Grand totals of a report."""
+    
+    __slots__ = ()
+    
+    @property
+    def hours(self):
+        return self.seconds / 3600
+    
+    @property
+    def amount(self):
+        return from_cents(self.amount_cents)
+
+
+Report = namedtuple('Report', ['rows', 'totals'])
+
+
+def duration_hours_expr():
+    """SQL expression for the duration of a completed entry, in hours."""
+    return TimeEntry.duration_seconds / 3600.0
+
+
+def amount_cents_expr():
+    """
+    SQL expression for the billed amount of a completed entry, in cents.
+    
+    Integer arithmetic rounding half up, like ``money.amount_cents``.
+    """
+    return (TimeEntry.duration_seconds * Service.hourly_rate_cents + 1800) // 3600
+
+
+def as_datetime(value, end_of_day=False):
+    """Widen a date to the first (or last) instant of that day."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.max.time() if end_of_day else datetime.min.time())
+    return value
+
+
+def entry_key_values(start_time, entry_id):
+    """Bind a ``(start_time, id)`` keyset position with the column types (times are stored in UTC)."""
+    return tuple_(start_time, entry_id, types=(TimeEntry.start_time.type, TimeEntry.id.type))
+
+
+def report_filters(start, end, service_id=None):
+    """
+    Build the WHERE clauses shared by every report query.
+
+    Args:
+        start: First day (or instant) of the period.
+        end: Last day (or instant) of the period, inclusive.
+        service_id: Restrict to a single service. If None, all services.
+
+    Returns:
+        List of SQL expressions to pass to ``where()``.
+    """
+    clauses = [
+        TimeEntry.start_time >= as_datetime(start),
+        TimeEntry.start_time <= as_datetime(end, end_of_day=True),
+        TimeEntry.end_time.isnot(None),  # Only completed entries
+    ]
+    if service_id is not None:
+        clauses.append(TimeEntry.service_id == service_id)
+    return clauses
+
+
+def in_report(entry, start, end, service_id=None):
+    """
+    Tell whether a report counts an entry, like ``report_filters`` but in Python.
+
+    ``entry`` is anything with the columns of ``TimeEntry``, e.g. a snapshot
+    of the change feed.
+    """
+    return (
+        entry.end_time is not None
+        and as_datetime(start) <= entry.start_time <= as_datetime(end, end_of_day=True)
+        and (service_id is None or entry.service_id == service_id)
+    )
+
+
+def report_rows_query(start, end, service_id=None):
+    """Return the SELECT producing one ``ReportRow`` per completed entry."""
+    return (
+        select(
+            TimeEntry.id,
+            TimeEntry.start_time,
+            TimeEntry.end_time,
+            TimeEntry.service_id,
+            Service.name,
+            TimeEntry.duration_seconds,
+            amount_cents_expr().label('amount_cents'),
+        )
+        .join(Service, TimeEntry.service_id == Service.id)
+        .where(*report_filters(start, end, service_id))
+        .order_by(TimeEntry.start_time, TimeEntry.id)
+    )
+
+
+def report_totals_query(start, end, service_id=None):
+    """Return the SELECT producing ``(seconds, amount_cents)`` totals for a period."""
+    return (
+        select(
+            func.coalesce(func.sum(TimeEntry.duration_seconds), 0),
+            func.coalesce(func.sum(amount_cents_expr()), 0),
+        )
+        .select_from(TimeEntry)
+        .join(Service, TimeEntry.service_id == Service.id)
+        .where(*report_filters(start, end, service_id))
+    )
+
+
+def fetch_report_totals(session, start, end, service_id=None):
+    """
+    Compute the grand totals of a report without fetching its rows.
+
+    Returns:
+        ``ReportTotals`` with the exact sums of durations and amounts.
+    """
+    return ReportTotals(*session.execute(report_totals_query(start, end, service_id)).one())
+
+
+def iter_report_rows(session, start, end, service_id=None, batch_size=1000):
+    """
+    Yield the ``ReportRow`` of a period, one short query per batch.
+    
+    Batches are paged by keyset on ``(start_time, id)``, so no cursor stays
+    open between them and each batch costs the same however deep it is.
+    """
+    query = report_rows_query(start, end, service_id).limit(batch_size)
+    batch = session.execute(query).all()
+    while batch:
+        for row in batch:
+            yield ReportRow(*row)
+        if len(batch) < batch_size:
+            return
+        last = batch[-1]
+        batch = session.execute(
+            query.where(tuple_(TimeEntry.start_time, TimeEntry.id) > entry_key_values(last.start_time, last.id))
+        ).all()
+
+
+def fetch_report(session, start, end, service_id=None):
+    """
+    Compute a report for a period.
+
+    Args:
+        session: Database session.
+        start: First day (or instant) of the period.
+        end: Last day (or instant) of the period, inclusive.
+        service_id: Restrict to a single service. If None, all services.
+
+    Returns:
+        ``Report`` with a list of ``ReportRow`` and the ``ReportTotals``.
+    """
+    rows = [ReportRow(*row) for row in session.execute(report_rows_query(start, end, service_id))]
+    return Report(rows, fetch_report_totals(session, start, end, service_id))
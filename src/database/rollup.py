@@ -0,0 +1,153 @@
+"""Daily rollup of completed time entries for Mycket application.
+
+``daily_service_totals`` holds one row per day and service with the exact
+sums of that day's completed entries, so period totals cost O(days) instead
+of O(entries). Rows are recomputed from ``time_entries`` after every flush
+that touches an entry (or a service rate), always in the same transaction
+as the change itself.
+"""
+
+from datetime import date, datetime, time, timedelta
+from itertools import chain
+
+from sqlalchemy import bindparam, delete, event, func, insert, inspect, literal_column, select
+from sqlalchemy.orm import Session
+
+from .clock import UTCDateTime, to_local
+from .models import DailyServiceTotal, Service, TimeEntry
+from .reporting import ReportTotals, amount_cents_expr
+
+
+ROLLUP_COLUMNS = ['day', 'service_id', 'seconds', 'amount_cents', 'entry_count']
+
+
+def rollup_query(*where):
+    """Return the SELECT aggregating completed entries per day and service."""
+    # Days are local days, like the ones reports and invoices are made of
+    day = func.date(TimeEntry.start_time, literal_column("'localtime'"))
+    return (
+        select(
+            day,
+            TimeEntry.service_id,
+            func.sum(TimeEntry.duration_seconds),
+            func.sum(amount_cents_expr()),
+            func.count(TimeEntry.id),
+        )
+        .join(Service, TimeEntry.service_id == Service.id)
+        .where(TimeEntry.end_time.isnot(None), *where)
+        .group_by(day, TimeEntry.service_id)
+    )
+
+
+def _insert_rollup(*where):
+    return insert(DailyServiceTotal).from_select(ROLLUP_COLUMNS, rollup_query(*where))
+
+
+def refresh_daily_totals(connection, keys=(), service_ids=()):
+    """
+    Recompute rollup rows from ``time_entries``.
+
+    Args:
+        connection: Connection of the writing transaction.
+        keys: ``(day, service_id)`` pairs whose entries changed.
+        service_ids: Services whose every day must be recomputed, e.g.
+            after a rate change.
+    """
+    service_ids = set(service_ids)
+    params = [
+        {
+            'day': day,
+            'service': service_id,
+            'day_start': datetime.combine(day, time.min),
+            'day_end': datetime.combine(day + timedelta(days=1), time.min),
+        }
+        for day, service_id in set(keys) if service_id not in service_ids
+    ]
+    if params:
+        # One executemany per statement, whatever the number of keys
+        connection.execute(
+            delete(DailyServiceTotal).where(
+                DailyServiceTotal.day == bindparam('day'),
+                DailyServiceTotal.service_id == bindparam('service'),
+            ),
+            params,
+        )
+        connection.execute(
+            _insert_rollup(
+                TimeEntry.service_id == bindparam('service'),
+                TimeEntry.start_time >= bindparam('day_start', type_=UTCDateTime),
+                TimeEntry.start_time < bindparam('day_end', type_=UTCDateTime),
+            ),
+            params,
+        )
+    if service_ids:
+        connection.execute(delete(DailyServiceTotal).where(DailyServiceTotal.service_id.in_(service_ids)))
+        connection.execute(_insert_rollup(TimeEntry.service_id.in_(service_ids)))
+
+
+def rebuild_daily_totals(session):
+    """
+    Recompute the whole rollup from ``time_entries``.
+
+    Args:
+        session: Read-write session; the caller commits.
+
+    Returns:
+        Number of rollup rows.
+    """
+    session.execute(delete(DailyServiceTotal))
+    session.execute(_insert_rollup())
+    return session.execute(select(func.count()).select_from(DailyServiceTotal)).scalar()
+
+
+def fetch_daily_totals(session, start, end, service_id=None):
+    """
+    Compute the totals of a period from the rollup.
+
+    Same result as ``reporting.fetch_report_totals`` for whole days, reading
+    at most one row per day and service.
+
+    Args:
+        session: Database session.
+        start: First day of the period.
+        end: Last day of the period, inclusive.
+        service_id: Restrict to a single service. If None, all services.
+    """
+    query = select(
+        func.coalesce(func.sum(DailyServiceTotal.seconds), 0),
+        func.coalesce(func.sum(DailyServiceTotal.amount_cents), 0),
+    ).where(DailyServiceTotal.day >= start, DailyServiceTotal.day <= end)
+    if service_id is not None:
+        query = query.where(DailyServiceTotal.service_id == service_id)
+    return ReportTotals(*session.execute(query).one())
+
+
+def _entry_keys(entry):
+    """
+    Return the ``(day, service_id)`` pairs an entry counts (or counted) towards.
+
+    Days are local days, also for aware start times not loaded back yet.
+    """
+    state = inspect(entry)
+    starts = [entry.start_time, *state.attrs.start_time.history.deleted]
+    services = [entry.service_id, *state.attrs.service_id.history.deleted]
+    return {
+        (to_local(start).date() if isinstance(start, datetime) else start, service_id)
+        for start in starts if isinstance(start, date)
+        for service_id in services if service_id is not None
+    }
+
+
+@event.listens_for(Session, 'after_flush')
+def _refresh_after_flush(session, flush_context):
+    """Keep the rollup in step with the entries and rates written by a flush."""
+    keys = set()
+    service_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, TimeEntry):
+            keys.update(_entry_keys(obj))
+        elif isinstance(obj, Service) and obj in session.dirty:
+            if inspect(obj).attrs.hourly_rate_cents.history.has_changes():
+                service_ids.add(obj.id)
+    if keys or service_ids:
+        refresh_daily_totals(session.connection(), keys, service_ids)
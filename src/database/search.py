@@ -0,0 +1,130 @@
+"""Full-text search over time entry notes and services for Mycket application.
+
+Notes and service names/descriptions are indexed by the FTS5 tables
+``time_entry_fts`` and ``service_fts`` (migration 0005), which triggers keep
+in sync with every insert, update and delete. A search is an index lookup,
+ranked with BM25, instead of a ``LIKE '%x%'`` scan of every row.
+
+User input is never passed to MATCH as is: ``match_expression`` turns it
+into prefix terms that must all appear, so "ross fatt" finds notes with
+"Rossi" and "fattura".
+"""
+
+import re
+from collections import namedtuple
+
+from sqlalchemy import Float, Integer, column, func, literal_column, select, table
+
+from .models import Service, TimeEntry
+from .reporting import as_datetime, duration_hours_expr
+
+
+# Hits of entry and service searches; ``rank`` is BM25, lower is better
+EntryHit = namedtuple('EntryHit', ['entry_id', 'service_id', 'start_time', 'end_time', 'hours', 'snippet', 'rank'])
+ServiceHit = namedtuple('ServiceHit', ['service_id', 'name', 'snippet', 'rank'])
+
+# Markers around the matched terms in snippets
+HIGHLIGHT_START = '«'
+HIGHLIGHT_END = '»'
+
+# Words of context around the matches in a snippet
+SNIPPET_WORDS = 12
+
+MAX_HITS = 100
+
+# The FTS5 tables, for Core queries (they are not ORM models)
+time_entry_fts = table('time_entry_fts', column('rowid', Integer), column('notes'))
+service_fts = table('service_fts', column('rowid', Integer), column('name'), column('description'))
+
+_TERM = re.compile(r'\w+')
+
+
+def match_expression(query):
+    """
+    Turn free text into an FTS5 MATCH expression, or None if it has no words.
+
+    Each word becomes a quoted prefix term (``"rossi"*``); all must match.
+    """
+    terms = _TERM.findall(query or '')
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _match(fts_table, expression):
+    # MATCH on the table name searches every indexed column
+    return literal_column(fts_table.name).op('MATCH')(expression)
+
+
+def _snippet(fts_table, column_index):
+    return func.snippet(
+        literal_column(fts_table.name), column_index, HIGHLIGHT_START, HIGHLIGHT_END, '…', SNIPPET_WORDS
+    )
+
+
+def _rank(fts_table):
+    return func.bm25(literal_column(fts_table.name), type_=Float).label('rank')
+
+
+def matching_entry_ids(expression):
+    """SELECT of the ids of the entries whose notes match ``expression``, for IN clauses."""
+    return select(time_entry_fts.c.rowid).where(_match(time_entry_fts, expression))
+
+
+def search_entries(session, query, start=None, end=None, service_id=None, limit=MAX_HITS):
+    """
+    Find the entries whose notes match ``query``, best matches first.
+
+    Args:
+        session: Database session.
+        query: Free text, see ``match_expression``.
+        start: Optional first day (or instant) of the entries.
+        end: Optional last day (or instant), inclusive.
+        service_id: Optional service filter.
+        limit: Maximum number of hits.
+
+    Returns:
+        List of ``EntryHit``; empty if the query has no words.
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return []
+    statement = (
+        select(
+            TimeEntry.id,
+            TimeEntry.service_id,
+            TimeEntry.start_time,
+            TimeEntry.end_time,
+            duration_hours_expr(),
+            _snippet(time_entry_fts, 0),
+            _rank(time_entry_fts),
+        )
+        .select_from(time_entry_fts)
+        .join(TimeEntry, TimeEntry.id == time_entry_fts.c.rowid)
+        .where(_match(time_entry_fts, expression))
+        .order_by(literal_column('rank'))
+        .limit(limit)
+    )
+    if start is not None:
+        statement = statement.where(TimeEntry.start_time >= as_datetime(start))
+    if end is not None:
+        statement = statement.where(TimeEntry.start_time <= as_datetime(end, end_of_day=True))
+    if service_id is not None:
+        statement = statement.where(TimeEntry.service_id == service_id)
+    return [EntryHit(*row) for row in session.execute(statement)]
+
+
+def search_services(session, query, limit=MAX_HITS):
+    """Find the services whose name or description match ``query``, best matches first."""
+    expression = match_expression(query)
+    if expression is None:
+        return []
+    statement = (
+        select(Service.id, Service.name, _snippet(service_fts, 1), _rank(service_fts))
+        .select_from(service_fts)
+        .join(Service, Service.id == service_fts.c.rowid)
+        .where(_match(service_fts, expression))
+        .order_by(literal_column('rank'))
+        .limit(limit)
+    )
+    return [ServiceHit(*row) for row in session.execute(statement)]
@@ -0,0 +1,151 @@
+"""Unit-of-work sessions for Mycket application.
+
+Every operation opens its own short-lived session and closes it when done,
+so the identity map only ever holds the objects of one operation and each
+operation reads the current data:
+
+    with db_manager.session_scope() as session:        # commits on success
+        session.add(entry)
+
+    with db_manager.session_scope(read_only=True) as session:
+        rows = fetch_entries_page(session)
+
+Sessions are made with ``expire_on_commit=False``: objects returned by an
+operation stay readable after their session is closed, without a query.
+
+Other processes (scheduled scripts, the command line) may write to the same
+database. Writes are kept short and run through ``run_write``, which takes
+the write lock upfront and retries while another writer holds it:
+
+    running = db_manager.write(write_heartbeat, entry_id)
+"""
+
+import random
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+
+# Attempts of a write that finds the database locked (each after waiting the
+# busy timeout), and the pause before the second one, doubled at each retry
+WRITE_ATTEMPTS = 5
+RETRY_DELAY = 0.05
+
+# Primary result codes of a database locked by another connection
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+
+class ReadOnlySessionError(Exception):
+    """Raised when changes are flushed from a read-only session."""
+
+
+def create_session_factories(engine, info=None):
+    """
+    Return the ``(read_write, read_only)`` session factories of ``engine``.
+
+    Read-only sessions never autoflush and refuse to flush, so reports
+    can't write by mistake and skip the flush bookkeeping entirely.
+
+    Args:
+        engine: Engine the sessions are bound to.
+        info: Optional ``Session.info`` of the read-write sessions.
+    """
+    read_write = sessionmaker(bind=engine, expire_on_commit=False, info=info)
+    read_only = sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
+    event.listen(read_only, 'before_flush', _reject_flush)
+    return read_write, read_only
+
+
+def _reject_flush(session, flush_context, instances):
+    raise ReadOnlySessionError("read-only session: changes cannot be saved")
+
+
+def is_busy_error(error):
+    """Tell whether ``error`` means another connection holds the lock (SQLITE_BUSY / SQLITE_LOCKED)."""
+    original = getattr(error, 'orig', error)
+    if not isinstance(original, sqlite3.OperationalError):
+        return False
+    code = getattr(original, 'sqlite_errorcode', None)  # Python 3.11+
+    if code is not None:
+        return code & 0xff in (SQLITE_BUSY, SQLITE_LOCKED)
+    return 'locked' in str(original)
+
+
+def retry_on_busy(fn, attempts=WRITE_ATTEMPTS, delay=RETRY_DELAY, sleep=time.sleep):
+    """
+    Call ``fn()`` and return its result, calling it again while the database is busy.
+
+    Pauses grow exponentially, with jitter so that writers that collided do
+    not collide again. ``fn`` must be safe to repeat: it runs a whole
+    transaction, rolled back when it fails.
+
+    Raises:
+        OperationalError: The last busy error, after ``attempts`` calls.
+    """
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except OperationalError as e:
+            if attempt == attempts - 1 or not is_busy_error(e):
+                raise
+            sleep(delay * 2 ** attempt * random.uniform(0.5, 1.5))
+
+
+def begin_immediate(session):
+    """
+    Take the write lock of the database for the rest of the session's transaction.
+
+    pysqlite begins transactions lazily, as DEFERRED, at the first write: a
+    transaction that reads a value and then writes what it computed from it
+    can interleave with another process doing the same. ``BEGIN IMMEDIATE``
+    makes other writers wait (within the busy timeout) until it commits,
+    while readers go on thanks to WAL. Call it before the first read;
+    if the transaction already wrote, it holds the lock already.
+    """
+    connection = session.connection()
+    if not connection.connection.driver_connection.in_transaction:
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+
+@contextmanager
+def session_scope(factory, read_only=False, immediate=False):
+    """
+    Run a unit of work in a new session from ``factory``.
+
+    Read-write sessions commit when the block ends and roll back if it
+    raises. Read-only sessions are just closed: closing (unlike a rollback)
+    leaves the loaded objects readable. ``immediate`` sessions take the
+    write lock before the block runs (see ``begin_immediate``).
+    """
+    session = factory()
+    try:
+        if immediate:
+            begin_immediate(session)
+        yield session
+        if not read_only:
+            session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def run_write(factory, fn, *args, **kwargs):
+    """
+    Run ``fn(session, *args, **kwargs)`` as one short write transaction and return its result.
+
+    The transaction starts with ``BEGIN IMMEDIATE``, commits when ``fn``
+    returns, and is run again (see ``retry_on_busy``) if the database stays
+    locked by another writer. ``fn`` should only touch the database: it may
+    run more than once.
+    """
+    def attempt():
+        with session_scope(factory, immediate=True) as session:
+            return fn(session, *args, **kwargs)
+    return retry_on_busy(attempt)
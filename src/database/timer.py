@@ -0,0 +1,124 @@
+"""Running timer engine for Mycket application.
+
+The elapsed time shown while a timer runs comes from the monotonic clock,
+which NTP corrections and DST changes do not move; it is re-anchored to the
+UTC wall clock at every heartbeat, so it agrees with the end time stored
+when the timer stops.
+
+A running entry records a heartbeat every ``HEARTBEAT_INTERVAL`` seconds:
+one single-row UPDATE of ``heartbeat_at``. If the application dies, the
+entry stays open with its last heartbeat, and ``close_stale_entries`` ends
+it there on the next start. On a clean exit the heartbeat is cleared
+instead: a timer left running on purpose is resumed as before.
+"""
+
+import time
+from datetime import timedelta
+
+from sqlalchemy import select, update
+
+from .clock import to_utc, utc_now
+from .models import TimeEntry
+
+
+# Seconds between two heartbeats of a running timer
+HEARTBEAT_INTERVAL = 60
+
+# A running entry whose heartbeat is older than this was left by a crash
+STALE_AFTER = 3 * HEARTBEAT_INTERVAL
+
+
+class TimerClock:
+    """Elapsed time of a running timer, from the monotonic clock."""
+
+    def __init__(self, start, now=None, monotonic=time.monotonic):
+        """
+        Args:
+            start: Start of the timer, naive local or aware.
+            now: Current time, naive local or aware. If None, now.
+            monotonic: Monotonic clock in seconds (for tests).
+        """
+        self.start = to_utc(start)
+        self._monotonic = monotonic
+        self.sync(now)
+
+    def sync(self, now=None):
+        """Re-anchor the elapsed time to the wall clock, e.g. after a suspend."""
+        now = to_utc(now) if now is not None else utc_now()
+        self._offset = max((now - self.start).total_seconds(), 0.0)
+        self._anchor = self._monotonic()
+
+    def elapsed_seconds(self):
+        """Seconds since the start, never negative."""
+        return self._offset + self._monotonic() - self._anchor
+
+    def elapsed(self):
+        """Time since the start, as a ``timedelta``."""
+        return timedelta(seconds=self.elapsed_seconds())
+
+    def msecs_to_next_second(self):
+        """Milliseconds until the elapsed time reaches its next whole second."""
+        return 1000 - int(self.elapsed_seconds() * 1000) % 1000
+
+
+def find_running_entry(session):
+    """Return the running entry, or None."""
+    return session.scalars(
+        select(TimeEntry).where(TimeEntry.end_time.is_(None)).order_by(TimeEntry.start_time.desc()).limit(1)
+    ).first()
+
+
+def _set_heartbeat(session, entry_id, value):
+    table = TimeEntry.__table__
+    result = session.execute(
+        update(table)
+        .where(table.c.id == entry_id, table.c.end_time.is_(None))
+        .values(heartbeat_at=value, updated_at=table.c.updated_at)  # Not a change of the entry
+    )
+    return result.rowcount == 1
+
+
+def write_heartbeat(session, entry_id, at=None):
+    """
+    Record that the timer of ``entry_id`` is still running.
+
+    Returns:
+        False if the entry is no longer running (stopped or deleted elsewhere).
+    """
+    return _set_heartbeat(session, entry_id, at or utc_now())
+
+
+def clear_heartbeat(session, entry_id):
+    """Clear the heartbeat of a timer left running on a clean exit."""
+    return _set_heartbeat(session, entry_id, None)
+
+
+def close_stale_entries(session, now=None, stale_after=STALE_AFTER):
+    """
+    End the running entries left by a crash at their last heartbeat.
+
+    Entries without a heartbeat (left running on purpose, or started before
+    heartbeats existed) are not touched, nor are the ones whose heartbeat is
+    recent: another instance of the application may be running them.
+
+    Args:
+        session: Read-write session; the caller commits.
+        now: Current time. If None, now.
+        stale_after: Age in seconds of a heartbeat left by a crash.
+
+    Returns:
+        List of the closed ``TimeEntry``.
+    """
+    limit = (now or utc_now()) - timedelta(seconds=stale_after)
+    entries = session.scalars(
+        select(TimeEntry).where(
+            TimeEntry.end_time.is_(None),
+            TimeEntry.heartbeat_at.isnot(None),
+            TimeEntry.heartbeat_at < limit,
+        )
+    ).all()
+    for entry in entries:
+        entry.end_time = max(entry.heartbeat_at, entry.start_time)
+        entry.heartbeat_at = None
+    session.flush()  # Durations and daily totals, like any other change
+    return entries
@@ -4,16 +4,40 @@ Mycket - Time Tracking and Billing Application
 Main application entry point
 """
 
+import time
+
+# Taken before the heavy imports, so startup time includes them
+STARTUP_TIME = time.perf_counter()
+
+import os
 import sys
 from pathlib import Path
 from PyQt6.QtWidgets import QApplication, QStyleFactory
 from PyQt6.QtGui import QIcon, QPalette, QColor
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QObject, QEvent
 
 from database import DatabaseManager
+from database.profiling import QueryProfiler
 from ui import MainWindow
 
 
+class FirstPaintProbe(QObject):
+    """Logs the time from process start to the first paint of a window."""
+    
+    def __init__(self, window):
+        super().__init__(window)
+        self.window = window
+        window.installEventFilter(self)
+    
+    def eventFilter(self, obj, event):
+        if obj is self.window and event.type() == QEvent.Type.Paint:
+            self.window.removeEventFilter(self)
+            elapsed_ms = (time.perf_counter() - STARTUP_TIME) * 1000
+            print(f"✓ Avvio completato in {elapsed_ms:.0f} ms (primo disegno)")
+            self.window.status_bar.showMessage(f"Pronto - avvio in {elapsed_ms:.0f} ms")
+        return False
+
+
 def main():
     """Main application entry point."""
     # Enable high DPI support
@@ -47,11 +71,14 @@ def main():
     palette.setColor(QPalette.ColorRole.HighlightedText, QColor(0, 0, 0))
     app.setPalette(palette)
     
-    # Initialize database
-    db_manager = DatabaseManager()
+    # Initialize database; MYCKET_DIAGNOSTICS=1 records query timings
+    # (Aiuto > Diagnostica)
+    profiler = QueryProfiler() if os.environ.get('MYCKET_DIAGNOSTICS') == '1' else None
+    db_manager = DatabaseManager(profiler=profiler)
     
     # Create and show main window
     window = MainWindow(db_manager)
+    FirstPaintProbe(window)
     window.show()
     
     # Run application
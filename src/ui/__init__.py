@@ -1,13 +1,34 @@
 """UI package initialization."""
 
-from .main_window import MainWindow
-from .time_tracker import TimeTrackerWidget
-from .services_panel import ServicesPanelWidget
-from .reports_panel import ReportsPanelWidget
+import importlib
+
+# Widgets are imported on first access, so importing the package (or just
+# MainWindow) does not load every panel module at startup
+_MODULES = {
+    'MainWindow': 'main_window',
+    'TimeTrackerWidget': 'time_tracker',
+    'ServicesPanelWidget': 'services_panel',
+    'ReportsPanelWidget': 'reports_panel',
+    'ServiceCatalog': 'service_catalog',
+    'ChangeNotifier': 'change_notifier',
+    'DiagnosticsDialog': 'diagnostics',
+    'SearchDialog': 'search_dialog',
+}
 
 __all__ = [
     'MainWindow',
     'TimeTrackerWidget',
     'ServicesPanelWidget',
-    'ReportsPanelWidget'
+    'ReportsPanelWidget',
+    'ServiceCatalog',
+    'ChangeNotifier',
+    'DiagnosticsDialog',
+    'SearchDialog'
 ]
+
+
+def __getattr__(name):
+    if name in _MODULES:
+        module = importlib.import_module(f'.{_MODULES[name]}', __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,45 @@
+"""Qt bridge of the database change feed."""
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+
+
+class ChangeNotifier(QObject):
+    """
+    Committed changes of a database, as signals of the GUI thread.
+
+    Subscribes to ``db_manager.changes``. The changes are always delivered
+    from the event loop, never from inside the commit: a panel saving an
+    entry sees it come back once its handler returns, and the changes
+    committed by a worker reach the GUI thread like any other queued signal.
+    Every signal carries the ``database.changes.Change`` list of one commit
+    for its table.
+    """
+
+    entries_changed = pyqtSignal(list)
+    services_changed = pyqtSignal(list)
+    _received = pyqtSignal(list)
+
+    def __init__(self, db_manager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self._received.connect(self._dispatch, Qt.ConnectionType.QueuedConnection)
+        db_manager.changes.subscribe(self._publish)
+
+    def _publish(self, changes):
+        try:
+            self._received.emit(changes)
+        except RuntimeError:  # Deleted with its parent
+            self.close()
+
+    def _dispatch(self, changes):
+        entries = [change for change in changes if change.table == 'time_entries']
+        services = [change for change in changes if change.table == 'services']
+        # Services first: the entries of a new service show its name
+        if services:
+            self.services_changed.emit(services)
+        if entries:
+            self.entries_changed.emit(entries)
+
+    def close(self):
+        """Stop listening to the database."""
+        self.db_manager.changes.unsubscribe(self._publish)
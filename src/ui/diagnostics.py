@@ -0,0 +1,177 @@
+"""Diagnostics view: query and handler timings recorded by the profiler."""
+
+import functools
+from datetime import datetime
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTabWidget,
+    QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QMessageBox
+)
+from PyQt6.QtCore import Qt, QTimer
+
+
+# Refresh period of the open diagnostics view
+REFRESH_MS = 1000
+
+# Statements listed, slowest in total first
+MAX_LISTED_STATEMENTS = 200
+
+
+def handler_span(method):
+    """
+    Time a UI handler in the profiler of ``self.db_manager``, if any.
+
+    For slots without arguments: the wrapper takes none, so Qt does not
+    pass the ``checked`` flag of button clicks.
+    """
+    name = method.__qualname__
+
+    @functools.wraps(method)
+    def wrapper(self):
+        with self.db_manager.span(name):
+            return method(self)
+    return wrapper
+
+
+def _number_item(value, text):
+    """Table item showing ``text`` and sorting by ``value``."""
+    item = QTableWidgetItem()
+    item.setData(Qt.ItemDataRole.DisplayRole, value)
+    item.setText(text)
+    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+    return item
+
+
+def _one_line(statement):
+    return " ".join(statement.split())
+
+
+class DiagnosticsDialog(QDialog):
+    """Live tables of the statements, spans and N+1 suspects of a ``QueryProfiler``."""
+
+    def __init__(self, profiler, parent=None):
+        super().__init__(parent)
+        self.profiler = profiler
+        self.setWindowTitle("Diagnostica")
+        self.resize(900, 550)
+        self._setup_ui()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        tabs = QTabWidget()
+        self.statements_table = self._create_table(
+            ["Query", "Esecuzioni", "Totale (ms)", "Media (ms)", "Max (ms)", "Righe"]
+        )
+        tabs.addTab(self.statements_table, "Query")
+        self.spans_table = self._create_table(["Operazione", "Chiamate", "Totale (ms)", "Max (ms)"])
+        tabs.addTab(self.spans_table, "Operazioni")
+        self.n_plus_one_table = self._create_table(["Operazione", "Query", "Ripetizioni"])
+        tabs.addTab(self.n_plus_one_table, "Possibili N+1")
+        layout.addWidget(tabs)
+
+        buttons = QHBoxLayout()
+        reset_button = QPushButton("🗑️ Azzera")
+        reset_button.clicked.connect(self._reset)
+        buttons.addWidget(reset_button)
+        trace_button = QPushButton("💾 Salva Trace...")
+        trace_button.setToolTip("File JSON da aprire in chrome://tracing, Perfetto o speedscope")
+        trace_button.clicked.connect(self._save_trace)
+        buttons.addWidget(trace_button)
+        buttons.addStretch()
+        close_button = QPushButton("Chiudi")
+        close_button.clicked.connect(self.close)
+        buttons.addWidget(close_button)
+        layout.addLayout(buttons)
+
+    def _create_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        table.verticalHeader().setVisible(False)
+        header = table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        # The text column (a query or an operation name) takes the spare width
+        text_column = 1 if headers[1] == "Query" else 0
+        header.setSectionResizeMode(text_column, QHeaderView.ResizeMode.Stretch)
+        return table
+
+    def _fill_table(self, table, rows):
+        """Replace the rows of ``table``, keeping the user's sort order."""
+        table.setSortingEnabled(False)
+        table.setRowCount(len(rows))
+        for row, items in enumerate(rows):
+            for column, item in enumerate(items):
+                table.setItem(row, column, item)
+        table.setSortingEnabled(True)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh_timer.start(REFRESH_MS)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        """Reload the tables from the profiler."""
+        self.summary_label.setText(self.profiler.summary())
+
+        statements = []
+        for stats in self.profiler.statements()[:MAX_LISTED_STATEMENTS]:
+            text = QTableWidgetItem(_one_line(stats.statement))
+            text.setToolTip(stats.statement)
+            statements.append([
+                text,
+                _number_item(stats.count, str(stats.count)),
+                _number_item(stats.total, f"{stats.total * 1000:.1f}"),
+                _number_item(stats.mean, f"{stats.mean * 1000:.2f}"),
+                _number_item(stats.max, f"{stats.max * 1000:.1f}"),
+                _number_item(stats.rows, str(stats.rows)),
+            ])
+        self._fill_table(self.statements_table, statements)
+
+        self._fill_table(self.spans_table, [
+            [
+                QTableWidgetItem(stats.name),
+                _number_item(stats.count, str(stats.count)),
+                _number_item(stats.total, f"{stats.total * 1000:.1f}"),
+                _number_item(stats.max, f"{stats.max * 1000:.1f}"),
+            ]
+            for stats in self.profiler.spans()
+        ])
+
+        suspects = []
+        for span, statement, run in self.profiler.n_plus_one():
+            text = QTableWidgetItem(_one_line(statement))
+            text.setToolTip(statement)
+            suspects.append([QTableWidgetItem(span or "-"), text, _number_item(run, str(run))])
+        self._fill_table(self.n_plus_one_table, suspects)
+
+    def _reset(self):
+        self.profiler.reset()
+        self.refresh()
+
+    def _save_trace(self):
+        filename, _ = QFileDialog.getSaveFileName(
+            self,
+            "Salva Trace",
+            f"mycket_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            "Trace JSON (*.json)"
+        )
+        if not filename:
+            return
+        try:
+            self.profiler.write_trace(filename)
+        except OSError as e:
+            QMessageBox.critical(self, "Errore", f"Impossibile salvare il trace:\n{e}")
+            return
+        QMessageBox.information(self, "Successo", f"Trace salvato in:\n{filename}")
@@ -1,15 +1,77 @@
 """Main application window."""
 
+from datetime import datetime
+
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-    QTabWidget, QStatusBar, QMenuBar, QMenu
+    QTabWidget, QStatusBar, QMenuBar, QMenu, QLabel
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThreadPool, QTimer
 from PyQt6.QtGui import QAction
 
-from .time_tracker import TimeTrackerWidget
-from .services_panel import ServicesPanelWidget
-from .reports_panel import ReportsPanelWidget
+from .service_catalog import ServiceCatalog
+from .workers import start_worker
+
+
+def _create_time_tracker(db_manager, service_catalog):
+    from .time_tracker import TimeTrackerWidget
+    return TimeTrackerWidget(db_manager, service_catalog)
+
+
+def _create_services_panel(db_manager, service_catalog):
+    from .services_panel import ServicesPanelWidget
+    return ServicesPanelWidget(db_manager, service_catalog)
+
+
+def _create_reports_panel(db_manager, service_catalog):
+    from .reports_panel import ReportsPanelWidget
+    return ReportsPanelWidget(db_manager, service_catalog)
+
+
+def _import_task(context, session, filename, dry_run):
+    """Worker task: validate or import a file of time entries."""
+    from database.importer import import_file
+    
+    return import_file(session, filename, dry_run=dry_run, progress=context.progress)
+
+
+def _backup_task(context, session, filename):
+    """Worker task: copy the database to a file with the online backup API."""
+    from database.backup import backup_database
+    
+    backup_database(session.get_bind(), filename, progress=context.progress)
+    return filename
+
+
+def _auto_backup_task(context, session, backup_dir):
+    """Worker task: timestamped backup with rotation."""
+    from database.backup import create_backup
+    
+    return create_backup(session.get_bind(), backup_dir, progress=context.progress)
+
+
+def _dump_task(context, session, filename):
+    """Worker task: stream every table to a compressed JSON Lines file."""
+    from database.backup import dump_jsonl
+    
+    return dump_jsonl(session, filename, progress=context.progress)
+
+
+BACKUP_FILTER = "Database SQLite (*.db)"
+DUMP_FILTER = "Dump JSON compresso (*.jsonl.gz)"
+
+# How often to check whether an automatic backup is due
+AUTO_BACKUP_CHECK_MS = 60 * 60 * 1000
+
+# Refresh period of the profiler summary in the status bar
+DIAGNOSTICS_STATUS_MS = 2000
+
+# (attribute name, tab title, factory) of each tab, in display order
+TABS = [
+    ('time_tracker', "⏱️ Tracciamento Ore", _create_time_tracker),
+    ('services_panel', "🔧 Servizi", _create_services_panel),
+    ('reports_panel', "📊 Report e Fatture", _create_reports_panel),
+]
 
 
 class MainWindow(QMainWindow):
@@ -18,12 +80,23 @@ class MainWindow(QMainWindow):
     def __init__(self, db_manager):
         super().__init__()
         self.db_manager = db_manager
+        self.file_worker = None  # Import/export started from the File menu, if any
+        self.backup_worker = None  # Automatic backup in progress, if any
+        self.diagnostics_dialog = None
+        # Shared by the panels: loaded once, refreshed when a service changes
+        self.service_catalog = ServiceCatalog(db_manager, self)
         self.setWindowTitle("Mycket - Time Tracking & Billing")
         self.setMinimumSize(1000, 700)
         
         self._setup_ui()
         self._setup_menu()
         self._apply_stylesheet()
+        
+        # Automatic backups: first check once startup is over, then hourly
+        self.backup_timer = QTimer(self)
+        self.backup_timer.timeout.connect(self._auto_backup)
+        self.backup_timer.start(AUTO_BACKUP_CHECK_MS)
+        QTimer.singleShot(30 * 1000, self._auto_backup)
     
     def _setup_ui(self):
         """Setup main UI layout."""
@@ -38,14 +111,16 @@ class MainWindow(QMainWindow):
         self.tabs = QTabWidget()
         self.tabs.setDocumentMode(True)
         
-        # Create tabs
-        self.time_tracker = TimeTrackerWidget(self.db_manager)
-        self.services_panel = ServicesPanelWidget(self.db_manager)
-        self.reports_panel = ReportsPanelWidget(self.db_manager)
+        # Create tabs: each panel is built (and runs its queries) on first activation
+        for attribute, title, _ in TABS:
+            setattr(self, attribute, None)
+            container = QWidget()
+            container_layout = QVBoxLayout(container)
+            container_layout.setContentsMargins(0, 0, 0, 0)
+            self.tabs.addTab(container, title)
         
-        self.tabs.addTab(self.time_tracker, "⏱️ Tracciamento Ore")
-        self.tabs.addTab(self.services_panel, "🔧 Servizi")
-        self.tabs.addTab(self.reports_panel, "📊 Report e Fatture")
+        self.tabs.currentChanged.connect(self._ensure_tab)
+        self._ensure_tab(self.tabs.currentIndex())
         
         layout.addWidget(self.tabs)
         
@@ -53,6 +128,27 @@ class MainWindow(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Pronto")
+        
+        # Query profiling is opt-in: summary only when a profiler is attached
+        if self.db_manager.profiler is not None:
+            self.diagnostics_label = QLabel()
+            self.status_bar.addPermanentWidget(self.diagnostics_label)
+            self.diagnostics_timer = QTimer(self)
+            self.diagnostics_timer.timeout.connect(
+                lambda: self.diagnostics_label.setText(f"🔍 {self.db_manager.profiler.summary()}")
+            )
+            self.diagnostics_timer.start(DIAGNOSTICS_STATUS_MS)
+    
+    def _ensure_tab(self, index):
+        """Build the panel of a tab the first time it is shown."""
+        if index < 0:
+            return
+        attribute, _, factory = TABS[index]
+        if getattr(self, attribute) is None:
+            with self.db_manager.span(f'MainWindow.create_tab:{attribute}'):
+                panel = factory(self.db_manager, self.service_catalog)
+            setattr(self, attribute, panel)
+            self.tabs.widget(index).layout().addWidget(panel)
     
     def _setup_menu(self):
         """Setup menu bar."""
@@ -61,10 +157,20 @@ class MainWindow(QMainWindow):
         # File menu
         file_menu = menubar.addMenu("&File")
         
+        import_action = QAction("&Importa Dati...", self)
+        import_action.setShortcut("Ctrl+I")
+        import_action.triggered.connect(self._import_data)
+        file_menu.addAction(import_action)
+        
         export_action = QAction("&Esporta Dati...", self)
         export_action.setShortcut("Ctrl+E")
+        export_action.triggered.connect(self._export_data)
         file_menu.addAction(export_action)
         
+        restore_action = QAction("&Ripristina Backup...", self)
+        restore_action.triggered.connect(self._restore_backup)
+        file_menu.addAction(restore_action)
+        
         file_menu.addSeparator()
         
         quit_action = QAction("&Esci", self)
@@ -75,10 +181,218 @@ class MainWindow(QMainWindow):
         # Help menu
         help_menu = menubar.addMenu("&Aiuto")
         
+        if self.db_manager.profiler is not None:
+            diagnostics_action = QAction("&Diagnostica...", self)
+            diagnostics_action.setShortcut("Ctrl+Shift+D")
+            diagnostics_action.triggered.connect(self._show_diagnostics)
+            help_menu.addAction(diagnostics_action)
+        
         about_action = QAction("&Info", self)
         about_action.triggered.connect(self._show_about)
         help_menu.addAction(about_action)
     
+    def _import_data(self):
+        """Import time entries from a file, after checking it with a dry run."""
+        from PyQt6.QtWidgets import QFileDialog
+        
+        if self.file_worker is not None:
+            return
+        filename, _ = QFileDialog.getOpenFileName(
+            self,
+            "Importa Voci",
+            "",
+            "Voci (*.csv *.json *.jsonl *.ndjson);;Tutti i file (*)"
+        )
+        if filename:
+            self._start_import(filename, dry_run=True)
+    
+    def _start_import(self, filename, dry_run):
+        worker = self._start_file_task(
+            "Importa Voci", "Verifica del file..." if dry_run else "Importazione in corso...",
+            "{done} record letti...", _import_task, filename, dry_run,
+            on_result=lambda result: self._import_done(filename, dry_run, result)
+        )
+        if not dry_run:
+            # Bulk inserts bypass the ORM events: open panels reload instead,
+            # also after a failed or cancelled import (its first batches stay)
+            worker.signals.finished.connect(lambda: self.db_manager.changes.publish_reset('time_entries'))
+    
+    def _import_done(self, filename, dry_run, result):
+        """Ask to confirm a checked file, or report the completed import."""
+        from PyQt6.QtWidgets import QMessageBox
+        
+        errors = "".join(f"\nrecord {number}: {message}" for number, message in result.errors[:10])
+        if len(result.errors) > 10:
+            errors += f"\n... e altri {len(result.errors) - 10}"
+        
+        if not dry_run:
+            self.status_bar.showMessage(f"Importate {result.imported} voci")
+            QMessageBox.information(
+                self, "Importazione Completata",
+                f"Importate {result.imported} voci, {len(result.errors)} scartate.{errors}"
+            )
+            return
+        
+        if result.imported == 0:
+            QMessageBox.warning(self, "Attenzione", f"Nessuna voce valida nel file.{errors}")
+            return
+        reply = QMessageBox.question(
+            self,
+            "Conferma Importazione",
+            f"{result.imported} voci pronte da importare, {len(result.errors)} non valide verranno scartate."
+            f"{errors}\n\nProcedere con l'importazione?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            QTimer.singleShot(0, lambda: self._start_import(filename, dry_run=False))
+    
+    def _export_data(self):
+        """Save a backup of the database, or a compressed JSON dump of all data."""
+        from PyQt6.QtWidgets import QFileDialog, QMessageBox
+        
+        if self.file_worker is not None:
+            return
+        filename, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "Esporta Dati",
+            f"mycket_{datetime.now():%Y%m%d_%H%M%S}.db",
+            f"{BACKUP_FILTER};;{DUMP_FILTER}"
+        )
+        if not filename:
+            return
+        
+        if selected_filter == DUMP_FILTER or filename.endswith('.gz'):
+            if not filename.endswith('.jsonl.gz'):
+                filename += '.jsonl.gz'
+            self._start_file_task(
+                "Esporta Dati", "Esportazione in corso...", "{done} righe scritte...",
+                _dump_task, filename,
+                on_result=lambda count: QMessageBox.information(
+                    self, "Successo", f"Esportate {count} righe in:\n{filename}"
+                )
+            )
+        else:
+            self._start_file_task(
+                "Esporta Dati", "Backup in corso...", "{done} di {total} pagine copiate...",
+                _backup_task, filename,
+                on_result=lambda path: QMessageBox.information(
+                    self, "Successo", f"Backup del database salvato in:\n{path}"
+                )
+            )
+    
+    def _restore_backup(self):
+        """Replace the database with a backup, keeping a copy of the current data."""
+        from PyQt6.QtWidgets import QFileDialog, QMessageBox
+        from database.backup import BackupError, create_backup, default_backup_dir, restore_database
+        
+        if self.file_worker is not None or self.backup_worker is not None:
+            QMessageBox.warning(self, "Attenzione", "Attendi la fine dell'operazione in corso.")
+            return
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Ripristina Backup", str(default_backup_dir(self.db_manager.db_path)), BACKUP_FILTER
+        )
+        if not filename:
+            return
+        reply = QMessageBox.question(
+            self,
+            "Conferma Ripristino",
+            "Sostituire tutti i dati con quelli del backup?\n\n"
+            "Una copia dei dati attuali verrà salvata tra i backup automatici.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        
+        # Panels hold rows and ORM objects (the running timer) of the data being replaced
+        self._stop_background_tasks()
+        self._close_panels()
+        try:
+            create_backup(self.db_manager.engine, default_backup_dir(self.db_manager.db_path), label='pre-restore')
+            restore_database(self.db_manager.engine, filename)
+        except (BackupError, OSError) as e:
+            QMessageBox.critical(self, "Errore", f"Ripristino non riuscito:\n{e}")
+        else:
+            self.status_bar.showMessage(f"Backup ripristinato da {filename}")
+        finally:
+            self.service_catalog.invalidate()
+            self._ensure_tab(self.tabs.currentIndex())
+    
+    def _close_panels(self):
+        """Destroy the panels built so far; they are rebuilt when shown again."""
+        for attribute, _, _ in TABS:
+            panel = getattr(self, attribute)
+            if panel is not None:
+                setattr(self, attribute, None)
+                panel.setParent(None)
+                panel.deleteLater()
+        self.db_manager.Session.remove()
+    
+    def _start_file_task(self, title, message, progress_text, fn, *args, on_result):
+        """Run a File menu task in the background with a cancellable progress dialog; return its worker."""
+        from PyQt6.QtWidgets import QProgressDialog
+        
+        progress_dialog = QProgressDialog(message, "Annulla", 0, 0, self)
+        progress_dialog.setWindowTitle(title)
+        progress_dialog.setMinimumDuration(500)
+        
+        worker = self.file_worker = start_worker(
+            self.db_manager, fn, *args,
+            on_result=on_result,
+            on_error=self._file_task_failed,
+            on_progress=lambda done, total: progress_dialog.setLabelText(
+                progress_text.format(done=done, total=total)
+            ),
+        )
+        progress_dialog.canceled.connect(worker.cancel)
+        worker.signals.finished.connect(progress_dialog.reset)
+        worker.signals.finished.connect(lambda: self._file_task_finished(worker))
+        return worker
+    
+    def _file_task_finished(self, worker):
+        if worker is self.file_worker:
+            self.file_worker = None
+    
+    def _file_task_failed(self, message):
+        from PyQt6.QtWidgets import QMessageBox
+        QMessageBox.critical(self, "Errore", f"Errore durante l'operazione:\n{message}")
+    
+    def _auto_backup(self):
+        """Start an automatic backup in the background if the last one is too old."""
+        from database.backup import backup_due, default_backup_dir
+        
+        backup_dir = default_backup_dir(self.db_manager.db_path)
+        if self.backup_worker is not None or self.file_worker is not None or not backup_due(backup_dir):
+            return
+        worker = self.backup_worker = start_worker(
+            self.db_manager, _auto_backup_task, backup_dir,
+            read_only=True,
+            on_result=lambda path: self.status_bar.showMessage(f"Backup automatico salvato in {path}", 5000),
+            on_error=lambda message: self.status_bar.showMessage(f"Backup automatico non riuscito: {message}"),
+        )
+        worker.signals.finished.connect(lambda: self._auto_backup_finished(worker))
+    
+    def _auto_backup_finished(self, worker):
+        if worker is self.backup_worker:
+            self.backup_worker = None
+    
+    def _stop_background_tasks(self):
+        """Cancel every background task and wait for them to end."""
+        if self.reports_panel is not None:
+            self.reports_panel._cancel_task()
+        for worker in (self.file_worker, self.backup_worker):
+            if worker is not None:
+                worker.cancel()
+        QThreadPool.globalInstance().waitForDone()
+    
+    def _show_diagnostics(self):
+        """Show the live query and handler timings of the profiler."""
+        from .diagnostics import DiagnosticsDialog
+        
+        if self.diagnostics_dialog is None:
+            self.diagnostics_dialog = DiagnosticsDialog(self.db_manager.profiler, self)
+        self.diagnostics_dialog.show()
+        self.diagnostics_dialog.raise_()
+    
     def _show_about(self):
         """Show about dialog."""
         from PyQt6.QtWidgets import QMessageBox
@@ -155,14 +469,14 @@ class MainWindow(QMainWindow):
             border: 2px solid #90EE90;
         }
         
-        QTableWidget {
+        QTableView {
             border: 1px solid #c0c0c0;
             border-radius: 4px;
             background-color: white;
             gridline-color: #e0e0e0;
         }
         
-        QTableWidget::item:selected {
+        QTableView::item:selected {
             background-color: #90EE90;
             color: #1a1a1a;
         }
@@ -199,6 +513,13 @@ class MainWindow(QMainWindow):
     
     def closeEvent(self, event):
         """Handle window close event."""
+        # A running timer is resumed on the next start, not closed as a crash
+        if self.time_tracker is not None:
+            self.time_tracker.release_timer()
+        
+        # Stop background tasks before their sessions lose the engine
+        self._stop_background_tasks()
+        
         # Close database connection
         self.db_manager.close()
         event.accept()
@@ -3,22 +3,139 @@
 from datetime import datetime, timedelta
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
-    QDateEdit, QComboBox, QTableWidget, QTableWidgetItem,
-    QGroupBox, QMessageBox, QHeaderView, QFileDialog, QTextEdit
+    QDateEdit, QComboBox, QTableView, QLineEdit,
+    QGroupBox, QMessageBox, QHeaderView, QTextEdit, QProgressBar, QTabWidget
 )
 from PyQt6.QtCore import Qt, QDate
-import csv
 
-from database.models import Service, TimeEntry, Invoice
+from database.grouping import fetch_grouped_totals, pivot
+from database.invoicing import create_invoice
+from database.money import amount_cents, format_cents
+from database.overlaps import find_overlaps
+from database.reporting import ReportTotals, in_report, iter_report_rows
+from database.rollup import fetch_daily_totals
+from database.sessions import retry_on_busy
+from .diagnostics import handler_span
+from .search_dialog import SearchDialog
+from .service_catalog import ServiceCatalog
+from .table_models import ColumnStore, LazyTableModel, PivotTableModel, TableColumn, NUMBER_ALIGNMENT
+from .workers import start_worker
+
+
+def _report_columns(service_catalog):
+    """Columns of the report table; services are stored by id."""
+    return [
+        TableColumn("Data", lambda value: value.strftime("%d/%m/%Y")),
+        TableColumn("Servizio", service_catalog.name, typecode='q'),
+        TableColumn("Inizio", lambda value: value.strftime("%H:%M")),
+        TableColumn("Fine", lambda value: value.strftime("%H:%M")),
+        TableColumn("Ore", lambda value: f"{value / 3600:.2f}", typecode='q', alignment=NUMBER_ALIGNMENT),
+        TableColumn("Importo (€)", format_cents, typecode='q', alignment=NUMBER_ALIGNMENT),
+        TableColumn("ID", str, typecode='q'),
+    ]
+
+
+SECONDS_COLUMN = 4
+AMOUNT_COLUMN = 5
+ENTRY_ID_COLUMN = 6
+
+
+# Groupings offered for the rows and columns of the pivot, and how time buckets
+# (dates of their first day) are shown
+PIVOT_GROUPINGS = {
+    'service': "Servizio",
+    'day': "Giorno",
+    'week': "Settimana",
+    'month': "Mese",
+    'year': "Anno",
+}
+BUCKET_FORMATS = {
+    'day': "%d/%m/%Y",
+    'week': "Sett. %d/%m/%Y",
+    'month': "%m/%Y",
+    'year': "%Y",
+}
+PIVOT_MEASURES = {
+    'seconds': ("Ore", lambda value: f"{value / 3600:.2f}"),
+    'amount_cents': ("Importo (€)", format_cents),
+}
+
+
+def _report_row(entry, amount):
+    """Table row of an entry snapshot from the change feed, billed ``amount`` cents."""
+    return (entry.start_time, entry.service_id, entry.start_time, entry.end_time,
+            entry.duration_seconds, amount, entry.id)
+
+
+def _report_overlaps(session, start, end, service_id):
+    """Overlapping pairs of entries of a report."""
+    return [
+        overlap for overlap in find_overlaps(session, start, end)
+        if service_id is None or service_id in (overlap.first.service_id, overlap.second.service_id)
+    ]
+
+
+def _report_task(context, session, typecodes, start, end, service_id):
+    """Worker task: load the rows and totals of a report, the rows straight into a ``ColumnStore``."""
+    store = ColumnStore(typecodes)
+    for row in iter_report_rows(session, start, end, service_id):
+        store.extend([(row.start_time, row.service_id, row.start_time, row.end_time, row.seconds,
+                       row.amount_cents, row.entry_id)])
+        if len(store) % 1000 == 0:
+            context.progress(len(store))
+    totals = fetch_daily_totals(session, start, end, service_id)
+    overlaps = _report_overlaps(session, start, end, service_id)
+    return (start, end, service_id), store, totals, overlaps
+
+
+def _overlaps_task(context, session, start, end, service_id):
+    """Worker task: find the overlaps of a report again."""
+    return (start, end, service_id), _report_overlaps(session, start, end, service_id)
+
+
+def _pivot_task(context, session, start, end, service_id, groupings):
+    """Worker task: sum a report per pair of groups, grouped by SQLite from the daily rollup."""
+    crosstab = pivot(fetch_grouped_totals(session, start, end, groupings, service_id))
+    return (start, end, service_id), groupings, crosstab
+
+
+def _export_report_task(context, session, filename, start, end, service_id):
+    """Worker task: stream a report to a CSV file."""
+    from database.export import export_report_csv
+    
+    export_report_csv(session, filename, start, end, service_id, progress=context.progress)
+    return filename
+
+
+def _create_invoice_task(context, session, start, end, service_id):
+    """Worker task: create the invoice of a report and return its number; the task's session commits it."""
+    # Only taking the write lock can be busy: retried like db_manager.write
+    return retry_on_busy(lambda: create_invoice(session, start, end, service_id)).invoice_number
+
+
+def _export_invoice_task(context, session, filename, invoice_number):
+    """Worker task: stream an invoice to a CSV file, from its stored lines."""
+    from database.export import export_invoice_csv
+    
+    export_invoice_csv(session, filename, invoice_number, progress=context.progress)
+    return filename
 
 
 class ReportsPanelWidget(QWidget):
     """Widget for generating reports and invoices."""
     
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, service_catalog=None):
         super().__init__()
         self.db_manager = db_manager
-        self.session = db_manager.get_session()
+        self.service_catalog = service_catalog or ServiceCatalog(db_manager, self)
+        self.service_catalog.changed.connect(self._services_changed)
+        self.service_catalog.notifier.services_changed.connect(self._rates_changed)
+        self.service_catalog.notifier.entries_changed.connect(self._entries_changed)
+        self.report_filters = None  # (start, end, service_id) of the report shown
+        self.report_totals = None  # ReportTotals of the report shown, kept up to date
+        self.worker = None  # Background task in progress, if any
+        self.report_stale = False  # Run the report shown again once the task in progress is over
+        self.pivot_groupings = ('service', 'month')  # (rows, columns) of the pivot
         
         self._setup_ui()
         self._load_services()
@@ -59,14 +176,21 @@ class ReportsPanelWidget(QWidget):
         date_layout.addWidget(self.service_filter)
         
         # Generate button
-        generate_button = QPushButton("📊 Genera Report")
-        generate_button.clicked.connect(self._generate_report)
-        generate_button.setMinimumHeight(35)
-        date_layout.addWidget(generate_button)
+        self.generate_button = QPushButton("📊 Genera Report")
+        self.generate_button.clicked.connect(self._generate_report)
+        self.generate_button.setMinimumHeight(35)
+        date_layout.addWidget(self.generate_button)
         
         date_layout.addStretch()
         filters_layout.addLayout(date_layout)
         
+        # Note search within the period and service above
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Cerca nelle note del periodo... (Invio)")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.returnPressed.connect(self._open_search)
+        filters_layout.addWidget(self.search_edit)
+        
         filters_group.setLayout(filters_layout)
         layout.addWidget(filters_group)
         
@@ -82,20 +206,26 @@ class ReportsPanelWidget(QWidget):
         self.total_amount_label.setStyleSheet("font-size: 14pt; font-weight: bold; color: #2d5016;")
         summary_layout.addWidget(self.total_amount_label)
         
+        self.overlaps_label = QLabel()
+        self.overlaps_label.setStyleSheet("font-size: 12pt; font-weight: bold; color: #b35900;")
+        self.overlaps_label.hide()
+        summary_layout.addWidget(self.overlaps_label)
+        
         summary_layout.addStretch()
         summary_group.setLayout(summary_layout)
         layout.addWidget(summary_group)
         
-        # Report table
-        table_group = QGroupBox("📋 Dettaglio Voci")
-        table_layout = QVBoxLayout()
+        # Report table and pivot
+        self.report_tabs = QTabWidget()
+        
+        table_tab = QWidget()
+        table_layout = QVBoxLayout(table_tab)
         
-        self.report_table = QTableWidget()
-        self.report_table.setColumnCount(6)
-        self.report_table.setHorizontalHeaderLabels([
-            "Data", "Servizio", "Inizio", "Fine", "Ore", "Importo (€)"
-        ])
-        self.report_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.report_model = LazyTableModel(_report_columns(self.service_catalog), parent=self)
+        self.report_table = QTableView()
+        self.report_table.setModel(self.report_model)
+        self.report_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.report_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         self.report_table.setAlternatingRowColors(True)
         self.report_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
         self.report_table.setColumnWidth(0, 100)
@@ -104,95 +234,332 @@ class ReportsPanelWidget(QWidget):
         self.report_table.setColumnWidth(3, 100)
         self.report_table.setColumnWidth(4, 80)
         self.report_table.setColumnWidth(5, 100)
+        self.report_table.setColumnHidden(ENTRY_ID_COLUMN, True)
         
         table_layout.addWidget(self.report_table)
-        table_group.setLayout(table_layout)
-        layout.addWidget(table_group, stretch=1)
+        self.report_tabs.addTab(table_tab, "📋 Dettaglio Voci")
+        self.report_tabs.addTab(self._setup_pivot(), "🧮 Riepilogo per Gruppi")
+        layout.addWidget(self.report_tabs, stretch=1)
         
         # Export buttons
         export_layout = QHBoxLayout()
+        
+        # Background task progress
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)  # Busy indicator: totals are not known upfront
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.hide()
+        export_layout.addWidget(self.progress_bar)
+        
+        self.progress_label = QLabel()
+        export_layout.addWidget(self.progress_label)
+        
+        self.cancel_button = QPushButton("✖ Annulla")
+        self.cancel_button.clicked.connect(self._cancel_task)
+        self.cancel_button.hide()
+        export_layout.addWidget(self.cancel_button)
+        
         export_layout.addStretch()
         
-        export_csv_button = QPushButton("📄 Esporta CSV")
-        export_csv_button.clicked.connect(self._export_csv)
-        export_layout.addWidget(export_csv_button)
+        self.export_csv_button = QPushButton("📄 Esporta CSV")
+        self.export_csv_button.clicked.connect(self._export_csv)
+        export_layout.addWidget(self.export_csv_button)
         
-        create_invoice_button = QPushButton("🧾 Crea Fattura")
-        create_invoice_button.clicked.connect(self._create_invoice)
-        export_layout.addWidget(create_invoice_button)
+        self.create_invoice_button = QPushButton("🧾 Crea Fattura")
+        self.create_invoice_button.clicked.connect(self._create_invoice)
+        export_layout.addWidget(self.create_invoice_button)
         
         layout.addLayout(export_layout)
     
+    def _setup_pivot(self):
+        """Build the pivot tab: grouping and measure choices above the crosstab."""
+        pivot_tab = QWidget()
+        pivot_layout = QVBoxLayout(pivot_tab)
+        
+        options_layout = QHBoxLayout()
+        self.pivot_rows_combo = QComboBox()
+        self.pivot_columns_combo = QComboBox()
+        for combo, grouping in zip((self.pivot_rows_combo, self.pivot_columns_combo), self.pivot_groupings):
+            for key, label in PIVOT_GROUPINGS.items():
+                combo.addItem(label, key)
+            combo.setCurrentIndex(combo.findData(grouping))
+            combo.currentIndexChanged.connect(self._pivot_groupings_changed)
+        options_layout.addWidget(QLabel("Righe:"))
+        options_layout.addWidget(self.pivot_rows_combo)
+        options_layout.addWidget(QLabel("Colonne:"))
+        options_layout.addWidget(self.pivot_columns_combo)
+        
+        self.pivot_measure_combo = QComboBox()
+        for measure, (label, _) in PIVOT_MEASURES.items():
+            self.pivot_measure_combo.addItem(label, measure)
+        self.pivot_measure_combo.currentIndexChanged.connect(self._pivot_measure_changed)
+        options_layout.addWidget(QLabel("Valore:"))
+        options_layout.addWidget(self.pivot_measure_combo)
+        options_layout.addStretch()
+        pivot_layout.addLayout(options_layout)
+        
+        self.pivot_model = PivotTableModel(self)
+        self._pivot_measure_changed()
+        self.pivot_table = QTableView()
+        self.pivot_table.setModel(self.pivot_model)
+        self.pivot_table.setAlternatingRowColors(True)
+        self.pivot_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        pivot_layout.addWidget(self.pivot_table)
+        return pivot_tab
+    
+    @handler_span
     def _load_services(self):
-        """Load services into filter combo."""
+        """Load services into filter combo, keeping the current selection."""
+        current_id = self.service_filter.currentData()
         self.service_filter.clear()
         self.service_filter.addItem("Tutti i Servizi", None)
         
-        services = self.session.query(Service).order_by(Service.name).all()
-        for service in services:
+        for service in self.service_catalog.services():
             self.service_filter.addItem(service.name, service.id)
+        index = self.service_filter.findData(current_id)
+        if index >= 0:
+            self.service_filter.setCurrentIndex(index)
+    
+    def _services_changed(self):
+        """Refresh the filter and the service names shown in the report."""
+        self._load_services()
+        self.report_model.refresh_display()
+        self._load_pivot()  # Service names are the pivot's headers
     
+    @handler_span
     def _generate_report(self):
         """Generate report based on filters."""
         start = self.start_date.date().toPyDate()
         end = self.end_date.date().toPyDate()
-        end = datetime.combine(end, datetime.max.time())  # End of day
         service_id = self.service_filter.currentData()
-        
-        # Query time entries
-        query = self.session.query(TimeEntry).filter(
-            TimeEntry.start_time >= start,
-            TimeEntry.start_time <= end,
-            TimeEntry.end_time.isnot(None)  # Only completed entries
+        self._load_report(start, end, service_id)
+    
+    def _load_report(self, start, end, service_id):
+        """Load a report in the background."""
+        self.report_stale = False
+        typecodes = [column.typecode for column in _report_columns(self.service_catalog)]
+        self._start_task(
+            "Caricamento report...", _report_task, typecodes, start, end, service_id,
+            on_result=self._show_report
         )
+    
+    def _reload_report(self):
+        """Run the report shown again, after the task in progress (which may be reading it)."""
+        if self.worker is not None:
+            self.report_stale = True
+        elif self.report_filters is not None:
+            self._load_report(*self.report_filters)
+    
+    @handler_span
+    def _open_search(self):
+        """Search the notes of the entries in the selected period and service."""
+        SearchDialog(
+            self.db_manager, self.service_catalog, self, self.search_edit.text(),
+            self.start_date.date().toPyDate(), self.end_date.date().toPyDate(),
+            self.service_filter.currentData()
+        ).exec()
+
+    def _show_report(self, result):
+        """Show a report loaded by the background task."""
+        self.report_filters, store, self.report_totals, overlaps = result
+        with self.db_manager.span('ReportsPanelWidget._show_report'):
+            self.report_model.set_store(store)
+        self._show_totals()
+        self._show_overlaps(overlaps)
+        self._load_pivot()
+    
+    def _show_totals(self):
+        """Update the summary from ``report_totals``."""
+        self.total_hours_label.setText(f"Ore Totali: {self.report_totals.hours:.2f}")
+        self.total_amount_label.setText(f"Importo Totale: {format_cents(self.report_totals.amount_cents)}€")
+    
+    def _entries_changed(self, changes):
+        """Apply committed changes of the entries to the report shown: rows and totals, without a query."""
+        if self.report_filters is None:
+            return
+        if self.worker is not None or any(change.old is None and change.new is None for change in changes):
+            self._reload_report()  # The report being read may predate the changes, or they were made in bulk
+            return
         
-        if service_id is not None:
-            query = query.filter(TimeEntry.service_id == service_id)
-        
-        entries = query.order_by(TimeEntry.start_time).all()
-        
-        # Populate table
-        self.report_table.setRowCount(0)
-        total_hours = 0.0
-        total_amount = 0.0
-        
-        for entry in entries:
-            row = self.report_table.rowCount()
-            self.report_table.insertRow(row)
-            
-            # Date
-            date_str = entry.start_time.strftime("%d/%m/%Y")
-            self.report_table.setItem(row, 0, QTableWidgetItem(date_str))
-            
-            # Service
-            self.report_table.setItem(row, 1, QTableWidgetItem(entry.service.name))
-            
-            # Start time
-            start_str = entry.start_time.strftime("%H:%M")
-            self.report_table.setItem(row, 2, QTableWidgetItem(start_str))
-            
-            # End time
-            end_str = entry.end_time.strftime("%H:%M") if entry.end_time else "-"
-            self.report_table.setItem(row, 3, QTableWidgetItem(end_str))
-            
-            # Hours
-            hours = entry.duration_hours or 0.0
-            self.report_table.setItem(row, 4, QTableWidgetItem(f"{hours:.2f}"))
-            
-            # Amount
-            amount = hours * entry.service.hourly_rate
-            self.report_table.setItem(row, 5, QTableWidgetItem(f"{amount:.2f}"))
-            
-            total_hours += hours
-            total_amount += amount
-        
-        # Update summary
-        self.total_hours_label.setText(f"Ore Totali: {total_hours:.2f}")
-        self.total_amount_label.setText(f"Importo Totale: {total_amount:.2f}€")
+        start, end, service_id = self.report_filters
+        seconds, amount = self.report_totals
+        touched = False
+        for change in changes:
+            if change.old is not None:
+                row = self.report_model.find_row(ENTRY_ID_COLUMN, change.old.id)
+                if row is not None:
+                    # What the report counted, even if the service is gone
+                    seconds -= self.report_model.value(row, SECONDS_COLUMN)
+                    amount -= self.report_model.value(row, AMOUNT_COLUMN)
+                    self.report_model.remove_row(row)
+                    touched = True
+            if change.new is not None and in_report(change.new, start, end, service_id):
+                service = self.service_catalog.get(change.new.service_id)
+                if service is None:
+                    # A service added by another process, which the change feed does not see:
+                    # reload the catalog, and let the database bill the report again
+                    self.service_catalog.invalidate()
+                    self._reload_report()
+                    return
+                entry_amount = amount_cents(change.new.duration_seconds, service.hourly_rate_cents)
+                self.report_model.insert_row(self._report_position(change.new), _report_row(change.new, entry_amount))
+                seconds += change.new.duration_seconds
+                amount += entry_amount
+                touched = True
+        
+        if touched:
+            self.report_totals = ReportTotals(seconds, amount)
+            self._show_totals()
+            start_worker(
+                self.db_manager, _overlaps_task, *self.report_filters,
+                read_only=True,
+                on_result=self._overlaps_refreshed,
+            )
+            self._load_pivot()  # The rollup it reads was updated with the entries
+    
+    def _report_position(self, entry):
+        """Row where ``entry`` goes, the report being sorted by ``(start_time, id)``."""
+        key = (entry.start_time, entry.id)
+        low, high = 0, self.report_model.rowCount()
+        while low < high:
+            middle = (low + high) // 2
+            if (self.report_model.value(middle, 0), self.report_model.value(middle, ENTRY_ID_COLUMN)) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
     
+    def _rates_changed(self, changes):
+        """Run the report again if the rate of a service it bills changed."""
+        if self.report_filters is None:
+            return
+        service_id = self.report_filters[2]
+        for change in changes:
+            if change.old is None or change.new is None:
+                continue  # New services bill nothing yet; the entries of deleted ones go with their own changes
+            if (change.old.hourly_rate_cents != change.new.hourly_rate_cents
+                    and service_id in (None, change.new.id)):
+                # Amounts are rounded entry by entry: only the database can total them exactly
+                self._reload_report()
+                return
+    
+    def _overlaps_refreshed(self, result):
+        """Show the overlaps found again after a change, if still about the report shown."""
+        filters, overlaps = result
+        if filters == self.report_filters:
+            self._show_overlaps(overlaps)
+    
+    def _pivot_groupings_changed(self):
+        """Group the pivot by the chosen rows and columns; choosing the same for both swaps them."""
+        rows = self.pivot_rows_combo.currentData()
+        columns = self.pivot_columns_combo.currentData()
+        if rows == columns:
+            previous_rows, previous_columns = self.pivot_groupings
+            other, replaced = (
+                (self.pivot_columns_combo, previous_rows) if rows != previous_rows
+                else (self.pivot_rows_combo, previous_columns)
+            )
+            other.blockSignals(True)
+            other.setCurrentIndex(other.findData(replaced))
+            other.blockSignals(False)
+        self.pivot_groupings = (self.pivot_rows_combo.currentData(), self.pivot_columns_combo.currentData())
+        self._load_pivot()
+    
+    def _pivot_measure_changed(self):
+        """Show the chosen measure in the pivot, without a query."""
+        measure = self.pivot_measure_combo.currentData()
+        self.pivot_model.set_measure(measure, PIVOT_MEASURES[measure][1])
+    
+    def _load_pivot(self):
+        """Group the report shown in the background, for the pivot tab."""
+        if self.report_filters is None:
+            return
+        start_worker(
+            self.db_manager, _pivot_task, *self.report_filters, self.pivot_groupings,
+            read_only=True,
+            on_result=self._show_pivot,
+        )
+    
+    def _show_pivot(self, result):
+        """Show a pivot grouped by the background task, if still about the report and groupings shown."""
+        filters, groupings, crosstab = result
+        if filters != self.report_filters or groupings != self.pivot_groupings:
+            return
+        rows, columns = groupings
+        self.pivot_model.set_crosstab(crosstab, self._pivot_key_formatter(rows), self._pivot_key_formatter(columns))
+    
+    def _pivot_key_formatter(self, grouping):
+        """Header text of the groups of ``grouping``: service names, or the first day of time buckets."""
+        if grouping == 'service':
+            return self.service_catalog.name
+        return lambda day: day.strftime(BUCKET_FORMATS[grouping])
+    
+    def _show_overlaps(self, overlaps):
+        """Warn about overlapping entries, which the totals would bill twice."""
+        self.overlaps_label.setVisible(bool(overlaps))
+        if not overlaps:
+            return
+        self.overlaps_label.setText(f"⚠️ {len(overlaps)} sovrapposizioni")
+        self.overlaps_label.setToolTip("\n".join(
+            f"{overlap.start_time:%d/%m/%Y %H:%M}-{overlap.end_time:%H:%M}: "
+            f"{self.service_catalog.name(overlap.first.service_id)} / "
+            f"{self.service_catalog.name(overlap.second.service_id)}"
+            for overlap in overlaps[:20]
+        ))
+    
+    def _start_task(self, message, fn, *args, on_result, read_only=True):
+        """Run a database task in the background, showing its progress."""
+        if self.worker is not None:
+            self.worker.cancel()
+        
+        self._set_busy(True, message)
+        self.worker = start_worker(
+            self.db_manager, fn, *args,
+            read_only=read_only,
+            on_result=on_result,
+            on_error=self._task_failed,
+            on_progress=self._task_progress,
+        )
+        worker = self.worker
+        worker.signals.finished.connect(lambda: self._task_finished(worker))
+    
+    def _cancel_task(self):
+        """Cancel the background task in progress."""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.progress_label.setText("Annullamento...")
+    
+    def _task_progress(self, done, total):
+        """Show the progress of the background task."""
+        self.progress_label.setText(f"{done} righe elaborate...")
+    
+    def _task_failed(self, message):
+        """Report an error raised by the background task."""
+        QMessageBox.critical(self, "Errore", f"Errore durante l'operazione:\n{message}")
+    
+    def _task_finished(self, worker):
+        """Reset the busy state once the current task is over."""
+        if worker is self.worker:
+            self.worker = None
+            self._set_busy(False)
+            if self.report_stale:
+                self._reload_report()
+    
+    def _set_busy(self, busy, message=""):
+        """Toggle progress widgets and the buttons that would start another task."""
+        self.progress_bar.setVisible(busy)
+        self.cancel_button.setVisible(busy)
+        self.progress_label.setText(message)
+        self.generate_button.setEnabled(not busy)
+        self.export_csv_button.setEnabled(not busy)
+        self.create_invoice_button.setEnabled(not busy)
+    
+    @handler_span
     def _export_csv(self):
         """Export report to CSV."""
-        if self.report_table.rowCount() == 0:
+        from PyQt6.QtWidgets import QFileDialog
+        
+        if self.report_model.rowCount() == 0:
             QMessageBox.warning(self, "Attenzione", "Nessun dato da esportare.")
             return
         
@@ -204,59 +571,29 @@ class ReportsPanelWidget(QWidget):
         )
         
         if filename:
-            try:
-                with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    
-                    # Write headers
-                    headers = []
-                    for col in range(self.report_table.columnCount()):
-                        headers.append(self.report_table.horizontalHeaderItem(col).text())
-                    writer.writerow(headers)
-                    
-                    # Write data
-                    for row in range(self.report_table.rowCount()):
-                        row_data = []
-                        for col in range(self.report_table.columnCount()):
-                            item = self.report_table.item(row, col)
-                            row_data.append(item.text() if item else "")
-                        writer.writerow(row_data)
-                    
-                    # Write summary
-                    writer.writerow([])
-                    writer.writerow(["Totale Ore", self.total_hours_label.text().split(": ")[1]])
-                    writer.writerow(["Importo Totale", self.total_amount_label.text().split(": ")[1]])
-                
-                QMessageBox.information(self, "Successo", f"Report esportato in:\n{filename}")
-            except Exception as e:
-                QMessageBox.critical(self, "Errore", f"Errore durante l'esportazione:\n{str(e)}")
+            self._start_task(
+                "Esportazione in corso...", _export_report_task, filename, *self.report_filters,
+                on_result=lambda path: QMessageBox.information(
+                    self, "Successo", f"Report esportato in:\n{path}"
+                )
+            )
     
+    @handler_span
     def _create_invoice(self):
         """Create invoice from current report."""
-        if self.report_table.rowCount() == 0:
+        if self.report_model.rowCount() == 0:
             QMessageBox.warning(self, "Attenzione", "Nessun dato per creare la fattura.")
             return
         
-        # Get total amount
-        total_text = self.total_amount_label.text().split(": ")[1]
-        total_amount = float(total_text.replace("€", "").strip())
-        
-        # Generate invoice number
-        invoice_count = self.session.query(Invoice).count()
-        invoice_number = f"INV-{datetime.now().year}-{invoice_count + 1:04d}"
-        
-        # Create invoice record
-        invoice = Invoice(
-            invoice_number=invoice_number,
-            period_start=datetime.combine(self.start_date.date().toPyDate(), datetime.min.time()),
-            period_end=datetime.combine(self.end_date.date().toPyDate(), datetime.max.time()),
-            total_amount=total_amount
+        self._start_task(
+            "Creazione fattura...", _create_invoice_task, *self.report_filters,
+            on_result=self._export_invoice, read_only=False
         )
+    
+    def _export_invoice(self, invoice_number):
+        """Save a just created invoice as CSV."""
+        from PyQt6.QtWidgets import QFileDialog
         
-        self.session.add(invoice)
-        self.session.commit()
-        
-        # Export invoice
         filename, _ = QFileDialog.getSaveFileName(
             self,
             "Salva Fattura",
@@ -265,40 +602,11 @@ class ReportsPanelWidget(QWidget):
         )
         
         if filename:
-            try:
-                with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    
-                    # Invoice header
-                    writer.writerow(["FATTURA"])
-                    writer.writerow(["Numero Fattura", invoice_number])
-                    writer.writerow(["Data", datetime.now().strftime("%d/%m/%Y")])
-                    writer.writerow(["Periodo", f"{self.start_date.date().toString('dd/MM/yyyy')} - {self.end_date.date().toString('dd/MM/yyyy')}"])
-                    writer.writerow([])
-                    
-                    # Write headers
-                    headers = []
-                    for col in range(self.report_table.columnCount()):
-                        headers.append(self.report_table.horizontalHeaderItem(col).text())
-                    writer.writerow(headers)
-                    
-                    # Write data
-                    for row in range(self.report_table.rowCount()):
-                        row_data = []
-                        for col in range(self.report_table.columnCount()):
-                            item = self.report_table.item(row, col)
-                            row_data.append(item.text() if item else "")
-                        writer.writerow(row_data)
-                    
-                    # Totals
-                    writer.writerow([])
-                    writer.writerow(["", "", "", "", "TOTALE ORE:", self.total_hours_label.text().split(": ")[1]])
-                    writer.writerow(["", "", "", "", "TOTALE €:", f"{total_amount:.2f}"])
-                
-                QMessageBox.information(
+            self._start_task(
+                "Esportazione fattura...", _export_invoice_task, filename, invoice_number,
+                on_result=lambda path: QMessageBox.information(
                     self,
                     "Successo",
-                    f"Fattura {invoice_number} creata e salvata in:\n{filename}"
+                    f"Fattura {invoice_number} creata e salvata in:\n{path}"
                 )
-            except Exception as e:
-                QMessageBox.critical(self, "Errore", f"Errore durante la creazione della fattura:\n{str(e)}")
+            )
@@ -0,0 +1,137 @@
+"""Full-text search dialog over entry notes and services."""
+
+import time
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+    QTableView, QHeaderView
+)
+from PyQt6.QtCore import QTimer
+
+from database.search import search_entries, search_services
+from .diagnostics import handler_span
+from .service_catalog import ServiceCatalog
+from .table_models import LazyTableModel, TableColumn, NUMBER_ALIGNMENT
+
+
+# Pause after the last keystroke before searching
+SEARCH_DELAY_MS = 250
+
+# Services named in the "Servizi" line; the rest are only counted
+MAX_LISTED_SERVICES = 5
+
+
+def _hit_columns(service_catalog):
+    """Columns of the hits table: ``EntryHit`` fields, best match first."""
+    return [
+        TableColumn("Data", lambda value: value.strftime("%d/%m/%Y %H:%M")),
+        TableColumn("Servizio", service_catalog.name, typecode='q'),
+        TableColumn("Ore", lambda value: f"{value:.2f}" if value else "-", alignment=NUMBER_ALIGNMENT),
+        TableColumn("Estratto", lambda value: " ".join(value.split())),
+    ]
+
+
+class SearchDialog(QDialog):
+    """Ranked search over the notes of the entries, within optional filters."""
+
+    def __init__(self, db_manager, service_catalog=None, parent=None, query="",
+                 start=None, end=None, service_id=None):
+        """
+        Args:
+            db_manager: DatabaseManager instance.
+            service_catalog: ServiceCatalog for service names.
+            parent: Parent widget.
+            query: Initial search text.
+            start: Optional first day of the entries searched.
+            end: Optional last day, inclusive.
+            service_id: Optional service of the entries searched.
+        """
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.service_catalog = service_catalog or ServiceCatalog(db_manager, self)
+        self.start = start
+        self.end = end
+        self.service_id = service_id
+        self.setWindowTitle("Cerca nelle Note")
+        self.resize(850, 500)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self._search)
+
+        self._setup_ui()
+        self.query_edit.setText(query)
+        self._search()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("Parole da cercare, anche iniziali (es. \"ross fatt\")")
+        self.query_edit.setClearButtonEnabled(True)
+        self.query_edit.textChanged.connect(self.search_timer.start)
+        self.query_edit.returnPressed.connect(self._search)
+        layout.addWidget(self.query_edit)
+
+        scope = self._scope_text()
+        if scope:
+            layout.addWidget(QLabel(scope))
+
+        self.services_label = QLabel()
+        self.services_label.setWordWrap(True)
+        layout.addWidget(self.services_label)
+
+        self.hits_model = LazyTableModel(_hit_columns(self.service_catalog), parent=self)
+        self.hits_table = QTableView()
+        self.hits_table.setModel(self.hits_model)
+        self.hits_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.hits_table.setAlternatingRowColors(True)
+        self.hits_table.verticalHeader().setVisible(False)
+        header = self.hits_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.hits_table)
+
+        buttons = QHBoxLayout()
+        self.status_label = QLabel()
+        buttons.addWidget(self.status_label)
+        buttons.addStretch()
+        close_button = QPushButton("Chiudi")
+        close_button.clicked.connect(self.close)
+        buttons.addWidget(close_button)
+        layout.addLayout(buttons)
+
+    def _scope_text(self):
+        """Description of the filters the search is limited to, or ''."""
+        parts = []
+        if self.start is not None and self.end is not None:
+            parts.append(f"dal {self.start.strftime('%d/%m/%Y')} al {self.end.strftime('%d/%m/%Y')}")
+        if self.service_id is not None:
+            parts.append(f"servizio {self.service_catalog.name(self.service_id)}")
+        return f"Solo voci {', '.join(parts)}" if parts else ""
+
+    @handler_span
+    def _search(self):
+        """Run the search for the current text."""
+        self.search_timer.stop()
+        query = self.query_edit.text()
+        started = time.perf_counter()
+        with self.db_manager.session_scope(read_only=True) as session:
+            hits = search_entries(session, query, self.start, self.end, self.service_id)
+            services = search_services(session, query)
+        elapsed = time.perf_counter() - started
+
+        self.hits_model.set_source(
+            (hit.start_time, hit.service_id, hit.hours, hit.snippet) for hit in hits
+        )
+        if services:
+            names = ", ".join(service.name for service in services[:MAX_LISTED_SERVICES])
+            more = len(services) - MAX_LISTED_SERVICES
+            self.services_label.setText(f"Servizi: {names}" + (f" e altri {more}" if more > 0 else ""))
+        else:
+            self.services_label.clear()
+        if query.strip():
+            self.status_label.setText(f"{len(hits)} risultati in {elapsed * 1000:.0f} ms")
+        else:
+            self.status_label.clear()
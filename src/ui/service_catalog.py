@@ -0,0 +1,84 @@
+"""Service catalog shared by the UI panels."""
+
+from collections import namedtuple
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from sqlalchemy import select
+
+from database.models import Service
+from .change_notifier import ChangeNotifier
+
+
+ServiceInfo = namedtuple('ServiceInfo', ['id', 'name', 'hourly_rate_cents', 'description'])
+
+
+class ServiceCatalog(QObject):
+    """
+    In-memory cache of the services, keyed by id.
+
+    Loaded once with a single query and kept up to date from the committed
+    changes of the services, whoever made them; ``changed`` then tells every
+    panel to refresh its combos and tables. ``invalidate()`` reloads it after
+    the whole database changed (a restore).
+
+    The catalog also owns the ``ChangeNotifier`` the panels sharing it listen
+    to for the changes of the entries.
+    """
+
+    changed = pyqtSignal()
+
+    def __init__(self, db_manager, parent=None, notifier=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self._by_id = None
+        self._ordered = None
+        self.notifier = notifier or ChangeNotifier(db_manager, self)
+        self.notifier.services_changed.connect(self._apply_changes)
+
+    def _ensure_loaded(self):
+        if self._by_id is not None:
+            return
+        with self.db_manager.session_scope(read_only=True) as session:
+            rows = session.execute(
+                select(Service.id, Service.name, Service.hourly_rate_cents, Service.description)
+                .order_by(Service.name)
+            ).all()
+        self._ordered = [ServiceInfo(*row) for row in rows]
+        self._by_id = {service.id: service for service in self._ordered}
+
+    def services(self):
+        """Return all services, ordered by name."""
+        self._ensure_loaded()
+        return list(self._ordered)
+
+    def get(self, service_id):
+        """Return the ``ServiceInfo`` of a service, or None if unknown."""
+        self._ensure_loaded()
+        return self._by_id.get(service_id)
+
+    def name(self, service_id):
+        """Return the name of a service, resolved without a query."""
+        service = self.get(service_id)
+        return service.name if service else "-"
+
+    def _apply_changes(self, changes):
+        """Update the cache from committed ``Change`` records of the services."""
+        if self._by_id is not None:
+            for change in changes:
+                if change.old is None and change.new is None:
+                    self._by_id = None
+                    self._ordered = None
+                    break
+                if change.old is not None:
+                    self._by_id.pop(change.old.id, None)
+                if change.new is not None:
+                    self._by_id[change.new.id] = ServiceInfo(*change.new)
+            if self._by_id is not None:
+                self._ordered = sorted(self._by_id.values(), key=lambda service: service.name)
+        self.changed.emit()
+
+    def invalidate(self):
+        """Drop the cache after services changed and notify the panels."""
+        self._by_id = None
+        self._ordered = None
+        self.changed.emit()
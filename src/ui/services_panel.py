@@ -8,15 +8,53 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt
 
 from database.models import Service
+from database.money import format_cents, to_cents
+from .diagnostics import handler_span
+from .service_catalog import ServiceCatalog
+
+
+def _add_service(session, name, hourly_rate, description):
+    """Write: add a service; return False if one with that name exists."""
+    if session.query(Service).filter(Service.name == name).first():
+        return False
+    session.add(Service(name=name, hourly_rate=hourly_rate, description=description))
+    return True
+
+
+def _update_service(session, service_id, changes):
+    """
+    Write: set the edited fields of a service, from a dict of column values.
+
+    Fields the user did not edit are left as they are in the database, even
+    if another process changed them meanwhile. Return False if the new name
+    is taken by another service.
+    """
+    if 'name' in changes and session.query(Service).filter(
+        Service.name == changes['name'], Service.id != service_id
+    ).first():
+        return False
+    service = session.get(Service, service_id)
+    if service:  # Otherwise deleted meanwhile: the change feed drops it from the table
+        for field, value in changes.items():
+            setattr(service, field, value)
+    return True
+
+
+def _remove_service(session, service_id):
+    """Write: delete a service and its entries."""
+    service = session.get(Service, service_id)
+    if service:
+        session.delete(service)
 
 
 class ServicesPanelWidget(QWidget):
     """Widget for managing service types and rates."""
     
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, service_catalog=None):
         super().__init__()
         self.db_manager = db_manager
-        self.session = db_manager.get_session()
+        self.service_catalog = service_catalog or ServiceCatalog(db_manager, self)
+        self.service_catalog.changed.connect(self._load_services)
         
         self._setup_ui()
         self._load_services()
@@ -110,20 +148,20 @@ class ServicesPanelWidget(QWidget):
         table_group.setLayout(table_layout)
         layout.addWidget(table_group, stretch=1)
     
+    @handler_span
     def _load_services(self):
         """Load services into table."""
         self.services_table.setRowCount(0)
-        services = self.session.query(Service).order_by(Service.name).all()
-        
-        for service in services:
+        for service in self.service_catalog.services():
             row = self.services_table.rowCount()
             self.services_table.insertRow(row)
             
             self.services_table.setItem(row, 0, QTableWidgetItem(service.name))
-            self.services_table.setItem(row, 1, QTableWidgetItem(f"{service.hourly_rate:.2f}"))
+            self.services_table.setItem(row, 1, QTableWidgetItem(format_cents(service.hourly_rate_cents)))
             self.services_table.setItem(row, 2, QTableWidgetItem(service.description or ""))
             self.services_table.setItem(row, 3, QTableWidgetItem(str(service.id)))
     
+    @handler_span
     def _add_service(self):
         """Add a new service."""
         name = self.name_edit.text().strip()
@@ -131,30 +169,21 @@ class ServicesPanelWidget(QWidget):
             QMessageBox.warning(self, "Attenzione", "Inserisci il nome del servizio.")
             return
         
-        # Check if service already exists
-        existing = self.session.query(Service).filter(Service.name == name).first()
-        if existing:
+        added = self.db_manager.write(
+            _add_service, name, self.rate_spinbox.value(), self.desc_edit.toPlainText().strip() or None
+        )
+        if not added:
             QMessageBox.warning(self, "Attenzione", "Un servizio con questo nome esiste già.")
             return
         
-        service = Service(
-            name=name,
-            hourly_rate=self.rate_spinbox.value(),
-            description=self.desc_edit.toPlainText().strip() or None
-        )
-        
-        self.session.add(service)
-        self.session.commit()
-        
         QMessageBox.information(self, "Successo", f"Servizio '{name}' aggiunto con successo!")
         
         # Clear form
         self.name_edit.clear()
         self.rate_spinbox.setValue(35.0)
         self.desc_edit.clear()
-        
-        self._load_services()
     
+    @handler_span
     def _edit_service(self):
         """Edit selected service."""
         selected_rows = set(item.row() for item in self.services_table.selectedItems())
@@ -164,14 +193,17 @@ class ServicesPanelWidget(QWidget):
         
         row = list(selected_rows)[0]
         service_id = int(self.services_table.item(row, 3).text())
-        service = self.session.query(Service).get(service_id)
+        # The dialog edits a detached copy: no transaction stays open while it is shown
+        with self.db_manager.session_scope(read_only=True) as session:
+            service = session.get(Service, service_id)
         
         if service:
             dialog = ServiceEditDialog(service, self)
-            if dialog.exec():
-                self.session.commit()
-                self._load_services()
+            if dialog.exec() and dialog.changes:
+                if not self.db_manager.write(_update_service, service_id, dialog.changes):
+                    QMessageBox.warning(self, "Attenzione", "Un servizio con questo nome esiste già.")
     
+    @handler_span
     def _delete_service(self):
         """Delete selected service."""
         selected_rows = set(item.row() for item in self.services_table.selectedItems())
@@ -192,11 +224,7 @@ class ServicesPanelWidget(QWidget):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            service = self.session.query(Service).get(service_id)
-            if service:
-                self.session.delete(service)
-                self.session.commit()
-                self._load_services()
+            self.db_manager.write(_remove_service, service_id)
 
 
 class ServiceEditDialog(QDialog):
@@ -205,6 +233,7 @@ class ServiceEditDialog(QDialog):
     def __init__(self, service, parent=None):
         super().__init__(parent)
         self.service = service
+        self.changes = {}  # Edited column values, once saved
         self.setWindowTitle(f"Modifica Servizio: {service.name}")
         self.setMinimumWidth(400)
         
@@ -256,8 +285,13 @@ class ServiceEditDialog(QDialog):
             QMessageBox.warning(self, "Attenzione", "Il nome non può essere vuoto.")
             return
         
-        self.service.name = name
-        self.service.hourly_rate = self.rate_spinbox.value()
-        self.service.description = self.desc_edit.toPlainText().strip() or None
+        edited = {
+            'name': name,
+            'hourly_rate_cents': to_cents(self.rate_spinbox.value()),
+            'description': self.desc_edit.toPlainText().strip() or None,
+        }
+        self.changes = {
+            field: value for field, value in edited.items() if value != getattr(self.service, field)
+        }
         
         self.accept()
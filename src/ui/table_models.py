@@ -0,0 +1,309 @@
+"""Table models backed by compact column storage."""
+
+from array import array
+from collections import namedtuple
+from itertools import islice
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QFont
+
+
+# Column definition: header text, value -> display string, optional array
+# typecode for numeric columns, optional alignment
+TableColumn = namedtuple(
+    'TableColumn', ['header', 'formatter', 'typecode', 'alignment'], defaults=(str, None, None)
+)
+
+NUMBER_ALIGNMENT = Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+
+
+class ColumnStore:
+    """Rows stored column by column, numeric columns in typed arrays."""
+
+    def __init__(self, typecodes):
+        """
+        Args:
+            typecodes: One entry per column: an ``array`` typecode, or None
+                for a plain list of Python objects.
+        """
+        self._typecodes = list(typecodes)
+        self.clear()
+
+    def clear(self):
+        """Remove all rows."""
+        self.columns = [array(code) if code else [] for code in self._typecodes]
+        self._length = 0
+
+    def extend(self, rows):
+        """Append rows (sequences with one value per column)."""
+        for row in rows:
+            for column, value in zip(self.columns, row):
+                column.append(value)
+            self._length += 1
+
+    def insert(self, row, values):
+        """Insert a row before position ``row``."""
+        for column, value in zip(self.columns, values):
+            column.insert(row, value)
+        self._length += 1
+
+    def replace(self, row, values):
+        """Overwrite the values of a row."""
+        for column, value in zip(self.columns, values):
+            column[row] = value
+
+    def remove(self, row):
+        """Remove a row."""
+        for column in self.columns:
+            del column[row]
+        self._length -= 1
+
+    def find(self, column, value):
+        """Return the first row holding ``value`` in ``column``, or None."""
+        try:
+            return self.columns[column].index(value)
+        except ValueError:
+            return None
+
+    def value(self, row, column):
+        """Return the value at ``(row, column)``."""
+        return self.columns[column][row]
+
+    def row(self, row):
+        """Return a whole row as a tuple."""
+        return tuple(column[row] for column in self.columns)
+
+    def rows(self):
+        """Iterate over all rows as tuples."""
+        return zip(*self.columns)
+
+    def __len__(self):
+        return self._length
+
+
+class LazyTableModel(QAbstractTableModel):
+    """
+    Read-only table model that pulls rows from an iterable on demand.
+
+    Rows are handed to the view in batches through ``canFetchMore`` /
+    ``fetchMore`` as the user scrolls, and display strings are only built in
+    ``data()`` for the cells the view actually paints.
+    """
+
+    def __init__(self, columns, batch_size=500, parent=None):
+        """
+        Args:
+            columns: List of ``TableColumn``.
+            batch_size: Rows pulled from the source per ``fetchMore``.
+            parent: Parent QObject.
+        """
+        super().__init__(parent)
+        self._columns = list(columns)
+        self._batch_size = batch_size
+        self._store = ColumnStore(column.typecode for column in self._columns)
+        self._source = iter(())
+        self._exhausted = True
+
+    def set_source(self, rows):
+        """Replace the contents with rows pulled lazily from ``rows``."""
+        self.beginResetModel()
+        self._store.clear()
+        self._source = iter(rows)
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore()  # First batch, so rowCount() tells whether there is any data
+
+    def set_store(self, store):
+        """Replace the contents with a complete ``ColumnStore``, e.g. filled by a worker."""
+        self.beginResetModel()
+        self._store = store
+        self._source = iter(())
+        self._exhausted = True
+        self.endResetModel()
+
+    def clear(self):
+        """Remove all rows."""
+        self.set_source(())
+
+    def refresh_display(self):
+        """Repaint every cell, e.g. after the data a formatter looks up changed."""
+        if len(self._store):
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(len(self._store) - 1, len(self._columns) - 1),
+                [Qt.ItemDataRole.DisplayRole],
+            )
+
+    def is_complete(self):
+        """True once every row of the source has been pulled."""
+        return self._exhausted
+
+    def find_row(self, column, value):
+        """Return the first row whose raw value in ``column`` is ``value``, or None."""
+        return self._store.find(column, value)
+
+    def insert_row(self, row, values):
+        """Insert one row before position ``row``, leaving the others untouched."""
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._store.insert(row, values)
+        self.endInsertRows()
+
+    def update_row(self, row, values):
+        """Replace the values of one row and repaint only that row."""
+        self._store.replace(row, values)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self._columns) - 1))
+
+    def remove_row(self, row):
+        """Remove one row."""
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._store.remove(row)
+        self.endRemoveRows()
+
+    def row_values(self, row):
+        """Return the raw values of a row."""
+        return self._store.row(row)
+
+    def value(self, row, column):
+        """Return the raw value at ``(row, column)``."""
+        return self._store.value(row, column)
+
+    # QAbstractTableModel interface
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._store)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        column = self._columns[index.column()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return column.formatter(self._store.value(index.row(), index.column()))
+        if role == Qt.ItemDataRole.UserRole:
+            return self._store.value(index.row(), index.column())
+        if role == Qt.ItemDataRole.TextAlignmentRole and column.alignment is not None:
+            return column.alignment
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._columns[section].header
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        batch = list(islice(self._source, self._batch_size))
+        if len(batch) < self._batch_size:
+            self._exhausted = True
+            self._source = iter(())
+        if not batch:
+            return
+        first = len(self._store)
+        self.beginInsertRows(QModelIndex(), first, first + len(batch) - 1)
+        self._store.extend(batch)
+        self.endInsertRows()
+
+
+class PivotTableModel(QAbstractTableModel):
+    """
+    Read-only crosstab (``database.grouping.Crosstab``) of one measure.
+
+    Row and column keys are the header labels; a last "Totale" row and
+    column hold the subtotals, computed once per crosstab and measure.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._crosstab = None
+        self._measure = None
+        self._formatter = str
+        self._row_formatter = self._column_formatter = str
+        self._row_totals = self._column_totals = []
+        self._total = 0
+        self._total_font = QFont()
+        self._total_font.setBold(True)
+
+    def set_crosstab(self, crosstab, row_formatter=str, column_formatter=str):
+        """Show ``crosstab``, its keys shown with the given formatters."""
+        self.beginResetModel()
+        self._crosstab = crosstab
+        self._row_formatter = row_formatter
+        self._column_formatter = column_formatter
+        self._compute_totals()
+        self.endResetModel()
+
+    def set_measure(self, measure, formatter=str):
+        """Show the cells of ``measure`` (see ``grouping.MEASURES``), each value shown with ``formatter``."""
+        self.beginResetModel()
+        self._measure = measure
+        self._formatter = formatter
+        self._compute_totals()
+        self.endResetModel()
+
+    def clear(self):
+        """Remove the crosstab."""
+        self.set_crosstab(None)
+
+    def _compute_totals(self):
+        crosstab, measure = self._crosstab, self._measure
+        if crosstab is None or measure is None:
+            self._row_totals = self._column_totals = []
+            self._total = 0
+            return
+        self._row_totals = [crosstab.row_total(measure, row) for row in range(len(crosstab.row_keys))]
+        self._column_totals = [crosstab.column_total(measure, column) for column in range(len(crosstab.column_keys))]
+        self._total = crosstab.total(measure)
+
+    def _value(self, row, column):
+        rows, columns = len(self._row_totals), len(self._column_totals)
+        if row < rows and column < columns:
+            return self._crosstab.value(self._measure, row, column)
+        if row < rows:
+            return self._row_totals[row]
+        if column < columns:
+            return self._column_totals[column]
+        return self._total
+
+    def is_total(self, index):
+        """True for the cells of the subtotal row and column."""
+        return index.row() == len(self._row_totals) or index.column() == len(self._column_totals)
+
+    # QAbstractTableModel interface
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self._crosstab is None:
+            return 0
+        return len(self._row_totals) + 1
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or self._crosstab is None:
+            return 0
+        return len(self._column_totals) + 1
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or self._measure is None:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._formatter(self._value(index.row(), index.column()))
+        if role == Qt.ItemDataRole.UserRole:
+            return self._value(index.row(), index.column())
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return NUMBER_ALIGNMENT
+        if role == Qt.ItemDataRole.FontRole and self.is_total(index):
+            return self._total_font
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or self._crosstab is None:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            keys, formatter = self._crosstab.column_keys, self._column_formatter
+        else:
+            keys, formatter = self._crosstab.row_keys, self._row_formatter
+        return formatter(keys[section]) if section < len(keys) else "Totale"
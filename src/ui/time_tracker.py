@@ -1,27 +1,107 @@
 """Time tracker widget for logging work hours."""
 
-from datetime import datetime
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
-    QComboBox, QTextEdit, QTableWidget, QTableWidgetItem,
+    QComboBox, QTextEdit, QTableView, QLineEdit, QCheckBox, QDateEdit,
     QGroupBox, QMessageBox, QHeaderView, QDateTimeEdit
 )
-from PyQt6.QtCore import Qt, QTimer, QDateTime
+from PyQt6.QtCore import Qt, QTimer, QDateTime, QDate
 from PyQt6.QtGui import QFont
+from sqlalchemy.exc import OperationalError
 
-from database.models import Service, TimeEntry
+from database.clock import utc_now
+from database.entries import (
+    PAGE_SIZE, EntryFilters, entry_key, entry_matches, entry_row, fetch_entries_page, fetch_entry
+)
+from database.models import TimeEntry
+from database.money import amount_cents, format_cents
+from database.overlaps import find_conflicts, find_overlaps
+from database.sessions import is_busy_error
+from database.timer import (
+    HEARTBEAT_INTERVAL, TimerClock, clear_heartbeat, close_stale_entries, find_running_entry, write_heartbeat
+)
+from .diagnostics import handler_span
+from .search_dialog import SearchDialog
+from .service_catalog import ServiceCatalog
+from .table_models import LazyTableModel, TableColumn, NUMBER_ALIGNMENT
+from .workers import start_worker
+
+
+def _entry_columns(service_catalog):
+    """Columns of the entries table; services are stored by id."""
+    return [
+        TableColumn("Servizio", service_catalog.name, typecode='q'),
+        TableColumn("Inizio", lambda value: value.strftime("%d/%m/%Y %H:%M")),
+        TableColumn("Fine", lambda value: value.strftime("%d/%m/%Y %H:%M") if value else "In corso..."),
+        TableColumn("Durata (h)", lambda value: f"{value:.2f}" if value else "-", alignment=NUMBER_ALIGNMENT),
+        TableColumn("Note", lambda value: value or ""),
+        TableColumn("ID", str, typecode='q'),
+    ]
+
+
+START_COLUMN = 1
+ENTRY_ID_COLUMN = 5
+
+# Pause after the last filter change before the history is reloaded
+FILTER_DELAY_MS = 300
+
+# Overlaps listed in a message box; the rest are only counted
+MAX_LISTED_OVERLAPS = 10
+
+
+def _overlaps_task(context, session):
+    """Worker task: find every overlapping pair of entries."""
+    return find_overlaps(session)
+
+
+def _add_entry(session, entry):
+    """Write: save a new entry."""
+    session.add(entry)
+
+
+def _stop_entry(session, entry_id, notes):
+    """Write: end a running entry now; return it, or None if it was deleted meanwhile."""
+    # Fresh copy: the entry may have been changed since the timer started
+    entry = session.get(TimeEntry, entry_id)
+    if entry is not None:
+        entry.end_time = utc_now()  # Aware: unambiguous in the hour repeated when DST ends
+        entry.heartbeat_at = None
+        entry.notes = notes
+    return entry
+
+
+def _delete_entries(session, entry_ids):
+    """Write: delete entries by id, skipping the ones already gone."""
+    for entry_id in entry_ids:
+        entry = session.get(TimeEntry, entry_id)
+        if entry:
+            session.delete(entry)
 
 
 class TimeTrackerWidget(QWidget):
     """Widget for tracking time entries."""
     
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, service_catalog=None):
         super().__init__()
         self.db_manager = db_manager
-        self.session = db_manager.get_session()
-        self.running_entry = None
-        self.timer = QTimer()
+        self.service_catalog = service_catalog or ServiceCatalog(db_manager, self)
+        self.service_catalog.changed.connect(self._services_changed)
+        self.service_catalog.notifier.entries_changed.connect(self._entries_changed)
+        self.running_entry = None  # Detached TimeEntry of the running timer, if any
+        self.clock = None  # TimerClock of the running timer
+        self.entries_filters = EntryFilters()  # Filters of the history shown
+        # Re-armed at each tick for the next whole second of the elapsed time
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.timer.timeout.connect(self._update_timer_display)
+        self.heartbeat_timer = QTimer(self)
+        self.heartbeat_timer.setInterval(HEARTBEAT_INTERVAL * 1000)
+        self.heartbeat_timer.timeout.connect(self._heartbeat)
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DELAY_MS)
+        self.filter_timer.timeout.connect(self._load_time_entries)
         
         self._setup_ui()
         self._load_services()
@@ -119,15 +199,53 @@ class TimeTrackerWidget(QWidget):
         entries_group = QGroupBox("📋 Voci Registrate")
         entries_layout = QVBoxLayout()
         
-        self.entries_table = QTableWidget()
-        self.entries_table.setColumnCount(6)
-        self.entries_table.setHorizontalHeaderLabels([
-            "Servizio", "Inizio", "Fine", "Durata (h)", "Note", "ID"
-        ])
+        # History filters: any change reloads the first page
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Servizio:"))
+        self.filter_service = QComboBox()
+        self.filter_service.setMinimumWidth(200)
+        self.filter_service.currentIndexChanged.connect(self.filter_timer.start)
+        filter_layout.addWidget(self.filter_service)
+        
+        self.filter_period = QCheckBox("Periodo:")
+        self.filter_period.toggled.connect(self._period_toggled)
+        filter_layout.addWidget(self.filter_period)
+        self.filter_start = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.filter_end = QDateEdit(QDate.currentDate())
+        for date_edit in (self.filter_start, self.filter_end):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("dd/MM/yyyy")
+            date_edit.setEnabled(False)
+            date_edit.dateChanged.connect(self.filter_timer.start)
+        filter_layout.addWidget(self.filter_start)
+        filter_layout.addWidget(QLabel("-"))
+        filter_layout.addWidget(self.filter_end)
+        
+        self.filter_text = QLineEdit()
+        self.filter_text.setPlaceholderText("Cerca nelle note...")
+        self.filter_text.setClearButtonEnabled(True)
+        self.filter_text.textChanged.connect(self.filter_timer.start)
+        filter_layout.addWidget(self.filter_text, stretch=1)
+        search_button = QPushButton("🔎 Cerca...")
+        search_button.setToolTip("Ricerca nelle note, con i risultati più pertinenti per primi")
+        search_button.clicked.connect(self._open_search)
+        filter_layout.addWidget(search_button)
+        
+        self.entries_count_label = QLabel()
+        filter_layout.addWidget(self.entries_count_label)
+        entries_layout.addLayout(filter_layout)
+        
+        # Older pages are loaded as the table is scrolled down
+        self.entries_model = LazyTableModel(_entry_columns(self.service_catalog), batch_size=PAGE_SIZE, parent=self)
+        for signal in (self.entries_model.modelReset, self.entries_model.rowsInserted, self.entries_model.rowsRemoved):
+            signal.connect(self._update_entries_count)
+        self.entries_table = QTableView()
+        self.entries_table.setModel(self.entries_model)
+        self.entries_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.entries_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
         self.entries_table.horizontalHeader().setStretchLastSection(False)
-        self.entries_table.setColumnHidden(5, True)  # Hide ID column
-        self.entries_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.entries_table.setColumnHidden(ENTRY_ID_COLUMN, True)  # Hide ID column
+        self.entries_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         self.entries_table.setAlternatingRowColors(True)
         
         # Set column widths
@@ -141,6 +259,9 @@ class TimeTrackerWidget(QWidget):
         
         # Delete button
         delete_layout = QHBoxLayout()
+        self.overlaps_button = QPushButton("⚠️ Verifica Sovrapposizioni")
+        self.overlaps_button.clicked.connect(self._check_overlaps)
+        delete_layout.addWidget(self.overlaps_button)
         delete_layout.addStretch()
         delete_button = QPushButton("🗑️ Elimina Selezionati")
         delete_button.clicked.connect(self._delete_selected_entries)
@@ -150,54 +271,178 @@ class TimeTrackerWidget(QWidget):
         entries_group.setLayout(entries_layout)
         layout.addWidget(entries_group, stretch=1)
     
+    @handler_span
     def _load_services(self):
-        """Load services into combo box."""
+        """Load services into the combo boxes, keeping the current selections."""
+        current_id = self.service_combo.currentData()
         self.service_combo.clear()
-        services = self.session.query(Service).order_by(Service.name).all()
-        for service in services:
-            self.service_combo.addItem(f"{service.name} ({service.hourly_rate}€/h)", service.id)
+        for service in self.service_catalog.services():
+            self.service_combo.addItem(f"{service.name} ({format_cents(service.hourly_rate_cents)}€/h)", service.id)
+        index = self.service_combo.findData(current_id)
+        if index >= 0:
+            self.service_combo.setCurrentIndex(index)
+        
+        # Refilling the filter must not reload the history by itself
+        filter_id = self.filter_service.currentData()
+        self.filter_service.blockSignals(True)
+        self.filter_service.clear()
+        self.filter_service.addItem("Tutti i Servizi", None)
+        for service in self.service_catalog.services():
+            self.filter_service.addItem(service.name, service.id)
+        self.filter_service.setCurrentIndex(max(self.filter_service.findData(filter_id), 0))
+        self.filter_service.blockSignals(False)
+    
+    def _services_changed(self):
+        """Refresh combos and names after services were added, edited or deleted."""
+        self._load_services()
+        self.entries_model.refresh_display()  # The entries of a deleted service go with their own changes
+    
+    def _period_toggled(self, checked):
+        """Enable the period dates and apply the change."""
+        self.filter_start.setEnabled(checked)
+        self.filter_end.setEnabled(checked)
+        self.filter_timer.start()
+    
+    def _current_filters(self):
+        """Return the ``EntryFilters`` set in the filter bar."""
+        start = end = None
+        if self.filter_period.isChecked():
+            start = self.filter_start.date().toPyDate()
+            end = self.filter_end.date().toPyDate()
+        return EntryFilters(
+            service_id=self.filter_service.currentData(),
+            start=start,
+            end=end,
+            text=self.filter_text.text().strip() or None,
+        )
+    
+    @handler_span
+    def _open_search(self):
+        """Open the ranked search within the current history filters."""
+        filters = self._current_filters()
+        SearchDialog(
+            self.db_manager, self.service_catalog, self, filters.text or "",
+            filters.start, filters.end, filters.service_id
+        ).exec()
+
+    def _iter_entries(self, filters):
+        """Yield the filtered history page by page, each page read in its own session."""
+        after = None
+        while True:
+            with self.db_manager.session_scope(read_only=True) as session:
+                page = fetch_entries_page(session, filters, after)
+            yield from page
+            if len(page) < PAGE_SIZE:
+                return
+            after = entry_key(page[-1])
     
+    @handler_span
     def _load_time_entries(self):
-        """Load time entries into table."""
-        self.entries_table.setRowCount(0)
-        entries = self.session.query(TimeEntry).order_by(TimeEntry.start_time.desc()).limit(100).all()
-        
-        for entry in entries:
-            row = self.entries_table.rowCount()
-            self.entries_table.insertRow(row)
-            
-            # Service name
-            self.entries_table.setItem(row, 0, QTableWidgetItem(entry.service.name))
-            
-            # Start time
-            start_str = entry.start_time.strftime("%d/%m/%Y %H:%M")
-            self.entries_table.setItem(row, 1, QTableWidgetItem(start_str))
-            
-            # End time
-            end_str = entry.end_time.strftime("%d/%m/%Y %H:%M") if entry.end_time else "In corso..."
-            self.entries_table.setItem(row, 2, QTableWidgetItem(end_str))
-            
-            # Duration
-            duration_str = f"{entry.duration_hours:.2f}" if entry.duration_hours else "-"
-            self.entries_table.setItem(row, 3, QTableWidgetItem(duration_str))
-            
-            # Notes
-            notes = entry.notes or ""
-            self.entries_table.setItem(row, 4, QTableWidgetItem(notes))
-            
-            # ID (hidden)
-            self.entries_table.setItem(row, 5, QTableWidgetItem(str(entry.id)))
+        """Load the first page of the filtered history into the table."""
+        self.filter_timer.stop()
+        self.entries_filters = self._current_filters()
+        self.entries_model.set_source(self._iter_entries(self.entries_filters))
+    
+    def _update_entries_count(self):
+        """Show how many entries are listed, and whether more can be scrolled in."""
+        count = self.entries_model.rowCount()
+        more = "" if self.entries_model.is_complete() else "+"
+        self.entries_count_label.setText(f"{count}{more} voci")
+    
+    def _row_key(self, row):
+        """``entry_key`` of a table row."""
+        return (self.entries_model.value(row, START_COLUMN), self.entries_model.value(row, ENTRY_ID_COLUMN))
+    
+    def _entry_position(self, key):
+        """Row where an entry with ``key`` goes, the table being sorted newest first."""
+        low, high = 0, self.entries_model.rowCount()
+        while low < high:
+            middle = (low + high) // 2
+            if self._row_key(middle) > key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+    
+    def _entries_changed(self, changes):
+        """Apply committed changes of the entries to the history, without reloading it."""
+        if any(change.old is None and change.new is None for change in changes):
+            self._load_time_entries()  # Changed in bulk
+            return
+        for change in changes:
+            if change.new is None:
+                self._place_entry(change.old.id, None)
+            elif self.entries_filters.text:
+                self._refresh_entry(change.new.id)  # Only the index can tell whether the text matches
+            elif entry_matches(change.new, self.entries_filters):
+                self._place_entry(change.new.id, entry_row(change.new))
+            else:
+                self._place_entry(change.new.id, None)
+    
+    def _refresh_entry(self, entry_id):
+        """Update, insert or remove the row of one entry, read again from the database."""
+        with self.db_manager.session_scope(read_only=True) as session:
+            entry = fetch_entry(session, entry_id, self.entries_filters)
+        self._place_entry(entry_id, entry)
+    
+    def _place_entry(self, entry_id, entry):
+        """Update, insert or remove the row of one entry; ``entry`` is its ``EntryRow``, or None if not shown."""
+        row = self.entries_model.find_row(ENTRY_ID_COLUMN, entry_id)
+        if row is not None:
+            if entry is not None and self._row_key(row) == entry_key(entry):
+                self.entries_model.update_row(row, entry)
+                return
+            self.entries_model.remove_row(row)
+        if entry is not None:
+            row = self._entry_position(entry_key(entry))
+            # Past the loaded rows, the entry shows up when its page is scrolled in
+            if row < self.entries_model.rowCount() or self.entries_model.is_complete():
+                self.entries_model.insert_row(row, entry)
     
     def _check_running_timer(self):
-        """Check if there's a running timer and resume it."""
-        running = self.session.query(TimeEntry).filter(TimeEntry.end_time.is_(None)).first()
+        """Close the sessions left by a crash, then resume the running timer, if any."""
+        crashed = self.db_manager.write(close_stale_entries)
+        if crashed:
+            QMessageBox.information(
+                self,
+                "Sessioni Interrotte",
+                "Il programma si è chiuso con un timer in corso. Sessioni chiuse all'ultimo segnale di attività:\n\n"
+                + "\n".join(
+                    f"{self.service_catalog.name(entry.service_id)}: "
+                    f"{entry.start_time:%d/%m/%Y %H:%M} - {entry.end_time:%H:%M}"
+                    for entry in crashed
+                )
+            )
+        
+        with self.db_manager.session_scope(read_only=True) as session:
+            running = find_running_entry(session)
         if running:
-            self.running_entry = running
-            self.start_button.setEnabled(False)
-            self.stop_button.setEnabled(True)
-            self.service_combo.setEnabled(False)
-            self.timer.start(1000)  # Update every second
+            self._run_timer(running)
+    
+    def _run_timer(self, entry):
+        """Show ``entry`` as the running timer and start its heartbeat."""
+        self.running_entry = entry
+        self.clock = TimerClock(entry.start_time)
+        self.start_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
+        self.service_combo.setEnabled(False)
+        self._update_timer_display()
+        self._heartbeat()
+        self.heartbeat_timer.start()
     
+    def _reset_timer(self):
+        """Back to the idle state once the running timer has ended."""
+        self.running_entry = None
+        self.clock = None
+        self.start_button.setEnabled(True)
+        self.stop_button.setEnabled(False)
+        self.service_combo.setEnabled(True)
+        self.timer.stop()
+        self.heartbeat_timer.stop()
+        self.timer_label.setText("00:00:00")
+        self.notes_edit.clear()
+    
+    @handler_span
     def _start_timer(self):
         """Start a new timer."""
         service_id = self.service_combo.currentData()
@@ -205,61 +450,78 @@ class TimeTrackerWidget(QWidget):
             QMessageBox.warning(self, "Attenzione", "Seleziona un servizio prima di avviare il timer.")
             return
         
+        start = utc_now()
+        if not self._confirm_overlaps(self._find_conflicts(start)):
+            return
+        
         # Create new time entry
         entry = TimeEntry(
             service_id=service_id,
-            start_time=datetime.now(),
+            start_time=start,
             notes=self.notes_edit.toPlainText() or None
         )
-        self.session.add(entry)
-        self.session.commit()
-        
-        self.running_entry = entry
-        self.start_button.setEnabled(False)
-        self.stop_button.setEnabled(True)
-        self.service_combo.setEnabled(False)
-        self.timer.start(1000)
+        self.db_manager.write(_add_entry, entry)
         
-        self._load_time_entries()
+        self._run_timer(entry)
     
+    @handler_span
     def _stop_timer(self):
         """Stop the running timer."""
         if self.running_entry:
-            self.running_entry.end_time = datetime.now()
-            self.running_entry.notes = self.notes_edit.toPlainText() or None
-            self.session.commit()
-            
-            duration = self.running_entry.duration_hours
-            service = self.running_entry.service
-            
-            QMessageBox.information(
-                self,
-                "Timer Fermato",
-                f"Sessione completata!\n\n"
-                f"Servizio: {service.name}\n"
-                f"Durata: {duration:.2f} ore\n"
-                f"Costo: {duration * service.hourly_rate:.2f}€"
+            entry = self.db_manager.write(
+                _stop_entry, self.running_entry.id, self.notes_edit.toPlainText() or None
             )
             
-            self.running_entry = None
-            self.start_button.setEnabled(True)
-            self.stop_button.setEnabled(False)
-            self.service_combo.setEnabled(True)
-            self.timer.stop()
-            self.timer_label.setText("00:00:00")
-            self.notes_edit.clear()
+            if entry is not None:
+                service = self.service_catalog.get(entry.service_id)
+                if service is None:
+                    # Added by another process, which the change feed does not see
+                    self.service_catalog.invalidate()
+                    service = self.service_catalog.get(entry.service_id)
+                
+                message = (f"Sessione completata!\n\n"
+                           f"Servizio: {self.service_catalog.name(entry.service_id)}\n"
+                           f"Durata: {entry.duration_hours:.2f} ore")
+                if service is not None:
+                    cost = amount_cents(entry.duration_seconds, service.hourly_rate_cents)
+                    message += f"\nCosto: {format_cents(cost)}€"
+                QMessageBox.information(self, "Timer Fermato", message)
             
-            self._load_time_entries()
+            self._reset_timer()
+    
+    def _heartbeat(self):
+        """Record that the running timer is alive; notice if it was stopped elsewhere."""
+        if not self.running_entry:
+            return
+        entry_id = self.running_entry.id
+        try:
+            running = self.db_manager.write(write_heartbeat, entry_id)
+        except OperationalError as e:
+            if not is_busy_error(e):
+                raise
+            return  # Another process kept the database busy: the next heartbeat will do
+        if running:
+            self.clock.sync()  # Catch up with the wall clock, e.g. after a suspend
+        else:
+            self._reset_timer()
+            self._refresh_entry(entry_id)  # Possibly by another process, which the change feed does not see
+    
+    def release_timer(self):
+        """On a clean exit: the running timer keeps going, but without heartbeats."""
+        if self.running_entry:
+            self.heartbeat_timer.stop()
+            self.db_manager.write(clear_heartbeat, self.running_entry.id)
     
     def _update_timer_display(self):
         """Update timer display."""
-        if self.running_entry:
-            elapsed = datetime.now() - self.running_entry.start_time
-            hours = int(elapsed.total_seconds() // 3600)
-            minutes = int((elapsed.total_seconds() % 3600) // 60)
-            seconds = int(elapsed.total_seconds() % 60)
+        if self.clock:
+            elapsed = int(self.clock.elapsed_seconds())
+            hours, rest = divmod(elapsed, 3600)
+            minutes, seconds = divmod(rest, 60)
             self.timer_label.setText(f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+            self.timer.start(self.clock.msecs_to_next_second())
     
+    @handler_span
     def _add_manual_entry(self):
         """Add a manual time entry."""
         service_id = self.service_combo.currentData()
@@ -274,22 +536,77 @@ class TimeTrackerWidget(QWidget):
             QMessageBox.warning(self, "Errore", "L'orario di fine deve essere successivo all'inizio.")
             return
         
+        if not self._confirm_overlaps(self._find_conflicts(start, end)):
+            return
+        
         entry = TimeEntry(
             service_id=service_id,
             start_time=start,
             end_time=end,
             notes=self.notes_edit.toPlainText() or None
         )
-        self.session.add(entry)
-        self.session.commit()
+        self.db_manager.write(_add_entry, entry)
         
         QMessageBox.information(self, "Successo", "Voce aggiunta con successo!")
         self.notes_edit.clear()
-        self._load_time_entries()
     
+    def _find_conflicts(self, start, end=None):
+        """Entries overlapping a new entry, read in their own session."""
+        with self.db_manager.session_scope(read_only=True) as session:
+            return find_conflicts(session, start, end)
+    
+    def _describe_entry(self, interval):
+        """One-line description of an ``Interval``."""
+        end = interval.end_time.strftime("%H:%M") if interval.end_time else "in corso"
+        return (f"{self.service_catalog.name(interval.service_id)}, "
+                f"{interval.start_time:%d/%m/%Y %H:%M} - {end}")
+    
+    def _confirm_overlaps(self, conflicts):
+        """Ask whether to save an entry overlapping ``conflicts``; True to go ahead."""
+        if not conflicts:
+            return True
+        listed = "\n".join(f"• {self._describe_entry(interval)}" for interval in conflicts[:MAX_LISTED_OVERLAPS])
+        reply = QMessageBox.question(
+            self,
+            "Voci Sovrapposte",
+            f"La voce si sovrappone a {len(conflicts)} voce/i esistenti:\n\n{listed}\n\n"
+            "Le ore sovrapposte verrebbero fatturate due volte. Salvare comunque?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        return reply == QMessageBox.StandardButton.Yes
+    
+    @handler_span
+    def _check_overlaps(self):
+        """Scan every entry for overlaps in the background."""
+        self.overlaps_button.setEnabled(False)
+        worker = start_worker(
+            self.db_manager, _overlaps_task,
+            read_only=True,
+            on_result=self._show_overlaps,
+            on_error=lambda message: QMessageBox.critical(self, "Errore", message),
+        )
+        worker.signals.finished.connect(lambda: self.overlaps_button.setEnabled(True))
+    
+    def _show_overlaps(self, overlaps):
+        """Report the overlaps found by ``_check_overlaps``."""
+        if not overlaps:
+            QMessageBox.information(self, "Sovrapposizioni", "Nessuna voce sovrapposta.")
+            return
+        listed = "\n\n".join(
+            f"• {self._describe_entry(overlap.first)}\n  {self._describe_entry(overlap.second)}"
+            for overlap in overlaps[:MAX_LISTED_OVERLAPS]
+        )
+        more = f"\n\n... e altre {len(overlaps) - MAX_LISTED_OVERLAPS}" if len(overlaps) > MAX_LISTED_OVERLAPS else ""
+        QMessageBox.warning(
+            self, "Sovrapposizioni",
+            f"{len(overlaps)} coppie di voci sovrapposte:\n\n{listed}{more}"
+        )
+    
+    @handler_span
     def _delete_selected_entries(self):
         """Delete selected time entries."""
-        selected_rows = set(item.row() for item in self.entries_table.selectedItems())
+        selected_rows = set(index.row() for index in self.entries_table.selectionModel().selectedRows())
         if not selected_rows:
             QMessageBox.warning(self, "Attenzione", "Seleziona almeno una voce da eliminare.")
             return
@@ -302,11 +619,5 @@ class TimeTrackerWidget(QWidget):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            for row in selected_rows:
-                entry_id = int(self.entries_table.item(row, 5).text())
-                entry = self.session.query(TimeEntry).get(entry_id)
-                if entry:
-                    self.session.delete(entry)
-            
-            self.session.commit()
-            self._load_time_entries()
+            entry_ids = [self.entries_model.value(row, ENTRY_ID_COLUMN) for row in selected_rows]
+            self.db_manager.write(_delete_entries, entry_ids)
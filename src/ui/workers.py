@@ -0,0 +1,114 @@
+"""Background workers for database queries and exports."""
+
+import threading
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task when its cancellation was requested."""
+
+
+class WorkerSignals(QObject):
+    """
+    Signals emitted by a ``Worker``.
+
+    They are created on the GUI thread, so connected slots run there too.
+    """
+
+    progress = pyqtSignal(int, int)     # done, total (0 if unknown)
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    finished = pyqtSignal()             # Always emitted last
+
+
+class TaskContext:
+    """Handle given to a task to report progress and observe cancellation."""
+
+    def __init__(self, signals):
+        self._signals = signals
+        self._cancel_event = threading.Event()
+
+    @property
+    def is_cancelled(self):
+        """True once cancellation was requested."""
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Request cancellation; the task stops at its next progress report."""
+        self._cancel_event.set()
+
+    def check_cancelled(self):
+        """Raise ``TaskCancelled`` if cancellation was requested."""
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def progress(self, done, total=0):
+        """Report progress, raising ``TaskCancelled`` if the task should stop."""
+        self.check_cancelled()
+        self._signals.progress.emit(done, total)
+
+
+class Worker(QRunnable):
+    """
+    Run ``fn(context, session, *args)`` on the thread pool.
+
+    The task runs in its own unit of work (``DatabaseManager.session_scope``,
+    read-only for ``read_only`` tasks) and must not touch widgets: its return
+    value is delivered through ``signals.result``.
+    """
+
+    def __init__(self, db_manager, fn, *args, read_only=False):
+        super().__init__()
+        self.db_manager = db_manager
+        self.fn = fn
+        self.args = args
+        self.read_only = read_only
+        self.signals = WorkerSignals()
+        self.context = TaskContext(self.signals)
+
+    def cancel(self):
+        """Request cancellation of the task."""
+        self.context.cancel()
+
+    def run(self):
+        try:
+            with self.db_manager.span(f'task:{self.fn.__name__}'), \
+                    self.db_manager.session_scope(read_only=self.read_only) as session:
+                result = self.fn(self.context, session, *self.args)
+        except TaskCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        else:
+            if self.context.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+def start_worker(db_manager, fn, *args, read_only=False, on_result=None, on_error=None,
+                 on_progress=None, on_cancelled=None, on_finished=None):
+    """
+    Create a ``Worker``, connect its signals and start it on the global pool.
+
+    ``read_only`` tasks get a read-only session (see ``Worker``).
+
+    Returns:
+        The worker; keep a reference to it to be able to cancel it.
+    """
+    worker = Worker(db_manager, fn, *args, read_only=read_only)
+    for signal, slot in (
+        (worker.signals.result, on_result),
+        (worker.signals.error, on_error),
+        (worker.signals.progress, on_progress),
+        (worker.signals.cancelled, on_cancelled),
+        (worker.signals.finished, on_finished),
+    ):
+        if slot is not None:
+            signal.connect(slot)
+    QThreadPool.globalInstance().start(worker)
+    return worker
@@ -0,0 +1,64 @@
+"""
+Tests for backup, restore and JSON Lines dumps
+Run from project root: python -m pytest tests/test_backup.py
+"""
+
+import gzip
+import json
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import pytest
+
+from database import DatabaseManager
+from database.backup import (
+    BackupError, backup_database, create_backup, dump_jsonl, list_backups, restore_database, verify_backup
+)
+from database.models import TimeEntry
+from datetime import datetime
+
+
+def _add_entry(db, day):
+    session = db.get_session()
+    session.add(TimeEntry(service_id=1, start_time=datetime(2024, 1, day, 9, 0),
+                          end_time=datetime(2024, 1, day, 10, 0)))
+    session.commit()
+
+
+def test_backup_and_restore(tmp_path):
+    """A restored backup brings back exactly the data of the snapshot."""
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    _add_entry(db, 1)
+    pages = []
+    backup_database(db.engine, tmp_path / 'snapshot.db', progress=lambda done, total: pages.append(done))
+    verify_backup(tmp_path / 'snapshot.db')
+    assert pages and pages[-1] > 0
+
+    _add_entry(db, 2)
+    db.Session.remove()
+    restore_database(db.engine, tmp_path / 'snapshot.db')
+    assert db.get_session().query(TimeEntry).count() == 1
+
+    (tmp_path / 'broken.db').write_text("not a database")
+    with pytest.raises(BackupError):
+        restore_database(db.engine, tmp_path / 'broken.db')
+    db.close()
+
+
+def test_rotation_and_dump(tmp_path):
+    """Automatic backups are rotated; dumps hold every row as JSON lines."""
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    _add_entry(db, 1)
+    for label in ('a', 'b', 'c'):
+        create_backup(db.engine, tmp_path / 'backups', keep=2, label=label)
+    assert [path.name[-5:] for path in list_backups(tmp_path / 'backups')] == ['-b.db', '-c.db']
+
+    assert dump_jsonl(db.get_session(), tmp_path / 'dump.jsonl.gz') == 7  # 6 services, 1 entry
+    with gzip.open(tmp_path / 'dump.jsonl.gz', 'rt', encoding='utf-8') as dump:
+        lines = [json.loads(line) for line in dump]
+    assert lines[-1]['table'] == 'time_entries'
+    assert lines[-1]['row']['start_time'] == '2024-01-01T09:00:00'
+    db.close()
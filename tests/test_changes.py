@@ -0,0 +1,95 @@
+"""
+Tests for the in-process change feed
+Run from project root: python -m pytest tests/test_changes.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from datetime import datetime
+
+import pytest
+
+from database import DatabaseManager
+from database.changes import Change, EntrySnapshot, ServiceSnapshot
+from database.entries import EntryFilters, entry_matches, entry_row
+from database.models import Service, TimeEntry
+from database.reporting import in_report
+from database.timer import write_heartbeat
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    yield db
+    db.close()
+
+
+def _collect(db):
+    published = []
+    db.changes.subscribe(published.append)
+    return published
+
+
+def test_entry_changes_published_on_commit(db):
+    published = _collect(db)
+    with db.session_scope() as session:
+        service_id = session.query(Service.id).order_by(Service.id).first()[0]
+        entry = TimeEntry(service_id=service_id, start_time=datetime(2024, 5, 1, 9, 0),
+                          end_time=datetime(2024, 5, 1, 10, 30), notes="analisi")
+        session.add(entry)
+        session.flush()
+        assert published == []  # Nothing before the commit
+    entry_id = entry.id
+    inserted = EntrySnapshot(entry_id, service_id, datetime(2024, 5, 1, 9, 0), datetime(2024, 5, 1, 10, 30),
+                             5400, "analisi")
+    assert published == [[Change('time_entries', None, inserted)]]
+
+    with db.session_scope() as session:
+        session.get(TimeEntry, entry_id).end_time = datetime(2024, 5, 1, 11, 0)
+    updated = inserted._replace(end_time=datetime(2024, 5, 1, 11, 0), duration_seconds=7200)
+    assert published[-1] == [Change('time_entries', inserted, updated)]
+
+    # A heartbeat is not a change of the entry
+    with db.session_scope() as session:
+        session.get(TimeEntry, entry_id).heartbeat_at = datetime(2024, 5, 1, 10, 0)
+        write_heartbeat(session, entry_id)
+    assert len(published) == 2
+
+    with db.session_scope() as session:
+        session.delete(session.get(TimeEntry, entry_id))
+    assert published[-1] == [Change('time_entries', updated, None)]
+
+
+def test_rollback_discards_changes(db):
+    published = _collect(db)
+    with pytest.raises(RuntimeError):
+        with db.session_scope() as session:
+            session.add(Service(name="Formazione", hourly_rate=40))
+            session.flush()
+            raise RuntimeError("abort")
+    with db.session_scope() as session:
+        session.add(Service(name="Supporto", hourly_rate=30))
+    assert len(published) == 1
+    [change] = published[0]
+    assert change.table == 'services' and change.old is None
+    assert change.new._replace(id=None) == ServiceSnapshot(None, "Supporto", 3000, None)
+
+    db.changes.unsubscribe(published.append)
+    db.changes.publish_reset('time_entries')
+    assert len(published) == 1
+
+
+def test_snapshots_match_like_queries():
+    """Panels filter snapshots in Python the way the queries filter rows."""
+    entry = EntrySnapshot(7, 2, datetime(2024, 5, 31, 18, 0), None, None, "notte")
+    assert entry_row(entry) == (2, datetime(2024, 5, 31, 18, 0), None, None, "notte", 7)
+    assert entry_matches(entry, EntryFilters(service_id=2, end=datetime(2024, 5, 31).date()))
+    assert not entry_matches(entry, EntryFilters(service_id=3))
+    assert not in_report(entry, datetime(2024, 5, 1).date(), datetime(2024, 5, 31).date())  # Still running
+    ended = entry._replace(end_time=datetime(2024, 5, 31, 19, 0), duration_seconds=3600)
+    assert in_report(ended, datetime(2024, 5, 1).date(), datetime(2024, 5, 31).date(), 2)
+    assert not in_report(ended, datetime(2024, 6, 1).date(), datetime(2024, 6, 30).date())
@@ -0,0 +1,88 @@
+"""
+Tests for the headless command line interface
+Run from project root: python -m pytest tests/test_cli.py
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent / 'src'
+
+# Add src to path
+sys.path.insert(0, str(SRC_DIR))
+
+from cli import main, month_period
+from datetime import date
+
+
+def test_month_period():
+    assert month_period('2024-02') == (date(2024, 2, 1), date(2024, 2, 29))
+    assert month_period('previous', today=date(2024, 1, 15)) == (date(2023, 12, 1), date(2023, 12, 31))
+    assert month_period('current', today=date(2024, 12, 15)) == (date(2024, 12, 1), date(2024, 12, 31))
+
+
+def test_import_export_invoice(tmp_path, capsys):
+    """Entries imported from CSV show up in the export and the invoice."""
+    db_path = str(tmp_path / 'mycket.db')
+    source = tmp_path / 'entries.csv'
+    source.write_text(
+        "service,start,end,notes\n"
+        "Consulenza AI,2024-03-04 09:00,2024-03-04 11:00,setup\n"
+        "Consulenza AI,2024-03-05 09:00,2024-03-05 10:30,\n",
+        encoding='utf-8'
+    )
+
+    assert main(['--db', db_path, 'import', str(source)]) == 0
+    assert main(['--db', db_path, 'export', '--month', '2024-03', '-o', str(tmp_path / 'out.csv')]) == 0
+    lines = (tmp_path / 'out.csv').read_text(encoding='utf-8').splitlines()
+    assert lines[-2] == "Totale Ore,3.50"
+
+    invoice_path = tmp_path / 'invoice.csv'
+    assert main(['--db', db_path, 'invoice', '--month', '2024-03', '-o', str(invoice_path)]) == 0
+    assert "TOTALE €:,157.50" in invoice_path.read_text(encoding='utf-8')
+    again_path = tmp_path / 'again.csv'
+    number = invoice_path.read_text(encoding='utf-8').splitlines()[1].split(',')[1]
+    assert main(['--db', db_path, 'invoice-export', number, '-o', str(again_path)]) == 0
+    assert again_path.read_text(encoding='utf-8') == invoice_path.read_text(encoding='utf-8')
+
+    capsys.readouterr()
+    assert main(['--db', db_path, 'report', '--month', '2024-04']) == 0
+    assert "Ore Totali: 0.00" in capsys.readouterr().out
+
+
+def test_import_json_lines_dry_run(tmp_path, capsys):
+    """A dry run only validates; the real run imports the valid records."""
+    db_path = str(tmp_path / 'mycket.db')
+    source = tmp_path / 'entries.jsonl'
+    source.write_text(
+        '{"service": "Analisi Dati", "start": "2024-03-04T09:00", "end": "2024-03-04T10:00"}\n'
+        '{"service": "Analisi Dati", "start": "2024-03-04T12:00", "end": "2024-03-04T11:00"}\n'
+        'non json\n',
+        encoding='utf-8'
+    )
+
+    assert main(['--db', db_path, 'import', '--dry-run', str(source)]) == 1
+    assert "1 voci importabili, 2 non valide" in capsys.readouterr().out
+    assert main(['--db', db_path, 'report', '--month', '2024-03', '--totals-only']) == 0
+    assert "Ore Totali: 0.00" in capsys.readouterr().out
+
+    assert main(['--db', db_path, 'import', str(source)]) == 1
+    assert main(['--db', db_path, 'report', '--month', '2024-03', '--totals-only']) == 0
+    assert "Ore Totali: 1.00" in capsys.readouterr().out
+
+
+def test_errors_exit_non_zero(tmp_path):
+    db_path = str(tmp_path / 'mycket.db')
+    assert main(['--db', db_path, 'report', '--month', '2024-03', '--service', 'Sconosciuto']) == 1
+    assert main(['--db', db_path, 'invoice', '--month', '2024-03']) == 1
+    assert main(['--db', db_path, 'invoice-export', 'INV-2024-9999']) == 1
+
+
+def test_cli_does_not_import_qt(tmp_path):
+    code = (
+        "import sys; import cli; "
+        f"cli.main(['--db', {str(tmp_path / 'mycket.db')!r}, 'stats']); "
+        "assert not any(name.startswith('PyQt6') for name in sys.modules)"
+    )
+    subprocess.run([sys.executable, '-c', code], cwd=SRC_DIR, check=True, capture_output=True)
@@ -1,9 +1,12 @@
 """
 Quick test script to verify database operations
 Run from project root: python tests/test_db.py
+
+Works on a temporary database, never on the real one in ~/.mycket.
 """
 
 import sys
+import tempfile
 from pathlib import Path
 
 # Add src to path
@@ -13,12 +16,12 @@ from database import DatabaseManager
 from database.models import Service, TimeEntry
 from datetime import datetime, timedelta
 
-def test_database():
+def test_database(tmp_path):
     """Test basic database operations."""
     print("🧪 Testing Mycket Database Operations\n")
     
     # Initialize database
-    db = DatabaseManager()
+    db = DatabaseManager(tmp_path / 'mycket.db')
     session = db.get_session()
     
     # Test 1: List services
@@ -63,4 +66,5 @@ def test_database():
     db.close()
 
 if __name__ == "__main__":
-    test_database()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_database(Path(tmp_dir))
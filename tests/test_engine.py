@@ -0,0 +1,41 @@
+"""
+Tests for SQLite engine profiles
+Run from project root: python -m pytest tests/test_engine.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import pytest
+
+from database import DatabaseManager
+
+
+def test_fast_profile_pragmas(tmp_path):
+    """The default profile enables WAL with relaxed syncing."""
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    pragmas = db.active_pragmas()
+    db.close()
+
+    assert pragmas['journal_mode'] == 'wal'
+    assert pragmas['synchronous'] == 1  # NORMAL
+    assert pragmas['foreign_keys'] == 1
+    assert pragmas['temp_store'] == 2  # MEMORY
+
+
+def test_durable_profile_with_override(tmp_path):
+    """Profiles can be picked by name and individual pragmas overridden."""
+    db = DatabaseManager(tmp_path / 'mycket.db', profile='durable', pragmas={'cache_size': -2000})
+    pragmas = db.active_pragmas()
+    db.close()
+
+    assert pragmas['synchronous'] == 2  # FULL
+    assert pragmas['cache_size'] == -2000
+
+
+def test_unknown_profile(tmp_path):
+    with pytest.raises(ValueError):
+        DatabaseManager(tmp_path / 'mycket.db', profile='turbo')
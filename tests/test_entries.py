@@ -0,0 +1,67 @@
+"""
+Tests for the time entry history queries
+Run from project root: python -m pytest tests/test_entries.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from datetime import date, datetime, timedelta
+
+from database import DatabaseManager
+from database.entries import EntryFilters, entry_key, fetch_entries_page, fetch_entry
+from database.models import TimeEntry
+
+
+def _add_entries(session):
+    base = datetime(2024, 5, 1, 9, 0)
+    for number in range(25):
+        # Pairs of entries share a start time: pages must not skip or repeat them
+        start = base + timedelta(hours=number // 2)
+        session.add(TimeEntry(service_id=1 + number % 2, start_time=start, end_time=start + timedelta(minutes=30),
+                              notes=f"Riunione 100% {number}" if number % 5 == 0 else None))
+    session.commit()
+
+
+def test_keyset_pages_cover_history_once(tmp_path):
+    """Pages continue after the last row shown, newest first, without gaps or repeats."""
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    _add_entries(session)
+
+    rows, after = [], None
+    while True:
+        page = fetch_entries_page(session, after=after, limit=4)
+        rows.extend(page)
+        if len(page) < 4:
+            break
+        after = entry_key(page[-1])
+    db.close()
+
+    assert len(rows) == 25
+    assert len({row.entry_id for row in rows}) == 25
+    assert [entry_key(row) for row in rows] == sorted((entry_key(row) for row in rows), reverse=True)
+
+
+def test_entry_filters(tmp_path):
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    _add_entries(session)
+
+    by_service = fetch_entries_page(session, EntryFilters(service_id=2))
+    by_text = fetch_entries_page(session, EntryFilters(text="riun 100%"))
+    by_day = fetch_entries_page(session, EntryFilters(start=date(2024, 5, 1), end=date(2024, 5, 1)))
+    nothing = fetch_entries_page(session, EntryFilters(start=date(2024, 5, 2)))
+    first = fetch_entry(session, 1)
+    hidden = fetch_entry(session, 1, EntryFilters(service_id=2))
+    db.close()
+
+    assert len(by_service) == 12 and {row.service_id for row in by_service} == {2}
+    assert len(by_text) == 5
+    assert len(by_day) == 25
+    assert nothing == []
+    assert first.hours == 0.5
+    assert hidden is None
@@ -0,0 +1,96 @@
+"""
+Tests for streaming CSV export
+Run from project root: python -m pytest tests/test_export.py
+"""
+
+import csv
+import io
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from database import DatabaseManager
+from database.export import write_invoice_csv, write_report_csv
+from database.invoicing import create_invoice
+from database.models import Invoice, InvoiceLine, Service, TimeEntry
+from datetime import date, datetime, timedelta
+
+
+def _make_db(tmp_path, count=2500):
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    service = session.query(Service).filter(Service.name == "Analisi Dati").one()
+    base = datetime(2024, 1, 1, 8, 0)
+    session.add_all([
+        TimeEntry(service_id=service.id, start_time=base + timedelta(hours=2 * i),
+                  end_time=base + timedelta(hours=2 * i, minutes=30))
+        for i in range(count)
+    ])
+    session.commit()
+    return db, session
+
+
+def test_report_csv_streams_all_rows(tmp_path):
+    """Every entry is written and the totals are computed alongside."""
+    db, session = _make_db(tmp_path)
+    buffer = io.StringIO()
+
+    result = write_report_csv(session, buffer, date(2024, 1, 1), date(2024, 12, 31))
+
+    lines = list(csv.reader(io.StringIO(buffer.getvalue())))
+    assert result.row_count == 2500
+    assert result.totals.seconds == 1250 * 3600
+    assert lines[0][0] == "Data"
+    assert len(lines) == 1 + 2500 + 3
+    assert lines[-2] == ["Totale Ore", "1250.00"]
+    assert lines[-1] == ["Importo Totale", f"{1250.0 * 38.0:.2f}€"]
+
+    db.close()
+
+
+def test_invoice_csv(tmp_path):
+    db, session = _make_db(tmp_path, count=4)
+    buffer = io.StringIO()
+
+    invoice = create_invoice(session, date(2024, 1, 1), date(2024, 1, 31), issued_on=datetime(2024, 2, 1))
+    session.commit()
+    result = write_invoice_csv(session, buffer, invoice.invoice_number, issued_on=datetime(2024, 2, 1))
+
+    lines = list(csv.reader(io.StringIO(buffer.getvalue())))
+    assert lines[1] == ["Numero Fattura", "INV-2024-0001"]
+    assert lines[3] == ["Periodo", "01/01/2024 - 31/01/2024"]
+    assert result.row_count == 4
+    assert lines[-1][-1] == f"{2.0 * 38.0:.2f}"
+
+    db.close()
+
+
+def test_invoice_lines_are_a_snapshot(tmp_path):
+    """An invoice is rendered from its lines: later edits do not change it."""
+    db, session = _make_db(tmp_path, count=4)
+    invoice = create_invoice(session, date(2024, 1, 1), date(2024, 1, 31))
+    session.commit()
+    assert invoice.total_cents == 4 * 1900
+    assert [line.seconds for line in invoice.lines] == [1800] * 4
+    first = io.StringIO()
+    write_invoice_csv(session, first, invoice.invoice_number)
+
+    # Rate raised, one entry lengthened, another deleted
+    entries = session.query(TimeEntry).order_by(TimeEntry.start_time).all()
+    entries[0].service.hourly_rate = 100
+    entries[1].end_time += timedelta(hours=1)
+    session.delete(entries[2])
+    session.commit()
+
+    again = io.StringIO()
+    write_invoice_csv(session, again, invoice.invoice_number)
+    assert again.getvalue() == first.getvalue()
+    assert session.query(InvoiceLine).filter(InvoiceLine.time_entry_id.is_(None)).count() == 1
+
+    session.delete(invoice)
+    session.commit()
+    assert session.query(InvoiceLine).count() == 0
+
+    db.close()
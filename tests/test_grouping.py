@@ -0,0 +1,107 @@
+"""
+Tests for grouped totals and pivots
+Run from project root: python -m pytest tests/test_grouping.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from database import DatabaseManager
+from database.grouping import fetch_grouped_totals, pivot
+from database.models import Service, TimeEntry
+from database.reporting import ReportTotals, iter_report_rows
+
+
+def _add_entries(session):
+    """Return the ids of two services, after giving them entries across weeks, months and years."""
+    first, second = (service.id for service in session.query(Service).order_by(Service.id).limit(2))
+    starts = [datetime(2024, 12, 29, 9, 0), datetime(2024, 12, 30, 23, 30), datetime(2025, 1, 6, 8, 0)]
+    session.add_all([
+        TimeEntry(service_id=service_id, start_time=start, end_time=start + timedelta(minutes=45 * (index + 1)))
+        for index, start in enumerate(starts) for service_id in (first, second)
+    ])
+    session.add(TimeEntry(service_id=first, start_time=datetime(2025, 1, 7, 9, 0)))  # Still running
+    session.commit()
+    return first, second
+
+
+def test_grouped_totals_match_the_entries(tmp_path):
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    first, second = _add_entries(session)
+
+    grouped = fetch_grouped_totals(session, date(2024, 12, 1), date(2025, 1, 31), ['week', 'service'])
+    # Weeks are labelled by their Monday: Sunday 29/12 belongs to the week of 23/12
+    assert list(grouped.keys[0]) == [date(2024, 12, 23)] * 2 + [date(2024, 12, 30)] * 2 + [date(2025, 1, 6)] * 2
+    assert list(grouped.keys[1]) == [first, second] * 3
+    assert list(grouped.entry_count) == [1] * 6
+
+    expected = {}
+    for row in iter_report_rows(session, date(2024, 12, 1), date(2025, 1, 31)):
+        day = row.start_time.date()
+        key = (day - timedelta(days=day.weekday()), row.service_id)
+        seconds, amount_cents = expected.get(key, (0, 0))
+        expected[key] = (seconds + row.seconds, amount_cents + row.amount_cents)
+    assert {(week, service): (seconds, amount_cents)
+            for week, service, seconds, amount_cents, _ in grouped.rows()} == expected
+    assert grouped.totals == ReportTotals(*map(sum, zip(*expected.values())))
+
+    months = fetch_grouped_totals(session, date(2024, 12, 1), date(2025, 1, 31), ['month'], service_id=second)
+    assert list(months.keys[0]) == [date(2024, 12, 1), date(2025, 1, 1)]
+    assert list(months.seconds) == [45 * 60 + 90 * 60, 135 * 60]
+
+    with pytest.raises(ValueError):
+        fetch_grouped_totals(session, date(2024, 12, 1), date(2025, 1, 31), ['service', 'service'])
+    with pytest.raises(ValueError):
+        fetch_grouped_totals(session, date(2024, 12, 1), date(2025, 1, 31), ['quarter'])
+
+    db.close()
+
+
+def test_pivot_subtotals(tmp_path):
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    first, second = _add_entries(session)
+    session.add(TimeEntry(service_id=first, start_time=datetime(2025, 1, 20, 9, 0),
+                          end_time=datetime(2025, 1, 20, 10, 0)))
+    session.commit()
+
+    crosstab = pivot(fetch_grouped_totals(session, date(2024, 12, 1), date(2025, 1, 31), ['service', 'year']))
+    assert crosstab.row_keys == [first, second]
+    assert crosstab.column_keys == [date(2024, 1, 1), date(2025, 1, 1)]
+    assert list(crosstab.seconds) == [8100, 8100 + 3600, 8100, 8100]
+    assert [crosstab.row_total('seconds', row) for row in range(2)] == [19800, 16200]
+    assert [crosstab.column_total('seconds', column) for column in range(2)] == [16200, 19800]
+    assert crosstab.total('amount_cents') == sum(crosstab.amount_cents)
+    assert crosstab.value('seconds', 0, 1) == 11700
+
+    # Only the first service has entries in the week of 20/01: the other's cell is zero
+    weeks = pivot(fetch_grouped_totals(session, date(2024, 12, 1), date(2025, 1, 31), ['week', 'service']))
+    assert weeks.row_keys[-1] == date(2025, 1, 20)
+    assert [weeks.value('seconds', 3, column) for column in range(2)] == [3600, 0]
+
+    with pytest.raises(ValueError):
+        pivot(fetch_grouped_totals(session, date(2024, 12, 1), date(2025, 1, 31), ['service']))
+
+    db.close()
+
+
+def test_pivot_as_numpy(tmp_path):
+    numpy = pytest.importorskip('numpy')
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    _add_entries(session)
+
+    crosstab = pivot(fetch_grouped_totals(session, date(2024, 12, 1), date(2025, 1, 31), ['service', 'year']))
+    matrix = crosstab.to_numpy('seconds')
+    assert matrix.shape == (2, 2)
+    assert numpy.array_equal(matrix.sum(axis=1), [16200, 16200])
+
+    db.close()
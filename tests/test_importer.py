@@ -0,0 +1,141 @@
+"""
+Tests for the bulk import of time entries
+Run from project root: python -m pytest tests/test_importer.py
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from database import DatabaseManager
+from database import importer
+from database.importer import EntryValidationError, _rollup_keys, import_file, import_records
+from database.models import DailyServiceTotal, TimeEntry
+
+
+@pytest.fixture
+def rome_time(monkeypatch):
+    """Run the test in Central European Time (POSIX rule, no tz database needed)."""
+    monkeypatch.setenv('TZ', 'CET-1CEST,M3.5.0,M10.5.0/3')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    yield db
+    db.close()
+
+
+def _record(day, service="Analisi Dati", start="09:00", end="10:00", **extra):
+    return {'service': service, 'start': f"2024-05-{day:02d} {start}", 'end': f"2024-05-{day:02d} {end}", **extra}
+
+
+def _entry_count(session):
+    return session.execute(select(func.count(TimeEntry.id))).scalar()
+
+
+def test_invalid_records_reported_by_number(db):
+    session = db.get_session()
+    records = [
+        _record(1, notes="  prima  "),
+        _record(2, service="Sconosciuto"),
+        {'service': "Analisi Dati", 'start': "ieri", 'end': "2024-05-03 10:00"},
+        _record(4, start="11:00", end="10:00"),
+        "non un record",
+        _record(6, start="08:00+00:00", end="09:00+00:00"),
+    ]
+
+    result = import_records(session, records)
+    notes = session.execute(select(TimeEntry.notes).order_by(TimeEntry.start_time)).scalars().all()
+
+    assert result.imported == 2
+    assert [number for number, _ in result.errors] == [2, 3, 4, 5]
+    assert "Sconosciuto" in result.errors[0][1] and "ieri" in result.errors[1][1]
+    assert notes == ["prima", None]
+
+
+def test_dry_run_writes_nothing(db):
+    session = db.get_session()
+
+    result = import_records(session, [_record(day) for day in range(1, 4)] + [_record(4, service="?")], dry_run=True)
+
+    assert (result.imported, len(result.errors)) == (3, 1)
+    assert _entry_count(session) == 0
+    assert session.execute(select(func.count()).select_from(DailyServiceTotal)).scalar() == 0
+
+
+def test_several_batches(db, monkeypatch):
+    monkeypatch.setattr(importer, 'BATCH_SIZE', 3)
+    session = db.get_session()
+
+    result = import_records(session, [_record(day) for day in range(1, 9)])
+    days = session.execute(select(DailyServiceTotal.day).order_by(DailyServiceTotal.day)).scalars().all()
+
+    assert (result.imported, _entry_count(session)) == (8, 8)
+    assert days == [date(2024, 5, day) for day in range(1, 9)]
+
+
+def test_failing_progress_rolls_back_the_batch(db, monkeypatch):
+    """An error while a batch is read leaves nothing of it, and the session usable."""
+    monkeypatch.setattr(importer, 'PROGRESS_INTERVAL', 2)
+    session = db.get_session()
+
+    def progress(count):
+        raise RuntimeError("annullato")
+
+    with pytest.raises(RuntimeError):
+        import_records(session, [_record(day) for day in range(1, 4)], progress=progress)
+
+    assert _entry_count(session) == 0
+    assert import_records(session, [_record(1)]).imported == 1
+
+
+def test_rollup_keys_span_both_local_days(rome_time):
+    """A UTC day covers two local days: the rollup of both is refreshed."""
+    assert _rollup_keys({('2024-07-01', 1)}) == {(date(2024, 7, 1), 1), (date(2024, 7, 2), 1)}
+
+
+def test_entries_near_local_midnight_rolled_up_by_local_day(db, rome_time):
+    session = db.get_session()
+    records = [
+        {'service': "Analisi Dati", 'start': "2024-07-02 00:30", 'end': "2024-07-02 01:30"},  # 1 July in UTC
+        {'service': "Analisi Dati", 'start': "2024-07-02 23:00", 'end': "2024-07-02 23:45"},
+    ]
+
+    import_records(session, records)
+    rollup = session.execute(select(DailyServiceTotal.day, DailyServiceTotal.seconds)).all()
+
+    assert rollup == [(date(2024, 7, 2), 3600 + 45 * 60)]
+
+
+def test_import_file_formats(db, tmp_path):
+    session = db.get_session()
+    (tmp_path / 'voci.csv').write_text(
+        "service,start,end,notes\nAnalisi Dati,2024-05-01 09:00,2024-05-01 10:00,csv\n", encoding='utf-8'
+    )
+    (tmp_path / 'voci.jsonl').write_text(json.dumps(_record(2, notes="jsonl")) + "\n\n{rotto\n", encoding='utf-8')
+    (tmp_path / 'voci.json').write_text(json.dumps([_record(3, notes="json")]), encoding='utf-8')
+
+    results = [import_file(session, tmp_path / name) for name in ('voci.csv', 'voci.jsonl', 'voci.json')]
+    notes = session.execute(select(TimeEntry.notes).order_by(TimeEntry.start_time)).scalars().all()
+
+    assert [(result.imported, len(result.errors)) for result in results] == [(1, 0), (1, 1), (1, 0)]
+    assert notes == ["csv", "jsonl", "json"]
+    with pytest.raises(EntryValidationError):
+        import_file(session, tmp_path / 'voci.xlsx')
+    (tmp_path / 'oggetto.json').write_text(json.dumps(_record(4)), encoding='utf-8')
+    with pytest.raises(EntryValidationError):
+        import_file(session, tmp_path / 'oggetto.json')
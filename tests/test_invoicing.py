@@ -0,0 +1,93 @@
+"""
+Tests for invoice numbering
+Run from project root: python -m pytest tests/test_invoicing.py
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from datetime import date, datetime
+
+import pytest
+
+from database import DatabaseManager
+from database.invoicing import create_invoice, next_invoice_number
+from database.models import Invoice
+
+
+# Threads writing invoices at once, each on its own connection
+WRITERS = 4
+
+
+def test_numbers_per_year_without_gaps(tmp_path):
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+
+    numbers = []
+    for issued_on in (datetime(2024, 2, 1), datetime(2024, 3, 1), datetime(2025, 1, 10)):
+        numbers.append(create_invoice(session, date(2024, 1, 1), date(2024, 1, 31), issued_on=issued_on).invoice_number)
+        session.commit()
+    assert numbers == ["INV-2024-0001", "INV-2024-0002", "INV-2025-0001"]
+
+    # A rolled back number is given again; a deleted invoice's is not
+    assert next_invoice_number(session, 2024) == "INV-2024-0003"
+    session.rollback()
+    session.delete(session.query(Invoice).filter(Invoice.invoice_number == "INV-2024-0002").one())
+    session.commit()
+    assert create_invoice(session, date(2024, 1, 1), date(2024, 1, 31),
+                          issued_on=datetime(2024, 4, 1)).invoice_number == "INV-2024-0003"
+
+    db.close()
+
+
+def test_invoice_rolled_back_with_its_write(tmp_path):
+    """create_invoice leaves the commit to the write scope: a failure after it discards the invoice."""
+    db = DatabaseManager(tmp_path / 'mycket.db')
+
+    def invoice_then_fail(session):
+        create_invoice(session, date(2024, 1, 1), date(2024, 1, 31), issued_on=datetime(2024, 2, 1))
+        raise RuntimeError("export failed")
+
+    with pytest.raises(RuntimeError):
+        db.write(invoice_then_fail)
+    with db.session_scope(read_only=True) as session:
+        count = session.query(Invoice).count()
+    number = db.write(create_invoice, date(2024, 1, 1), date(2024, 1, 31), issued_on=datetime(2024, 2, 1)).invoice_number
+    db.close()
+
+    assert count == 0
+    assert number == "INV-2024-0001"
+
+
+def test_concurrent_writers_take_distinct_numbers(tmp_path):
+    """Writers on their own connections wait for each other instead of sharing a number."""
+    path = tmp_path / 'mycket.db'
+    DatabaseManager(path).close()
+    numbers = []
+    errors = []
+
+    def write_invoices():
+        db = DatabaseManager(path)
+        try:
+            for _ in range(10):
+                with db.session_scope() as session:
+                    invoice = create_invoice(session, date(2024, 1, 1), date(2024, 1, 31),
+                                             issued_on=datetime(2024, 2, 1))
+                    numbers.append(invoice.invoice_number)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=write_invoices) for _ in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(numbers) == [f"INV-2024-{number:04d}" for number in range(1, WRITERS * 10 + 1)]
@@ -0,0 +1,85 @@
+"""
+Tests for schema migrations
+Run from project root: python -m pytest tests/test_migrations.py
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+from database import DatabaseManager
+from database.migrations import HEAD_REVISION, current_revision, get_config, include_name
+from database.models import Base
+
+
+LEGACY_SCHEMA = """
+CREATE TABLE services (
+    id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(200) NOT NULL UNIQUE,
+    hourly_rate FLOAT NOT NULL, description TEXT, created_at DATETIME, updated_at DATETIME
+);
+CREATE TABLE time_entries (
+    id INTEGER NOT NULL PRIMARY KEY, service_id INTEGER NOT NULL REFERENCES services (id),
+    start_time DATETIME NOT NULL, end_time DATETIME, notes TEXT,
+    created_at DATETIME, updated_at DATETIME
+);
+CREATE TABLE invoices (
+    id INTEGER NOT NULL PRIMARY KEY, invoice_number VARCHAR(50) NOT NULL UNIQUE,
+    client_name VARCHAR(200), period_start DATETIME NOT NULL, period_end DATETIME NOT NULL,
+    total_amount FLOAT NOT NULL, notes TEXT, created_at DATETIME
+);
+INSERT INTO services (name, hourly_rate) VALUES ('Legacy', 30.0);
+INSERT INTO time_entries (service_id, start_time, end_time)
+    VALUES (1, '2024-01-01 09:00:00.000000', '2024-01-01 10:00:00.000000');
+"""
+
+
+def _index_names(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'time_entries'"
+        ).fetchall()
+    finally:
+        conn.close()
+    return {name for (name,) in rows}
+
+
+def test_head_revision_constant():
+    """HEAD_REVISION must name the last migration, or upgrades would be skipped."""
+    assert ScriptDirectory.from_config(get_config()).get_current_head() == HEAD_REVISION
+
+
+def test_fresh_database_matches_models(tmp_path):
+    """Running every migration yields exactly the schema declared by the models."""
+    db = DatabaseManager(tmp_path / 'fresh.db')
+    with db.engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={'include_name': include_name})
+        diff = compare_metadata(context, Base.metadata)
+    assert current_revision(db.engine) == HEAD_REVISION
+    db.close()
+
+    assert diff == []
+
+
+def test_legacy_database_upgraded_in_place(tmp_path):
+    """A 0.1.0 database keeps its rows, converted to exact money, and gains the new indexes."""
+    db_path = tmp_path / 'legacy.db'
+    conn = sqlite3.connect(db_path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.close()
+
+    db = DatabaseManager(db_path)
+    db.close()
+
+    assert 'ix_time_entries_running' in _index_names(db_path)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT duration_seconds FROM time_entries").fetchall() == [(3600,)]
+    assert conn.execute("SELECT hourly_rate_cents FROM services WHERE name = 'Legacy'").fetchone() == (3000,)
+    conn.close()
@@ -0,0 +1,80 @@
+"""
+Tests for overlap detection
+Run from project root: python -m pytest tests/test_overlaps.py
+"""
+
+import random
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from database import DatabaseManager
+from database.models import TimeEntry
+from database.overlaps import Interval, find_conflicts, find_overlaps, sweep_overlaps
+from datetime import datetime, timedelta
+
+
+def test_find_conflicts(tmp_path):
+    """New intervals conflict with overlapping and running entries, not with adjacent ones."""
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    morning = TimeEntry(service_id=1, start_time=datetime(2024, 3, 1, 9, 0), end_time=datetime(2024, 3, 1, 12, 0))
+    running = TimeEntry(service_id=2, start_time=datetime(2024, 3, 1, 15, 0))
+    session.add_all([morning, running])
+    session.commit()
+    now = datetime(2024, 3, 1, 17, 0)
+
+    def conflicts(start, end=None, **kwargs):
+        return [interval.entry_id for interval in find_conflicts(session, start, end, **kwargs)]
+
+    assert conflicts(datetime(2024, 3, 1, 12, 0), datetime(2024, 3, 1, 13, 0)) == []
+    assert conflicts(datetime(2024, 3, 1, 11, 0), datetime(2024, 3, 1, 13, 0)) == [morning.id]
+    assert conflicts(datetime(2024, 3, 1, 8, 0), datetime(2024, 3, 1, 16, 0)) == [morning.id, running.id]
+    assert conflicts(datetime(2024, 3, 1, 16, 0)) == [running.id]
+    assert conflicts(datetime(2024, 3, 1, 10, 0), datetime(2024, 3, 1, 11, 0), exclude_id=morning.id) == []
+
+    # The timer is open-ended: a manual entry later than now still conflicts
+    assert conflicts(datetime(2024, 3, 1, 18, 0), datetime(2024, 3, 1, 19, 0)) == [running.id]
+    assert conflicts(datetime(2024, 3, 1, 14, 0), datetime(2024, 3, 1, 15, 0)) == []
+
+    overlaps = find_overlaps(session, now=now)
+    assert overlaps == []
+    db.close()
+
+
+def test_find_conflicts_behind_accepted_overlap(tmp_path):
+    """A long entry still conflicts when a shorter one (an accepted overlap) started after it."""
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    long_entry = TimeEntry(service_id=1, start_time=datetime(2024, 3, 1, 8, 0), end_time=datetime(2024, 3, 1, 18, 0))
+    short_entry = TimeEntry(service_id=2, start_time=datetime(2024, 3, 1, 9, 0), end_time=datetime(2024, 3, 1, 9, 30))
+    session.add_all([long_entry, short_entry])
+    session.commit()
+
+    found = find_conflicts(session, datetime(2024, 3, 1, 14, 0), datetime(2024, 3, 1, 15, 0))
+    assert [interval.entry_id for interval in found] == [long_entry.id]
+    db.close()
+
+
+def test_sweep_matches_pairwise_comparison():
+    """The sweep finds exactly the pairs a quadratic comparison finds."""
+    rng = random.Random(7)
+    base = datetime(2024, 1, 1)
+    intervals = []
+    for entry_id in range(300):
+        start = base + timedelta(minutes=rng.randrange(0, 20000))
+        intervals.append(Interval(entry_id, 1, start, start + timedelta(minutes=rng.randrange(1, 240))))
+    intervals.sort(key=lambda interval: (interval.start_time, interval.entry_id))
+
+    expected = {
+        frozenset((a.entry_id, b.entry_id))
+        for i, a in enumerate(intervals) for b in intervals[i + 1:]
+        if a.start_time < b.end_time and b.start_time < a.end_time
+    }
+    found = [frozenset((overlap.first.entry_id, overlap.second.entry_id)) for overlap in sweep_overlaps(intervals)]
+
+    assert expected
+    assert len(found) == len(set(found))
+    assert set(found) == expected
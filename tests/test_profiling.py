@@ -0,0 +1,59 @@
+"""
+Tests for query profiling
+Run from project root: python -m pytest tests/test_profiling.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from datetime import datetime
+
+from database import DatabaseManager
+from database.models import Service, TimeEntry
+from database.profiling import QueryProfiler
+
+
+def test_profiler_records_rows_n_plus_one_and_trace(tmp_path):
+    """Statements get timings and fetched rows; per-row lazy loads are flagged."""
+    profiler = QueryProfiler(n_plus_one_threshold=5)
+    db = DatabaseManager(tmp_path / 'mycket.db', profiler=profiler)
+    session = db.get_session()
+    for service_id in range(1, 7):
+        session.add(TimeEntry(service_id=service_id, start_time=datetime(2024, 1, service_id, 9),
+                              end_time=datetime(2024, 1, service_id, 10)))
+    session.commit()
+    session.expunge_all()
+    profiler.reset()
+
+    with db.span('load'):
+        names = [entry.service.name for entry in session.query(TimeEntry).all()]
+    db.close()
+
+    assert len(names) == 6
+    statements = {stats.statement.split('\nFROM ')[1].split()[0]: stats for stats in profiler.statements()}
+    assert statements['time_entries'].rows == 6
+    assert statements['services'].count == 6
+    [(span, statement, run)] = profiler.n_plus_one()
+    assert (span, run) == ('load', 6)
+    assert 'FROM services' in statement
+    assert [stats.name for stats in profiler.spans()] == ['load']
+
+    profiler.write_trace(tmp_path / 'trace.json')
+    with open(tmp_path / 'trace.json', encoding='utf-8') as trace:
+        events = json.load(trace)['traceEvents']
+    assert {event['cat'] for event in events if event['ph'] == 'X'} == {'sql', 'span'}
+    assert all(event['args']['span'] == 'load' for event in events if event.get('cat') == 'sql')
+
+
+def test_profiling_is_off_by_default(tmp_path):
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    with db.span('nothing'):
+        count = db.get_session().query(Service).count()
+    db.close()
+
+    assert db.profiler is None
+    assert count == 6
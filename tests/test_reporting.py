@@ -0,0 +1,91 @@
+"""
+Tests for SQL-side report aggregation
+Run from project root: python -m pytest tests/test_reporting.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from database import DatabaseManager
+from database.models import Service, TimeEntry
+from database.money import amount_cents
+from database.reporting import fetch_report
+from datetime import date, datetime, timedelta
+
+
+def _make_db(tmp_path):
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    software = session.query(Service).filter(Service.name == "Consulenza Software").one()
+    ai = session.query(Service).filter(Service.name == "Consulenza AI").one()
+    session.add_all([
+        TimeEntry(service_id=software.id, start_time=datetime(2024, 3, 1, 9, 0),
+                  end_time=datetime(2024, 3, 1, 11, 30)),
+        TimeEntry(service_id=ai.id, start_time=datetime(2024, 3, 2, 14, 0),
+                  end_time=datetime(2024, 3, 2, 15, 0)),
+        # Running entry: never part of a report
+        TimeEntry(service_id=ai.id, start_time=datetime(2024, 3, 3, 8, 0)),
+        # Outside the period
+        TimeEntry(service_id=ai.id, start_time=datetime(2024, 4, 1, 8, 0),
+                  end_time=datetime(2024, 4, 1, 9, 0)),
+    ])
+    session.commit()
+    return db, session, software, ai
+
+
+def test_report_rows_and_totals(tmp_path):
+    """Rows and totals are computed in SQL for completed entries only."""
+    db, session, software, ai = _make_db(tmp_path)
+
+    report = fetch_report(session, date(2024, 3, 1), date(2024, 3, 31))
+
+    assert [row.service_name for row in report.rows] == [software.name, ai.name]
+    assert report.rows[0].seconds == 9000
+    assert report.rows[0].amount_cents == 8750
+    assert report.totals.seconds == 12600
+    assert report.totals.amount_cents == 8750 + 4500
+
+    db.close()
+
+
+def test_report_service_filter(tmp_path):
+    """Filtering by service restricts both rows and totals."""
+    db, session, software, ai = _make_db(tmp_path)
+
+    report = fetch_report(session, date(2024, 3, 1), date(2024, 3, 31), ai.id)
+
+    assert len(report.rows) == 1
+    assert report.totals.amount_cents == 4500
+
+    empty = fetch_report(session, date(2025, 1, 1), date(2025, 1, 31))
+    assert empty.rows == []
+    assert empty.totals == (0, 0)
+
+    db.close()
+
+
+def test_totals_are_exact_sums_of_lines(tmp_path):
+    """Each line is rounded to the cent once; the total is their exact sum."""
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    service = Service(name="Tariffa Dispari", hourly_rate=33.33)
+    session.add(service)
+    session.flush()
+    start = datetime(2024, 5, 1, 8, 0)
+    session.add_all([
+        TimeEntry(service_id=service.id, start_time=start + timedelta(minutes=10 * i),
+                  end_time=start + timedelta(minutes=10 * i, seconds=7 * (i + 1)))
+        for i in range(1000)
+    ])
+    session.commit()
+
+    report = fetch_report(session, date(2024, 5, 1), date(2024, 5, 31))
+
+    assert service.hourly_rate_cents == 3333
+    assert report.totals.amount_cents == sum(row.amount_cents for row in report.rows)
+    assert report.rows[0].amount_cents == amount_cents(7, 3333)
+
+    db.close()
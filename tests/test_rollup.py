@@ -0,0 +1,135 @@
+"""
+Tests for the daily_service_totals rollup
+Run from project root: python -m pytest tests/test_rollup.py
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import pytest
+from sqlalchemy import func, select
+
+from database import DatabaseManager
+from database import importer
+from database.importer import import_records
+from database.models import DailyServiceTotal, Service, TimeEntry
+from database.reporting import fetch_report_totals
+from database.rollup import fetch_daily_totals, rebuild_daily_totals
+from datetime import date, datetime
+
+
+def _rollup(session):
+    return session.execute(
+        select(DailyServiceTotal.day, DailyServiceTotal.service_id, DailyServiceTotal.seconds,
+               DailyServiceTotal.amount_cents, DailyServiceTotal.entry_count)
+        .order_by(DailyServiceTotal.day, DailyServiceTotal.service_id)
+    ).all()
+
+
+def test_rollup_follows_entry_changes(tmp_path):
+    """Inserts, timer stops, moves, deletes and rate changes all update the rollup."""
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    service = session.query(Service).filter(Service.name == "Consulenza Software").one()
+
+    running = TimeEntry(service_id=service.id, start_time=datetime(2024, 3, 1, 9, 0))
+    manual = TimeEntry(service_id=service.id, start_time=datetime(2024, 3, 1, 14, 0),
+                       end_time=datetime(2024, 3, 1, 15, 0))
+    session.add_all([running, manual])
+    session.commit()
+    assert _rollup(session) == [(date(2024, 3, 1), service.id, 3600, 3500, 1)]
+
+    running.end_time = datetime(2024, 3, 1, 11, 30)  # Stop the timer
+    session.commit()
+    assert _rollup(session) == [(date(2024, 3, 1), service.id, 12600, 12250, 2)]
+
+    manual.start_time = datetime(2024, 3, 2, 14, 0)  # Move to another day
+    manual.end_time = datetime(2024, 3, 2, 15, 0)
+    session.commit()
+    assert [row.day for row in _rollup(session)] == [date(2024, 3, 1), date(2024, 3, 2)]
+
+    service.hourly_rate = 40.0
+    session.commit()
+    assert [row.amount_cents for row in _rollup(session)] == [10000, 4000]
+
+    session.delete(manual)
+    session.commit()
+    assert _rollup(session) == [(date(2024, 3, 1), service.id, 9000, 10000, 1)]
+
+    db.close()
+
+
+def test_rollup_totals_match_entries(tmp_path):
+    """Bulk imports refresh the rollup, which gives the same totals as the raw entries."""
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    records = [
+        {'service': name, 'start': f"2024-01-{day:02d} 09:00", 'end': f"2024-01-{day:02d} {9 + day % 5:02d}:{day:02d}"}
+        for day in range(1, 29)
+        for name in ("Consulenza AI", "Analisi Dati")
+    ]
+    import_records(session, records)
+    ai_id = session.execute(select(Service.id).where(Service.name == "Consulenza AI")).scalar()
+
+    for service_id in (None, ai_id):
+        expected = fetch_report_totals(session, date(2024, 1, 5), date(2024, 1, 20), service_id)
+        assert fetch_daily_totals(session, date(2024, 1, 5), date(2024, 1, 20), service_id) == expected
+
+    incremental = _rollup(session)
+    assert len(incremental) == 56
+    assert rebuild_daily_totals(session) == 56
+    assert _rollup(session) == incremental
+
+    db.close()
+
+
+def test_import_streams_batches(tmp_path, monkeypatch):
+    """Batches are committed as records are read, and the write lock is free while reading."""
+    monkeypatch.setattr(importer, 'BATCH_SIZE', 2)
+    path = tmp_path / 'mycket.db'
+    db = DatabaseManager(path)
+    session = db.get_session()
+    other_writer = sqlite3.connect(path, timeout=0, isolation_level=None)
+    inserted_while_reading = []
+
+    def records():
+        for day in range(1, 8):
+            inserted_while_reading.append(other_writer.execute("SELECT COUNT(*) FROM time_entries").fetchone()[0])
+            other_writer.execute('BEGIN IMMEDIATE')  # Fails at once if the import held the lock
+            other_writer.execute('ROLLBACK')
+            yield {'service': "Analisi Dati", 'start': f"2024-05-0{day} 09:00", 'end': f"2024-05-0{day} 10:00"}
+        yield {'service': "Sconosciuto", 'start': "2024-05-08 09:00", 'end': "2024-05-08 10:00"}
+
+    result = import_records(session, records())
+    other_writer.close()
+    assert (result.imported, [number for number, _ in result.errors]) == (7, [8])
+    assert inserted_while_reading == [0, 0, 2, 2, 4, 4, 6]
+    assert fetch_daily_totals(session, date(2024, 5, 1), date(2024, 5, 31)).seconds == 7 * 3600
+
+    db.close()
+
+
+def test_failed_import_keeps_committed_batches(tmp_path, monkeypatch):
+    """An import stopped midway keeps its committed batches, with their rollup, and nothing else."""
+    monkeypatch.setattr(importer, 'BATCH_SIZE', 2)
+    monkeypatch.setattr(importer, 'PROGRESS_INTERVAL', 5)
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    records = [
+        {'service': "Analisi Dati", 'start': f"2024-05-0{day} 09:00", 'end': f"2024-05-0{day} 10:00"}
+        for day in range(1, 8)
+    ]
+
+    def progress(count):
+        raise RuntimeError("annullato")
+
+    with pytest.raises(RuntimeError):
+        import_records(session, records, progress=progress)
+    assert session.execute(select(func.count(TimeEntry.id))).scalar() == 4
+    assert fetch_daily_totals(session, date(2024, 5, 1), date(2024, 5, 31)).seconds == 4 * 3600
+
+    db.close()
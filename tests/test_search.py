@@ -0,0 +1,85 @@
+"""
+Tests for the full-text search over notes and services
+Run from project root: python -m pytest tests/test_search.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from datetime import date, datetime, timedelta
+
+from database import DatabaseManager
+from database.models import Service, TimeEntry
+from database.search import HIGHLIGHT_END, HIGHLIGHT_START, match_expression, search_entries, search_services
+
+
+def _entry(service_id, day, notes):
+    start = datetime(2024, 5, day, 9, 0)
+    return TimeEntry(service_id=service_id, start_time=start, end_time=start + timedelta(hours=1), notes=notes)
+
+
+def test_match_expression():
+    assert match_expression('Rossi  fatt') == '"Rossi"* "fatt"*'
+    assert match_expression('"; DROP -- *') == '"DROP"*'
+    assert match_expression(' -* ') is None
+    assert match_expression(None) is None
+
+
+def test_index_follows_entries(tmp_path):
+    """Triggers keep the index in sync; prefixes and accents match."""
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    meeting = _entry(1, 1, "Riunione con Rossi sulla fattura")
+    session.add_all([meeting, _entry(2, 2, "Attività di supporto"), _entry(1, 3, None)])
+    session.commit()
+
+    found = search_entries(session, 'ross fatt')
+    accents = search_entries(session, 'attivita')
+    other_service = search_entries(session, 'rossi', service_id=2)
+    later = search_entries(session, 'rossi', start=date(2024, 5, 2))
+
+    meeting.notes = "Telefonata con Bianchi"
+    session.commit()
+    renamed = search_entries(session, 'rossi'), search_entries(session, 'bianchi')
+
+    session.delete(meeting)
+    session.commit()
+    deleted = search_entries(session, 'bianchi')
+
+    integrity = session.connection().exec_driver_sql(
+        "INSERT INTO time_entry_fts (time_entry_fts, rank) VALUES ('integrity-check', 1)"
+    )
+    db.close()
+
+    assert [hit.entry_id for hit in found] == [meeting.id]
+    assert found[0].hours == 1.0
+    assert f'{HIGHLIGHT_START}Rossi{HIGHLIGHT_END}' in found[0].snippet
+    assert len(accents) == 1 and accents[0].service_id == 2
+    assert other_service == [] and later == []
+    assert renamed[0] == [] and len(renamed[1]) == 1
+    assert deleted == []
+    assert integrity is not None  # Raises if the index drifted from the table
+
+
+def test_ranking_and_services(tmp_path):
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    session.add_all([
+        _entry(1, 1, "Analisi dei requisiti e analisi dei costi, analisi finale"),
+        _entry(1, 2, "Sviluppo del modulo di analisi e test"),
+    ])
+    session.add(Service(name="Revisione codice", description="Code review e analisi statica", hourly_rate=50))
+    session.commit()
+
+    hits = search_entries(session, 'analisi')
+    services = search_services(session, 'statica')
+    db.close()
+
+    assert len(hits) == 2
+    assert hits[0].rank <= hits[1].rank  # BM25: more occurrences in a shorter text first
+    assert hits[0].start_time.day == 1
+    assert [service.name for service in services] == ["Revisione codice"]
+    assert HIGHLIGHT_START in services[0].snippet
@@ -0,0 +1,134 @@
+"""
+Tests for the service catalog shared by the UI panels
+Run from project root: python -m pytest tests/test_service_catalog.py
+"""
+
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import pytest
+
+pytest.importorskip('PyQt6.QtWidgets')
+
+from PyQt6.QtWidgets import QApplication
+from sqlalchemy import event
+
+from database import DatabaseManager
+from database.models import Service
+from ui.service_catalog import ServiceCatalog, ServiceInfo
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    """A QApplication without a display: the change feed is delivered by its event loop."""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def catalog(qapp, db):
+    catalog = ServiceCatalog(db)
+    yield catalog
+    catalog.notifier.close()
+
+
+def _count_queries(db):
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    return statements
+
+
+def _add_service(session, name, hourly_rate):
+    service = Service(name=name, hourly_rate=hourly_rate)
+    session.add(service)
+    session.flush()
+    return service.id
+
+
+def test_loaded_once_and_looked_up_without_queries(db, catalog):
+    statements = _count_queries(db)
+    services = catalog.services()
+    by_id = {service.id: service for service in services}
+    first = services[0]
+
+    assert [service.name for service in services] == sorted(service.name for service in services)
+    assert catalog.get(first.id) == first
+    assert catalog.name(first.id) == first.name
+    assert all(catalog.get(service_id) is by_id[service_id] for service_id in by_id)
+    assert len([sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]) == 1
+
+
+def test_unknown_service(db, catalog):
+    assert catalog.get(999) is None
+    assert catalog.name(999) == "-"
+
+
+def test_follows_the_change_feed(qapp, db, catalog):
+    """Services added, edited or deleted through the ORM reach the catalog, in name order."""
+    catalog.services()
+    emitted = []
+    catalog.changed.connect(lambda: emitted.append(True))
+
+    new_id = db.write(_add_service, "Aaa Revisione", 10.0)
+    qapp.processEvents()
+    assert catalog.services()[0] == ServiceInfo(new_id, "Aaa Revisione", 1000, None)
+
+    def edit(session):
+        service = session.get(Service, new_id)
+        service.name = "Zzz Revisione"
+        service.hourly_rate = 12.5
+
+    db.write(edit)
+    qapp.processEvents()
+    assert catalog.services()[-1] == ServiceInfo(new_id, "Zzz Revisione", 1250, None)
+
+    db.write(lambda session: session.delete(session.get(Service, new_id)))
+    qapp.processEvents()
+    assert catalog.get(new_id) is None
+    assert len(emitted) == 3
+
+
+def test_bulk_changes_reload_the_catalog(qapp, db, catalog):
+    """A reset of the services, or an invalidate(), reloads the cache from the database."""
+    catalog.services()
+    connection = sqlite3.connect(db.db_path)
+    connection.execute("INSERT INTO services (name, hourly_rate_cents) VALUES ('Esterno', 6000)")
+    connection.commit()
+    new_id = connection.execute("SELECT id FROM services WHERE name = 'Esterno'").fetchone()[0]
+    connection.close()
+    assert catalog.get(new_id) is None  # Written by another process: the feed does not see it
+
+    db.changes.publish_reset('services')
+    qapp.processEvents()
+    assert catalog.get(new_id) == ServiceInfo(new_id, "Esterno", 6000, None)
+
+    catalog.invalidate()
+    assert catalog.name(new_id) == "Esterno"
+
+
+def test_edits_only_touch_the_edited_fields(qapp, db, catalog):
+    """A service edited in the panel keeps the fields changed elsewhere while the dialog was open."""
+    services_panel = pytest.importorskip('ui.services_panel')
+    first, second = catalog.services()[:2]
+
+    def change_rate(session):
+        session.get(Service, first.id).hourly_rate = 99.0
+
+    db.write(change_rate)  # E.g. by another window, after the dialog loaded its copy
+    assert db.write(services_panel._update_service, first.id, {'description': "Nuova descrizione"})
+    assert not db.write(services_panel._update_service, first.id, {'name': second.name})
+    qapp.processEvents()
+
+    assert catalog.get(first.id) == ServiceInfo(first.id, first.name, 9900, "Nuova descrizione")
@@ -0,0 +1,156 @@
+"""
+Tests for unit-of-work sessions
+Run from project root: python -m pytest tests/test_sessions.py
+"""
+
+import multiprocessing
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from database import DatabaseManager, ReadOnlySessionError
+from database.engine import BUSY_TIMEOUT_MS
+from database.importer import import_records
+from database.models import Service, TimeEntry
+from database.sessions import retry_on_busy
+
+
+# Processes writing to one database at once, and writes of each
+WRITER_PROCESSES = 4
+WRITES_PER_PROCESS = 25
+
+
+def test_session_scope_commits_or_rolls_back(tmp_path):
+    """Changes are committed at the end of the block, discarded if it raises."""
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    with db.session_scope() as session:
+        service = Service(name="Formazione Extra", hourly_rate_cents=5000)
+        session.add(service)
+    with pytest.raises(RuntimeError):
+        with db.session_scope() as session:
+            session.add(Service(name="Mai Salvato", hourly_rate_cents=1000))
+            session.flush()
+            raise RuntimeError("boom")
+
+    with db.session_scope(read_only=True) as session:
+        names = {name for (name,) in session.query(Service.name)}
+        loaded = session.get(Service, service.id)
+    db.close()
+
+    assert "Formazione Extra" in names
+    assert "Mai Salvato" not in names
+    # Objects stay readable once their session is closed
+    assert (service.name, loaded.hourly_rate_cents) == ("Formazione Extra", 5000)
+
+
+def test_read_only_scope_refuses_changes(tmp_path):
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    with pytest.raises(ReadOnlySessionError):
+        with db.session_scope(read_only=True) as session:
+            session.get(Service, 1).name = "Rinominato"
+            session.flush()
+    with db.session_scope(read_only=True) as session:
+        name = session.get(Service, 1).name
+    db.close()
+
+    assert name != "Rinominato"
+
+
+def test_retry_on_busy_only_retries_lock_errors():
+    calls = []
+    pauses = []
+
+    def locked_twice():
+        calls.append(1)
+        if len(calls) < 3:
+            raise OperationalError("BEGIN IMMEDIATE", {}, sqlite3.OperationalError("database is locked"))
+        return "ok"
+
+    assert retry_on_busy(locked_twice, sleep=pauses.append) == "ok"
+    assert len(pauses) == 2 and pauses[1] > pauses[0] * 0.5
+
+    def broken():
+        raise OperationalError("SELECT", {}, sqlite3.OperationalError("no such table: x"))
+
+    with pytest.raises(OperationalError):
+        retry_on_busy(broken, sleep=pauses.append)
+    assert len(pauses) == 2
+
+    # Gives up after the last attempt
+    calls.clear()
+    with pytest.raises(OperationalError):
+        retry_on_busy(locked_twice, attempts=2, sleep=pauses.append)
+    assert len(calls) == 2
+
+
+def _increment_rate(session, service_id):
+    # Read, then write what was read: interleaved, two writers would lose an update
+    service = session.get(Service, service_id)
+    service.hourly_rate_cents += 1
+
+
+def _write_many(path, service_id, latencies):
+    db = DatabaseManager(path)
+    slowest = 0.0
+    for _ in range(WRITES_PER_PROCESS):
+        started = time.perf_counter()
+        db.write(_increment_rate, service_id)
+        slowest = max(slowest, time.perf_counter() - started)
+    db.close()
+    latencies.put(slowest)
+
+
+def test_concurrent_processes_lose_no_writes(tmp_path):
+    """Writer processes wait for each other: every increment lands, none waits for long."""
+    path = tmp_path / 'mycket.db'
+    db = DatabaseManager(path)
+    with db.session_scope(read_only=True) as session:
+        service = session.get(Service, 1)
+    latencies = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_write_many, args=(path, service.id, latencies))
+        for _ in range(WRITER_PROCESSES)
+    ]
+    for process in processes:
+        process.start()
+    slowest = [latencies.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join()
+
+    with db.session_scope(read_only=True) as session:
+        rate = session.get(Service, service.id).hourly_rate_cents
+    db.close()
+
+    assert [process.exitcode for process in processes] == [0] * WRITER_PROCESSES
+    assert rate == service.hourly_rate_cents + WRITER_PROCESSES * WRITES_PER_PROCESS
+    assert max(slowest) < BUSY_TIMEOUT_MS / 1000
+
+
+def test_import_waits_for_another_writer(tmp_path):
+    """An import finding the database locked past the busy timeout retries taking the lock."""
+    path = tmp_path / 'mycket.db'
+    db = DatabaseManager(path, pragmas={'busy_timeout': 50})
+    holder = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    holder.execute('BEGIN IMMEDIATE')
+    release = threading.Timer(0.3, holder.execute, ('COMMIT',))
+    release.start()
+    records = [{'service': "Analisi Dati", 'start': f"2024-04-0{day} 09:00", 'end': f"2024-04-0{day} 10:00"}
+               for day in range(1, 4)]
+    try:
+        result = import_records(db.get_session(), records)
+    finally:
+        release.join()
+        holder.close()
+    with db.session_scope(read_only=True) as session:
+        count = session.query(TimeEntry).count()
+    db.close()
+
+    assert (result.imported, count) == (3, 3)
@@ -0,0 +1,39 @@
+"""
+Tests for the benchmark data generator
+Run from project root: python -m pytest tests/test_synthetic.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add benchmarks and src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'benchmarks'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from sqlalchemy import select
+
+from database.models import DailyServiceTotal, TimeEntry
+from database.overlaps import find_overlaps
+from synthetic import generate_database
+
+
+def _snapshot(db_path):
+    db = generate_database(db_path, 500, seed=3)
+    session = db.get_session()
+    entries = session.execute(
+        select(TimeEntry.service_id, TimeEntry.start_time, TimeEntry.end_time, TimeEntry.notes).order_by(TimeEntry.id)
+    ).all()
+    totals = session.execute(select(DailyServiceTotal.seconds)).scalars().all()
+    overlaps = find_overlaps(session)
+    db.close()
+    return entries, totals, overlaps
+
+
+def test_generator_is_deterministic(tmp_path):
+    """The same seed yields the same entries, with rollup totals and no overlaps."""
+    entries, totals, overlaps = _snapshot(tmp_path / 'first.db')
+
+    assert len(entries) == 500
+    assert sum(totals) == sum(int((end - start).total_seconds()) for _, start, end, _ in entries)
+    assert overlaps == []
+    assert _snapshot(tmp_path / 'second.db')[0] == entries
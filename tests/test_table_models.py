@@ -0,0 +1,123 @@
+"""
+Tests for the table models of the UI
+Run from project root: python -m pytest tests/test_table_models.py
+"""
+
+import os
+import sys
+from array import array
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from datetime import date
+
+import pytest
+
+pytest.importorskip('PyQt6.QtWidgets')
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication
+
+from database.grouping import Crosstab
+from ui.table_models import ColumnStore, LazyTableModel, PivotTableModel, TableColumn
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    """A QApplication without a display, for models creating fonts."""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    return QApplication.instance() or QApplication([])
+
+
+def _columns():
+    return [TableColumn("Nome"), TableColumn("Secondi", str, 'q'), TableColumn("ID", str, 'q')]
+
+
+def _display(model):
+    return [
+        [model.data(model.index(row, column)) for column in range(model.columnCount())]
+        for row in range(model.rowCount())
+    ]
+
+
+def test_fetch_more_exhausts_a_multiple_of_the_batch_size(qapp):
+    """A source ending on a batch boundary is exhausted by one last, empty fetch."""
+    model = LazyTableModel(_columns(), batch_size=2)
+    inserted = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+
+    model.set_source([(f"voce {index}", index * 60, index) for index in range(4)])
+    assert (model.rowCount(), model.canFetchMore()) == (2, True)
+    model.fetchMore()
+    assert (model.rowCount(), model.canFetchMore()) == (4, True)  # A full batch: there may be more
+    model.fetchMore()
+    assert (model.rowCount(), model.canFetchMore(), model.is_complete()) == (4, False, True)
+    model.fetchMore()
+
+    assert inserted == [(0, 1), (2, 3)]
+    assert [model.value(row, 2) for row in range(4)] == [0, 1, 2, 3]
+
+
+def test_short_last_batch_completes_the_source(qapp):
+    model = LazyTableModel(_columns(), batch_size=2)
+    model.set_source([("a", 1, 1), ("b", 2, 2), ("c", 3, 3)])
+    model.fetchMore()
+
+    assert (model.rowCount(), model.canFetchMore()) == (3, False)
+
+
+def test_row_edits_keep_columns_aligned(qapp):
+    """Inserts, updates and removals touch every column, typed arrays and lists alike."""
+    model = LazyTableModel(_columns())
+    model.set_source([("a", 60, 1), ("c", 180, 3)])
+    changed = []
+    model.dataChanged.connect(lambda first, last: changed.append((first.row(), last.row())))
+
+    model.insert_row(1, ("b", 120, 2))
+    model.update_row(2, ("c", 240, 3))
+    model.remove_row(0)
+
+    assert [len(column) for column in model._store.columns] == [2, 2, 2]
+    assert [model.row_values(row) for row in range(2)] == [("b", 120, 2), ("c", 240, 3)]
+    assert _display(model) == [["b", "120", "2"], ["c", "240", "3"]]
+    assert changed == [(2, 2)]
+    assert (model.find_row(2, 3), model.find_row(2, 1)) == (1, None)
+
+
+def test_column_store_find_and_rows():
+    store = ColumnStore(['q', None])
+    store.extend([(1, "a"), (2, "b"), (2, "c")])
+    store.replace(0, (5, "z"))
+
+    assert (store.find(0, 2), store.find(1, "c"), store.find(0, 9)) == (1, 2, None)
+    assert list(store.rows()) == [(5, "z"), (2, "b"), (2, "c")]
+    store.clear()
+    assert (len(store), store.columns[0].typecode) == (0, 'q')
+
+
+def test_pivot_subtotal_cells(qapp):
+    crosstab = Crosstab([1, 2], [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)])
+    crosstab.seconds[:] = array('q', [3600, 0, 1800, 600, 1200, 0])
+    model = PivotTableModel()
+    model.set_crosstab(crosstab, row_formatter=lambda key: f"S{key}", column_formatter=lambda day: f"{day:%m}")
+    model.set_measure('seconds')
+
+    values = [
+        [model.data(model.index(row, column), Qt.ItemDataRole.UserRole) for column in range(model.columnCount())]
+        for row in range(model.rowCount())
+    ]
+    assert values == [[3600, 0, 1800, 5400], [600, 1200, 0, 1800], [4200, 1200, 1800, 7200]]
+    headers = [model.headerData(column, Qt.Orientation.Horizontal) for column in range(4)]
+    assert headers == ["01", "02", "03", "Totale"]
+    assert model.headerData(2, Qt.Orientation.Vertical) == "Totale"
+    assert [model.is_total(model.index(row, 3)) for row in range(3)] == [True] * 3
+    assert not model.is_total(model.index(1, 2))
+    assert model.data(model.index(2, 0), Qt.ItemDataRole.FontRole).bold()
+    assert model.data(model.index(0, 0), Qt.ItemDataRole.FontRole) is None
+
+    model.set_measure('amount_cents', formatter=lambda cents: f"{cents / 100:.2f}")
+    assert model.data(model.index(2, 3)) == "0.00"
+    model.clear()
+    assert (model.rowCount(), model.columnCount()) == (0, 0)
@@ -0,0 +1,144 @@
+"""
+Tests for the running timer engine and the UTC storage of entry times
+Run from project root: python -m pytest tests/test_timer.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from database import DatabaseManager
+from database.clock import to_utc_naive, utc_naive_to_local, utc_now
+from database.entries import entry_key, fetch_entries_page
+from database.models import DailyServiceTotal, TimeEntry
+from database.reporting import fetch_report_totals
+from database.rollup import fetch_daily_totals
+from database.timer import TimerClock, close_stale_entries, find_running_entry, write_heartbeat
+
+
+@pytest.fixture
+def rome_time(monkeypatch):
+    """Run the test in Central European Time (POSIX rule, no tz database needed)."""
+    monkeypatch.setenv('TZ', 'CET-1CEST,M3.5.0,M10.5.0/3')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_clock_is_monotonic():
+    """The elapsed time follows the monotonic clock, whatever the wall clock does."""
+    ticks = [100.0]
+    start = datetime(2024, 5, 1, 9, 0, tzinfo=timezone.utc)
+    clock = TimerClock(start, now=start + timedelta(seconds=10), monotonic=lambda: ticks[0])
+
+    ticks[0] = 102.25
+    assert clock.elapsed() == timedelta(seconds=12.25)
+    assert clock.msecs_to_next_second() == 750
+
+    clock.sync(now=start + timedelta(hours=1))
+    assert clock.elapsed_seconds() == 3600
+
+
+def test_conversions_around_dst_changes(rome_time):
+    """The per-hour offset cache agrees with the C library, minute by minute."""
+    for day in (datetime(2024, 3, 30), datetime(2024, 10, 26)):
+        for minute in range(0, 3 * 24 * 60, 5):
+            value = day + timedelta(minutes=minute)
+            assert utc_naive_to_local(value) == value.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+            assert to_utc_naive(value) == value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def test_times_stored_in_utc(tmp_path, rome_time):
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    # The night clocks go back: 01:30 CEST to 03:30 CET is three hours
+    night = TimeEntry(service_id=1, start_time=datetime(2024, 10, 27, 1, 30), end_time=datetime(2024, 10, 27, 3, 30))
+    # Just after local midnight, still the previous day in UTC
+    late = TimeEntry(service_id=1, start_time=datetime(2024, 7, 2, 0, 30), end_time=datetime(2024, 7, 2, 1, 30))
+    session.add_all([night, late])
+    session.commit()
+
+    stored = session.connection().exec_driver_sql(
+        "SELECT start_time FROM time_entries WHERE id = ?", (late.id,)
+    ).scalar()
+    session.expire_all()
+    loaded = session.get(TimeEntry, late.id).start_time
+    days = {total.day for total in session.query(DailyServiceTotal)}
+    newest, older = fetch_entries_page(session)
+    after_newest = fetch_entries_page(session, after=entry_key(newest))
+    night_seconds = session.get(TimeEntry, night.id).duration_seconds
+    db.close()
+
+    assert stored.startswith('2024-07-01 22:30:00')
+    assert loaded == datetime(2024, 7, 2, 0, 30)
+    assert night_seconds == 3 * 3600
+    assert after_newest == [older]  # Keyset positions are converted like the column
+    assert days == {date(2024, 10, 27), date(2024, 7, 2)}
+
+
+def test_aware_times_rolled_up_by_local_day(tmp_path, rome_time):
+    """An aware start just before UTC midnight counts towards the next local day."""
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    start = datetime(2024, 2, 29, 23, 30, tzinfo=timezone.utc)  # 1 March, 00:30 in Rome
+    session.add(TimeEntry(service_id=1, start_time=start, end_time=start + timedelta(hours=1)))
+    session.commit()
+
+    days = {total.day for total in session.query(DailyServiceTotal)}
+    rolled_up = fetch_daily_totals(session, date(2024, 3, 1), date(2024, 3, 1))
+    raw = fetch_report_totals(session, date(2024, 3, 1), date(2024, 3, 1))
+    db.close()
+
+    assert days == {date(2024, 3, 1)}
+    assert raw.seconds == 3600
+    assert rolled_up == raw
+
+
+def test_timer_stopped_in_repeated_dst_hour(tmp_path, rome_time, monkeypatch):
+    """A timer stopped in the hour repeated when DST ends lasts what it really lasted."""
+    time_tracker = pytest.importorskip('ui.time_tracker')
+    start = datetime(2024, 10, 27, 0, 10, tzinfo=timezone.utc)  # 02:10 CEST
+    stop = datetime(2024, 10, 27, 1, 20, tzinfo=timezone.utc)  # 02:20 CET, an hour later on the wall clock
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    entry = TimeEntry(service_id=1, start_time=start)
+    db.write(time_tracker._add_entry, entry)
+
+    monkeypatch.setattr(time_tracker, 'utc_now', lambda: stop)
+    stopped = db.write(time_tracker._stop_entry, entry.id, None)
+    db.close()
+
+    assert stopped.duration_seconds == 70 * 60
+
+
+def test_crashed_timer_closed_at_heartbeat(tmp_path):
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    session = db.get_session()
+    now = utc_now()
+    crashed = TimeEntry(service_id=1, start_time=now - timedelta(hours=2), heartbeat_at=now - timedelta(hours=1))
+    kept = TimeEntry(service_id=2, start_time=now - timedelta(minutes=30))  # Left running on purpose
+    done = TimeEntry(service_id=3, start_time=now - timedelta(hours=5), end_time=now - timedelta(hours=4))
+    session.add_all([crashed, kept, done])
+    session.commit()
+    crashed_id, kept_id, updated_at = crashed.id, kept.id, kept.updated_at
+
+    assert write_heartbeat(session, kept_id, now)
+    assert not write_heartbeat(session, done.id, now)
+    session.commit()
+    session.expire_all()
+    assert session.get(TimeEntry, kept_id).updated_at == updated_at  # Heartbeats are not edits
+
+    closed = [(entry.id, entry.duration_seconds) for entry in close_stale_entries(session, now=now)]
+    session.commit()
+    still_running = find_running_entry(session).id
+    db.close()
+
+    assert closed == [(crashed_id, 3600)]
+    assert still_running == kept_id
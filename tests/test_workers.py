@@ -0,0 +1,123 @@
+"""
+Tests for the background workers of the UI
+Run from project root: python -m pytest tests/test_workers.py
+"""
+
+import os
+import sys
+import threading
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import pytest
+
+pytest.importorskip('PyQt6.QtWidgets')
+
+from PyQt6.QtCore import QThreadPool
+from PyQt6.QtWidgets import QApplication
+from sqlalchemy import func, select
+
+from database import DatabaseManager
+from database.models import Service
+from ui.workers import start_worker
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    """A QApplication without a display: worker signals are delivered by its event loop."""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(tmp_path / 'mycket.db')
+    yield db
+    db.close()
+
+
+def _run(qapp, db, fn, *args, read_only=True, before_wait=None):
+    """Start ``fn`` on the pool, wait for it and return the signals it emitted, in order."""
+    emitted = []
+    worker = start_worker(
+        db, fn, *args,
+        read_only=read_only,
+        on_result=lambda result: emitted.append(('result', result)),
+        on_error=lambda message: emitted.append(('error', message)),
+        on_progress=lambda done, total: emitted.append(('progress', done, total)),
+        on_cancelled=lambda: emitted.append(('cancelled',)),
+        on_finished=lambda: emitted.append(('finished',)),
+    )
+    if before_wait is not None:
+        before_wait(worker)
+    assert QThreadPool.globalInstance().waitForDone(5000)
+    qapp.processEvents()
+    return emitted
+
+
+def _count_services(context, session):
+    context.progress(1, 2)
+    count = session.execute(select(func.count(Service.id))).scalar()
+    context.progress(2, 2)
+    return count
+
+
+def test_result_after_progress(qapp, db):
+    assert _run(qapp, db, _count_services) == [
+        ('progress', 1, 2), ('progress', 2, 2), ('result', 6), ('finished',)
+    ]
+
+
+def test_error_reported_as_message(qapp, db):
+    def failing(context, session, message):
+        raise ValueError(message)
+
+    assert _run(qapp, db, failing, "file illeggibile") == [('error', "file illeggibile"), ('finished',)]
+
+
+def test_read_only_task_cannot_write(qapp, db):
+    def rename(context, session):
+        session.get(Service, 1).name = "Rinominato"
+        session.flush()
+
+    emitted = _run(qapp, db, rename)
+    with db.session_scope(read_only=True) as session:
+        name = session.get(Service, 1).name
+
+    assert [signal[0] for signal in emitted] == ['error', 'finished']
+    assert name != "Rinominato"
+
+
+def test_cancelled_at_next_progress(qapp, db):
+    """A cancelled task stops at its next progress report and emits neither result nor error."""
+    cancelled = threading.Event()
+    reached = []
+
+    def waiting(context, session):
+        cancelled.wait(5)
+        context.progress(1)
+        reached.append(True)
+
+    def cancel(worker):
+        worker.cancel()
+        cancelled.set()
+
+    assert _run(qapp, db, waiting, before_wait=cancel) == [('cancelled',), ('finished',)]
+    assert reached == []
+
+
+def test_cancelled_after_returning(qapp, db):
+    """A task that returns after cancellation was requested drops its result."""
+    cancelled = threading.Event()
+
+    def waiting(context, session):
+        cancelled.wait(5)
+        return "troppo tardi"
+
+    def cancel(worker):
+        worker.cancel()
+        cancelled.set()
+
+    assert _run(qapp, db, waiting, before_wait=cancel) == [('cancelled',), ('finished',)]